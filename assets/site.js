@@ -3,12 +3,19 @@
   const resultsBox = document.getElementById("site-search-results");
   const body = document.body;
   const baseurl = body ? body.getAttribute("data-baseurl") || "" : "";
-  const searchIndexUrl = `${baseurl}/search.json`;
+  // Written by scripts/build_search_index.py before the Jekyll build.
+  const searchIndexUrl = `${baseurl}/assets/search`;
   if (!input || !resultsBox) {
     return;
   }
 
-  let indexData = null;
+  const TERM_PATTERN = /[a-z0-9]+|[\uac00-\ud7a3\u3040-\u30ff\u3400-\u9fff]+/g;
+  const HANGUL_START = 0xac00;
+  const HANGUL_END = 0xd7a3;
+
+  let metaPromise = null;
+  const shardPromises = new Map();
+  let searchSeq = 0;
 
   const escapeHtml = (value) =>
     String(value)
@@ -18,6 +25,98 @@
       .replace(/"/g, "&quot;")
       .replace(/'/g, "&#39;");
 
+  const isAscii = (term) => term.charCodeAt(0) < 0x80;
+
+  // Mirrors tokenize() in scripts/build_search_index.py; keep the two in sync.
+  const tokenize = (text) => {
+    const terms = [];
+    const runs = text.normalize("NFKC").toLowerCase().match(TERM_PATTERN) || [];
+    runs.forEach((run) => {
+      if (isAscii(run)) {
+        if (run.length >= 2) {
+          terms.push(run);
+        }
+      } else if (run.length === 1) {
+        terms.push(run);
+      } else {
+        for (let i = 0; i < run.length - 1; i += 1) {
+          terms.push(run.slice(i, i + 2));
+        }
+      }
+    });
+    return terms;
+  };
+
+  const shardKey = (term) => {
+    if (isAscii(term)) {
+      return term[0];
+    }
+    const code = term.charCodeAt(0);
+    if (code >= HANGUL_START && code <= HANGUL_END) {
+      return `h${code.toString(16)}`;
+    }
+    return "x";
+  };
+
+  const fetchOk = (url) =>
+    fetch(url).then((response) => {
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+      }
+      return response;
+    });
+
+  // GitHub Pages does not pick precompressed files by Accept-Encoding, so fetch
+  // the .gz variant and inflate it here when the browser supports it. If the
+  // .gz is missing or does not inflate (e.g. a proxy already decoded it), the
+  // plain .json is fetched instead.
+  const fetchJson = (name, version) => {
+    const query = version ? `?v=${version}` : "";
+    const plain = () => fetchOk(`${searchIndexUrl}/${name}${query}`).then((response) => response.json());
+    if (typeof DecompressionStream !== "function") {
+      return plain();
+    }
+    return fetchOk(`${searchIndexUrl}/${name}.gz${query}`)
+      .then((response) => new Response(response.body.pipeThrough(new DecompressionStream("gzip"))).json())
+      .catch(plain);
+  };
+
+  const loadMeta = () => {
+    if (!metaPromise) {
+      metaPromise = fetchJson("meta.json").then((meta) => ({ ...meta, shards: new Set(meta.shards) }));
+      metaPromise.catch(() => {
+        metaPromise = null;
+      });
+    }
+    return metaPromise;
+  };
+
+  const loadShard = (meta, key) => {
+    if (!meta.shards.has(key)) {
+      return Promise.resolve({});
+    }
+    if (!shardPromises.has(key)) {
+      const promise = fetchJson(`shard-${key}.json`, meta.version);
+      promise.catch(() => shardPromises.delete(key));
+      shardPromises.set(key, promise);
+    }
+    return shardPromises.get(key);
+  };
+
+  // The word still being typed and lone Hangul syllables also match as prefixes;
+  // every term sharing that first character lives in the same shard.
+  const postingsFor = (shard, token, prefix) => {
+    const scores = new Map();
+    const terms = prefix ? Object.keys(shard).filter((term) => term.startsWith(token)) : [token];
+    terms.forEach((term) => {
+      const postings = shard[term] || [];
+      for (let i = 0; i < postings.length; i += 2) {
+        scores.set(postings[i], Math.max(scores.get(postings[i]) || 0, postings[i + 1]));
+      }
+    });
+    return scores;
+  };
+
   const renderResults = (items, query) => {
     if (!query || query.length < 2) {
       resultsBox.hidden = true;
@@ -35,7 +134,7 @@
       .slice(0, 8)
       .map(
         (item) => `
-          <a class="search-item" href="${item.url}">
+          <a class="search-item" href="${escapeHtml(item.url)}">
             <strong>${escapeHtml(item.title)}</strong>
             <small>${escapeHtml(item.date)} · ${escapeHtml(item.categories)}</small>
             <span>${escapeHtml((item.content || "").slice(0, 90))}...</span>
@@ -48,34 +147,75 @@
     resultsBox.innerHTML = html;
   };
 
+  const renderError = () => {
+    resultsBox.hidden = false;
+    resultsBox.innerHTML = '<p class="search-empty">검색 인덱스를 불러오지 못했습니다.</p>';
+  };
+
   const runSearch = (query) => {
     const q = query.trim().toLowerCase();
-    if (!indexData) {
-      return;
-    }
+    const seq = ++searchSeq;
     if (q.length < 2) {
       renderResults([], "");
       return;
     }
 
-    const filtered = indexData.filter((item) => {
-      const title = (item.title || "").toLowerCase();
-      const content = (item.content || "").toLowerCase();
-      return title.includes(q) || content.includes(q);
-    });
+    const tokens = [...new Set(tokenize(q))];
+    if (tokens.length === 0) {
+      renderResults([], q);
+      return;
+    }
+    const typing = !/\s$/.test(query);
+    const last = tokens[tokens.length - 1];
 
-    renderResults(filtered, q);
+    loadMeta()
+      .then((meta) => {
+        const keys = [...new Set(tokens.map(shardKey))];
+        return Promise.all(keys.map((key) => loadShard(meta, key))).then((loaded) => {
+          const shards = new Map(keys.map((key, i) => [key, loaded[i]]));
+          return { meta, shards };
+        });
+      })
+      .then(({ meta, shards }) => {
+        if (seq !== searchSeq) {
+          return;
+        }
+        let scores = null;
+        tokens.forEach((token) => {
+          const prefix = (typing && token === last && isAscii(token)) || token.length === 1;
+          const matches = postingsFor(shards.get(shardKey(token)), token, prefix);
+          if (scores === null) {
+            scores = matches;
+            return;
+          }
+          const merged = new Map();
+          matches.forEach((weight, doc) => {
+            if (scores.has(doc)) {
+              merged.set(doc, scores.get(doc) + weight);
+            }
+          });
+          scores = merged;
+        });
+
+        // Lower doc ids are newer posts, so ties keep the newest first.
+        const items = [...scores.entries()]
+          .sort((a, b) => b[1] - a[1] || a[0] - b[0])
+          .map(([doc]) => {
+            const [title, url, date, categories, content] = meta.docs[doc];
+            return { title, url: `${baseurl}${url}`, date, categories, content };
+          });
+        renderResults(items, q);
+      })
+      .catch(() => {
+        if (seq === searchSeq) {
+          renderError();
+        }
+      });
   };
 
-  fetch(searchIndexUrl)
-    .then((response) => response.json())
-    .then((json) => {
-      indexData = json;
-    })
-    .catch(() => {
-      resultsBox.hidden = false;
-      resultsBox.innerHTML = '<p class="search-empty">검색 인덱스를 불러오지 못했습니다.</p>';
-    });
+  input.addEventListener("focus", () => {
+    loadMeta().catch(() => {});
+  });
 
   input.addEventListener("input", (event) => {
     runSearch(event.target.value);
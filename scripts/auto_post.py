@@ -1,20 +1,38 @@
+import argparse
+import hashlib
+import io
 import json
 import os
+import random
 import re
+import sys
+import tempfile
+import threading
+import time
 import traceback
-from dataclasses import dataclass
-from datetime import datetime, timezone
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qsl, quote_plus, urlencode, urlsplit, urlunsplit
 from zoneinfo import ZoneInfo
 
 import feedparser
 import requests
 
+from feed_cache import FeedCache
+from llm_cache import LLMCache, cache_key
+
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 POSTS_DIR = ROOT_DIR / "_posts"
 STATE_FILE = ROOT_DIR / ".automation" / "state.json"
+SEEN_URL_INDEX_FILE = ROOT_DIR / ".automation" / "news_seen_urls.json"
+BACKFILL_CHECKPOINT_FILE = ROOT_DIR / ".automation" / "backfill_checkpoint.json"
+BATCH_JOB_FILE = ROOT_DIR / ".automation" / "batch_job.json"
 CONFIG_FILE = ROOT_DIR / "_config.yml"
 
 PRIMARY_NEWS_FEEDS = [
@@ -28,7 +46,57 @@ FALLBACK_NEWS_FEEDS = [
     "https://www.wired.com/feed/tag/ai/latest/rss",
 ]
 
+# Only Google News can be queried for a past day; the other feeds always
+# return the latest entries, so backfilled news posts use this feed alone.
+DATED_NEWS_FEED_TEMPLATE = (
+    "https://news.google.com/rss/search?q={query}&hl=en-US&gl=US&ceid=US:en"
+)
+
+FEED_TIMEOUT_SECONDS = 15
+FEED_DEADLINE_SECONDS = 40
+FEED_USER_AGENT = "Mozilla/5.0 (compatible; qoxmfaktmxj-auto-post)"
+
+SEEN_URL_TTL_DAYS = 30
+CITED_URL_PATTERN = re.compile(r"https?://[^\s<>()\[\]\"']+")
+TRACKING_QUERY_KEYS = {"oc", "fbclid", "gclid", "ref", "ref_src", "guccounter"}
+
+MINHASH_PERMUTATIONS = 64
+MINHASH_BANDS = 32
+MINHASH_PRIME = (1 << 61) - 1
+MINHASH_SEEDS = [
+    (rng.randrange(1, MINHASH_PRIME), rng.randrange(MINHASH_PRIME))
+    for rng in (random.Random(seed) for seed in range(1, MINHASH_PERMUTATIONS + 1))
+]
+DUPLICATE_TITLE_JACCARD = 0.5
+TITLE_STOPWORDS = {
+    "a", "an", "and", "as", "at", "by", "for", "from", "in", "is", "it", "its",
+    "of", "on", "or", "the", "to", "with", "after", "over", "into", "new",
+}
+
 DEFAULT_MODEL = "claude-haiku-4-5-20251001"
+# Overridable so the scripts can be pointed at a local stub server.
+ANTHROPIC_BASE_URL = os.getenv("ANTHROPIC_BASE_URL", "https://api.anthropic.com").strip().rstrip("/")
+
+LLM_CACHE = LLMCache.from_env()
+# Minimum cacheable prompt prefix per model family, in tokens.
+PROMPT_CACHE_MIN_TOKENS = [
+    ("haiku-4-5", 4096),
+    ("opus-4-5", 4096),
+    ("haiku", 2048),
+]
+PROMPT_CACHE_DEFAULT_MIN_TOKENS = 1024
+# English runs a little under four characters per token, so this estimate errs
+# short and never marks a block that is below the minimum.
+PROMPT_CHARS_PER_TOKEN = 4
+STREAM_RESPONSES = os.getenv("ANTHROPIC_STREAM", "").strip().lower() in ("1", "true", "yes")
+MAX_CONTINUATIONS = 3
+RATE_LIMIT_RETRIES = 3
+BACKFILL_POST_HOUR = 9
+BATCH_POLL_INITIAL_SECONDS = 10
+BATCH_POLL_MAX_SECONDS = 300
+
+METRICS: Dict[str, int] = {}
+METRICS_LOCK = threading.Lock()
 
 
 @dataclass
@@ -38,6 +106,7 @@ class NewsItem:
     source: str
     published: str
     ts: float
+    alternate_sources: List[str] = field(default_factory=list)
 
 
 @dataclass
@@ -48,6 +117,27 @@ class StudyTopic:
     tags: List[str]
 
 
+@dataclass
+class PostRequest:
+    path: Path
+    categories: List[str]
+    tags: List[str]
+    system_prompt: str
+    user_prompt: str
+    prompt_rules: str
+
+
+@dataclass
+class BackfillJob:
+    day: datetime
+    kind: str
+    topic: Optional[StudyTopic] = None
+
+    @property
+    def job_id(self) -> str:
+        return f"{self.day.strftime('%Y-%m-%d')}_{self.kind}"
+
+
 STUDY_TOPICS: List[StudyTopic] = [
     StudyTopic(
         slug="python",
@@ -106,6 +196,40 @@ STUDY_TOPICS: List[StudyTopic] = [
 ]
 
 
+def record_metric(name: str, value: int = 1) -> None:
+    with METRICS_LOCK:
+        METRICS[name] = METRICS.get(name, 0) + value
+
+
+class PipelineOutput(io.TextIOBase):
+    # Installed as sys.stdout while pipelines run concurrently. Threads that
+    # called capture() write into their own buffer, so the main thread can
+    # print each pipeline's log in a fixed order once it finishes.
+    def __init__(self, stream) -> None:
+        self.stream = stream
+        self.local = threading.local()
+
+    def capture(self) -> None:
+        self.local.buffer = io.StringIO()
+
+    def release(self) -> str:
+        buffer = self.local.__dict__.pop("buffer", None)
+        return buffer.getvalue() if buffer is not None else ""
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self.local, "buffer", None)
+        return (buffer or self.stream).write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+
+PIPELINE_OUTPUT = PipelineOutput(sys.stdout)
+
+
 def now_kst() -> datetime:
     return datetime.now(ZoneInfo("Asia/Seoul"))
 
@@ -127,6 +251,20 @@ def save_state(state: dict) -> None:
     )
 
 
+def atomic_write_json(path: Path, data: dict, compact: bool = False) -> None:
+    # Backfill workers share these files, so readers must never see a
+    # half-written document.
+    if compact:
+        serialized = json.dumps(data, separators=(",", ":"), sort_keys=True)
+    else:
+        serialized = json.dumps(data, indent=2, ensure_ascii=False)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=path.parent, delete=False) as tmp:
+        tmp.write(serialized + "\n")
+        tmp_path = Path(tmp.name)
+    tmp_path.replace(path)
+
+
 def parse_rss_time(entry: dict) -> float:
     for key in ("published_parsed", "updated_parsed"):
         parsed = entry.get(key)
@@ -143,11 +281,211 @@ def parse_rss_time(entry: dict) -> float:
     return 0.0
 
 
-def collect_news_from_feeds(feed_urls: List[str], seen_urls: set) -> List[NewsItem]:
+def normalize_news_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith("utm_") and key.lower() not in TRACKING_QUERY_KEYS
+    ]
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit(("https", host, path, urlencode(query), ""))
+
+
+def news_url_key(url: str) -> str:
+    return hashlib.sha1(normalize_news_url(url).encode("utf-8")).hexdigest()[:16]
+
+
+def load_seen_url_index() -> dict:
+    empty = {"posts": {}, "urls": {}}
+    if not SEEN_URL_INDEX_FILE.exists():
+        return empty
+    try:
+        index = json.loads(SEEN_URL_INDEX_FILE.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return empty
+    if not isinstance(index.get("posts"), dict) or not isinstance(index.get("urls"), dict):
+        return empty
+    return index
+
+
+def save_seen_url_index(index: dict) -> None:
+    atomic_write_json(SEEN_URL_INDEX_FILE, index, compact=True)
+
+
+def cited_url_keys(path: Path) -> Set[str]:
+    return {news_url_key(url.rstrip(".,;")) for url in CITED_URL_PATTERN.findall(path.read_text(encoding="utf-8"))}
+
+
+def refresh_seen_url_index(index: dict, today: datetime) -> int:
+    # Only posts whose mtime changed since the last run are read, and posts and
+    # URLs older than the TTL window are dropped, so the index stays small no
+    # matter how large the archive grows.
+    cutoff = (today - timedelta(days=SEEN_URL_TTL_DAYS)).strftime("%Y-%m-%d")
+    posts: Dict[str, int] = {}
+    urls: Dict[str, str] = {
+        key: date for key, date in index["urls"].items() if date >= cutoff
+    }
+    added = 0
+
+    for path in sorted(POSTS_DIR.glob("*-ai-news-daily.md")):
+        post_date = path.name[:10]
+        if post_date < cutoff:
+            continue
+        mtime = path.stat().st_mtime_ns
+        posts[path.name] = mtime
+        if index["posts"].get(path.name) == mtime:
+            continue
+        for key in cited_url_keys(path):
+            if key not in urls:
+                added += 1
+            if urls.get(key, "") < post_date:
+                urls[key] = post_date
+
+    index["posts"] = posts
+    index["urls"] = urls
+    return added
+
+
+@dataclass
+class BackfillNews:
+    # Shared by all backfill workers: one feed cache, saved once after the
+    # run, and the URLs cited by each news post in the range, read once.
+    feed_cache: FeedCache
+    cited_by_day: Dict[str, Set[str]]
+
+    def cited_before(self, day: datetime) -> Set[str]:
+        # Only posts in the TTL window before the target day count; posts
+        # dated after it did not exist yet on that day.
+        end = day.strftime("%Y-%m-%d")
+        start = (day - timedelta(days=SEEN_URL_TTL_DAYS)).strftime("%Y-%m-%d")
+        cited: Set[str] = set()
+        for post_date, keys in self.cited_by_day.items():
+            if start <= post_date < end:
+                cited |= keys
+        return cited
+
+
+BACKFILL_NEWS: Optional[BackfillNews] = None
+
+
+@contextmanager
+def shared_backfill_news(start: date, end: date):
+    global BACKFILL_NEWS
+    first = (start - timedelta(days=SEEN_URL_TTL_DAYS)).isoformat()
+    cited_by_day = {
+        path.name[:10]: cited_url_keys(path)
+        for path in sorted(POSTS_DIR.glob("*-ai-news-daily.md"))
+        if first <= path.name[:10] <= end.isoformat()
+    }
+    BACKFILL_NEWS = BackfillNews(feed_cache=FeedCache(), cited_by_day=cited_by_day)
+    try:
+        yield BACKFILL_NEWS
+    finally:
+        BACKFILL_NEWS.feed_cache.save()
+        BACKFILL_NEWS = None
+
+
+def drop_cited_items(items: List[NewsItem], cited: Set[str]) -> List[NewsItem]:
+    fresh = [item for item in items if news_url_key(item.url) not in cited]
+    if len(fresh) < len(items):
+        print(f"[INFO] Dropped {len(items) - len(fresh)} news items already cited in recent posts.")
+    return fresh
+
+
+def title_tokens(title: str) -> Set[str]:
+    # Google News appends " - Publisher" to every headline; drop it so the same
+    # story from two outlets compares on the headline alone.
+    title = re.sub(r"\s+[-|\u2013\u2014]\s+[^-|\u2013\u2014]{1,40}$", "", title.strip())
+    tokens = re.findall(r"[a-z0-9]+|[\uac00-\ud7a3]+", title.lower())
+    return {token for token in tokens if token not in TITLE_STOPWORDS}
+
+
+def minhash_signature(tokens: Set[str]) -> List[int]:
+    hashes = [
+        int.from_bytes(hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest(), "big")
+        for token in tokens
+    ]
+    if not hashes:
+        return [MINHASH_PRIME] * MINHASH_PERMUTATIONS
+    return [min((a * h + b) % MINHASH_PRIME for h in hashes) for a, b in MINHASH_SEEDS]
+
+
+def cluster_news_items(items: List[NewsItem]) -> List[NewsItem]:
+    # MinHash signatures of cluster representatives are split into LSH bands;
+    # a headline is only compared with representatives sharing a band bucket
+    # and joins the first one whose exact token Jaccard passes the threshold.
+    # Items must already be in priority order so each representative is the
+    # best item of its cluster. Comparing against representatives only keeps
+    # loosely related headlines from chaining into one cluster.
+    rows = MINHASH_PERMUTATIONS // MINHASH_BANDS
+    buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+    tokens: List[Set[str]] = []
+    representatives: List[NewsItem] = []
+
+    for item in items:
+        item_tokens = title_tokens(item.title)
+        signature = minhash_signature(item_tokens)
+        keys = [
+            (band, tuple(signature[band * rows:(band + 1) * rows]))
+            for band in range(MINHASH_BANDS)
+        ]
+        candidates = sorted({idx for key in keys for idx in buckets.get(key, [])})
+
+        match = None
+        for idx in candidates:
+            union = tokens[idx] | item_tokens
+            if union and len(tokens[idx] & item_tokens) / len(union) >= DUPLICATE_TITLE_JACCARD:
+                match = representatives[idx]
+                break
+
+        if match is None:
+            for key in keys:
+                buckets.setdefault(key, []).append(len(representatives))
+            tokens.append(item_tokens)
+            representatives.append(item)
+        else:
+            # An item can already carry alternates when a merged list is re-clustered.
+            for source in [item.source, *item.alternate_sources]:
+                if source != match.source and source not in match.alternate_sources:
+                    match.alternate_sources.append(source)
+
+    if len(representatives) < len(items):
+        print(f"[INFO] Merged {len(items) - len(representatives)} near-duplicate news headlines.")
+    return representatives
+
+
+def wait_for_feeds(
+    feed_urls: List[str],
+    futures: Dict[str, Future],
+    deadline: float,
+) -> Dict[str, feedparser.FeedParserDict]:
+    feeds: Dict[str, feedparser.FeedParserDict] = {}
+    for feed_url in feed_urls:
+        remaining = max(0.0, deadline - time.monotonic())
+        try:
+            feeds[feed_url] = futures[feed_url].result(timeout=remaining)
+        except FutureTimeoutError:
+            print(f"[WARN] RSS deadline exceeded: {feed_url}")
+        except Exception as exc:
+            print(f"[WARN] RSS fetch failed: {feed_url} ({exc})")
+    return feeds
+
+
+def collect_news_from_feeds(
+    feed_urls: List[str],
+    seen_urls: set,
+    feeds: Dict[str, feedparser.FeedParserDict],
+) -> List[NewsItem]:
     items: List[NewsItem] = []
 
     for feed_url in feed_urls:
-        feed = feedparser.parse(feed_url)
+        feed = feeds.get(feed_url)
+        if feed is None:
+            continue
         source_name = feed.feed.get("title", "Unknown source")
         if getattr(feed, "bozo", False):
             print(f"[WARN] RSS parse issue: {feed_url}")
@@ -159,11 +497,13 @@ def collect_news_from_feeds(feed_urls: List[str], seen_urls: set) -> List[NewsIt
                 continue
 
             seen_urls.add(url)
+            # Aggregators such as Google News name the real publisher per entry.
+            publisher = str((entry.get("source") or {}).get("title", "")).strip()
             items.append(
                 NewsItem(
                     title=title,
                     url=url,
-                    source=source_name,
+                    source=publisher or source_name,
                     published=str(entry.get("published", entry.get("updated", ""))),
                     ts=parse_rss_time(entry),
                 )
@@ -172,18 +512,71 @@ def collect_news_from_feeds(feed_urls: List[str], seen_urls: set) -> List[NewsIt
     return items
 
 
-def fetch_news_items(limit: int = 8, min_items: int = 5) -> List[NewsItem]:
-    seen_urls = set()
-    items = collect_news_from_feeds(PRIMARY_NEWS_FEEDS, seen_urls)
+def news_feeds_for(now: datetime) -> Tuple[List[str], List[str]]:
+    if now.date() >= now_kst().date():
+        return PRIMARY_NEWS_FEEDS, FALLBACK_NEWS_FEEDS
+    next_day = now.date() + timedelta(days=1)
+    query = quote_plus(f"artificial intelligence after:{now.date().isoformat()} before:{next_day.isoformat()}")
+    return [DATED_NEWS_FEED_TEMPLATE.format(query=query)], []
 
-    if len(items) < min_items:
-        print(
-            f"[INFO] Primary news items are low ({len(items)}). "
-            f"Loading fallback feeds..."
+
+def fetch_news_items(now: datetime, limit: int = 8, min_items: int = 5) -> List[NewsItem]:
+    seen_urls = set()
+    shared = BACKFILL_NEWS
+    if shared is not None:
+        cited = shared.cited_before(now)
+        feed_cache = shared.feed_cache
+    else:
+        seen_index = load_seen_url_index()
+        refresh_seen_url_index(seen_index, now)
+        save_seen_url_index(seen_index)
+        cited = set(seen_index["urls"])
+        feed_cache = FeedCache()
+
+    primary_feeds, fallback_feeds = news_feeds_for(now)
+    feed_urls = primary_feeds + fallback_feeds
+    deadline = time.monotonic() + FEED_DEADLINE_SECONDS
+
+    # Fallback feeds are fetched speculatively alongside the primary ones so a
+    # thin primary result never waits for a second round of downloads.
+    executor = ThreadPoolExecutor(max_workers=len(feed_urls))
+    try:
+        futures = {
+            feed_url: executor.submit(
+                feed_cache.fetch,
+                feed_url,
+                timeout=FEED_TIMEOUT_SECONDS,
+                headers={"User-Agent": FEED_USER_AGENT},
+            )
+            for feed_url in feed_urls
+        }
+        feeds = wait_for_feeds(primary_feeds, futures, deadline)
+        collected = drop_cited_items(
+            collect_news_from_feeds(primary_feeds, seen_urls, feeds),
+            cited,
         )
-        items.extend(collect_news_from_feeds(FALLBACK_NEWS_FEEDS, seen_urls))
+        # Near-duplicates are merged before counting, so the fallback decision
+        # sees how many distinct stories the primary feeds actually have.
+        items = cluster_news_items(sorted(collected, key=lambda item: item.ts, reverse=True))
+
+        if len(items) < min_items and fallback_feeds:
+            print(
+                f"[INFO] Primary news items are low ({len(items)}). "
+                f"Using fallback feeds..."
+            )
+            feeds = wait_for_feeds(fallback_feeds, futures, deadline)
+            items.extend(
+                drop_cited_items(
+                    collect_news_from_feeds(fallback_feeds, seen_urls, feeds),
+                    cited,
+                )
+            )
+            items = cluster_news_items(sorted(items, key=lambda item: item.ts, reverse=True))
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+        if shared is None:
+            feed_cache.save()
 
-    items.sort(key=lambda item: item.ts, reverse=True)
     return items[:limit]
 
 
@@ -212,31 +605,264 @@ def parse_json_response(text: str) -> Tuple[str, str]:
     return title, content
 
 
-def call_claude(system_prompt: str, user_prompt: str) -> str:
-    api_key = os.getenv("ANTHROPIC_API_KEY", "").strip()
-    if not api_key:
-        raise RuntimeError("ANTHROPIC_API_KEY is not set")
+def usable_post_output(text: str) -> bool:
+    try:
+        parse_json_response(text)
+    except (ValueError, AttributeError):
+        return False
+    return True
+
 
+def prompt_cache_min_tokens(model: str) -> int:
+    for marker, tokens in PROMPT_CACHE_MIN_TOKENS:
+        if marker in model:
+            return tokens
+    return PROMPT_CACHE_DEFAULT_MIN_TOKENS
+
+
+def claude_system_blocks(system_prompt: str, prompt_rules: str, model: str) -> List[dict]:
+    # The system prompt and the rules are one stable prefix. It is only marked
+    # for caching when it can reach the model's minimum cacheable length; a
+    # shorter block marked cache_control is silently not cached.
+    text = f"{system_prompt}\n\n{prompt_rules}" if prompt_rules else system_prompt
+    block: dict = {"type": "text", "text": text}
+    if len(text) // PROMPT_CHARS_PER_TOKEN >= prompt_cache_min_tokens(model):
+        block["cache_control"] = {"type": "ephemeral"}
+    return [block]
+
+
+def build_claude_payload(system_prompt: str, user_prompt: str, prompt_rules: str = "") -> Tuple[dict, str]:
     model = os.getenv("ANTHROPIC_MODEL", DEFAULT_MODEL).strip() or DEFAULT_MODEL
+    system = claude_system_blocks(system_prompt, prompt_rules, model)
     payload = {
         "model": model,
         "max_tokens": 2200,
         "temperature": 0.4,
-        "system": system_prompt,
+        "system": system,
         "messages": [{"role": "user", "content": user_prompt}],
     }
-    headers = {
+    key = cache_key(model, system, user_prompt, payload["temperature"], payload["max_tokens"])
+    return payload, key
+
+
+def call_claude(system_prompt: str, user_prompt: str, prompt_rules: str = "") -> str:
+    payload, key = build_claude_payload(system_prompt, user_prompt, prompt_rules)
+    return LLM_CACHE.call(key, payload["model"], lambda: request_claude(payload), validate=usable_post_output)
+
+
+class StreamingPostParser:
+    # Incrementally decodes a {"title": "...", "content": "..."} object from
+    # streamed text deltas. Raises ValueError as soon as the stream can no
+    # longer match that schema so the request can be aborted early.
+    FIELDS = ("title", "content")
+    ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+    def __init__(self) -> None:
+        self.fields: Dict[str, str] = {}
+        self.complete = False
+        self.state = "prefix"
+        self.prefix = ""
+        self.key = ""
+        self.buffer: List[str] = []
+        self.escape = ""
+        self.high_surrogate = 0
+
+    def feed(self, delta: str) -> None:
+        for char in delta:
+            self.feed_char(char)
+
+    def feed_char(self, char: str) -> None:
+        state = self.state
+        if state == "prefix":
+            # Allow an optional ```json fence before the object.
+            self.prefix += char
+            stripped = self.prefix.lstrip()
+            if not stripped:
+                return
+            if stripped.startswith("```"):
+                if "\n" in stripped:
+                    fence, rest = stripped.split("\n", 1)
+                    if fence.strip() not in ("```", "```json"):
+                        raise ValueError("unexpected code fence language")
+                    self.prefix = ""
+                    if rest:
+                        self.feed(rest)
+                return
+            if "```".startswith(stripped):
+                return
+            if stripped[0] != "{":
+                raise ValueError("response does not start with a JSON object")
+            self.state = "before_key"
+            self.feed(stripped[1:])
+        elif state == "before_key":
+            if char.isspace():
+                return
+            if char == "}" and self.fields:
+                self.state = "done"
+                self.complete = True
+            elif char == '"':
+                self.state = "key"
+                self.key = ""
+            else:
+                raise ValueError(f"unexpected {char!r} before object key")
+        elif state == "key":
+            if char == '"':
+                if self.key not in self.FIELDS:
+                    raise ValueError(f"unexpected key {self.key!r}")
+                self.state = "colon"
+            else:
+                self.key += char
+        elif state == "colon":
+            if char == ":":
+                self.state = "before_value"
+            elif not char.isspace():
+                raise ValueError("expected ':' after object key")
+        elif state == "before_value":
+            if char == '"':
+                self.state = "value"
+                self.fields[self.key] = ""
+            elif not char.isspace():
+                raise ValueError(f"value of {self.key!r} is not a string")
+        elif state == "value":
+            self.feed_value_char(char)
+        elif state == "after_value":
+            if char == ",":
+                self.state = "before_key"
+            elif char == "}":
+                self.state = "done"
+                self.complete = True
+            elif not char.isspace():
+                raise ValueError(f"unexpected {char!r} after value")
+
+    def feed_value_char(self, char: str) -> None:
+        if self.escape:
+            self.escape += char
+            if self.escape[1] == "u":
+                if len(self.escape) < 6:
+                    return
+                code = int(self.escape[2:], 16)
+                self.escape = ""
+                if 0xD800 <= code < 0xDC00:
+                    self.high_surrogate = code
+                    return
+                if 0xDC00 <= code < 0xE000 and self.high_surrogate:
+                    code = 0x10000 + ((self.high_surrogate - 0xD800) << 10) + (code - 0xDC00)
+                self.high_surrogate = 0
+                self.fields[self.key] += chr(code)
+                return
+            decoded = self.ESCAPES.get(self.escape[1])
+            if decoded is None:
+                raise ValueError(f"invalid escape {self.escape!r}")
+            self.escape = ""
+            self.fields[self.key] += decoded
+        elif char == "\\":
+            self.escape = char
+        elif char == '"':
+            self.state = "after_value"
+        else:
+            self.fields[self.key] += char
+
+
+class RateLimiter:
+    # Token bucket shared by all workers. It refills at requests_per_minute and
+    # is paused outright when the API reports an exhausted budget through its
+    # rate-limit headers or asks us to back off with retry-after.
+    HEADER_KINDS = ("requests", "tokens", "input-tokens", "output-tokens")
+
+    def __init__(self, requests_per_minute: float, burst: int = 1) -> None:
+        self.rate = requests_per_minute / 60.0
+        self.capacity = float(max(1, burst))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                wait = self.blocked_until - now
+                if wait <= 0 and self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = max(wait, (1 - self.tokens) / self.rate)
+            time.sleep(wait)
+
+    def observe(self, response: requests.Response) -> None:
+        headers = response.headers
+        pause = 0.0
+        retry_after = headers.get("retry-after")
+        if retry_after:
+            try:
+                pause = float(retry_after)
+            except ValueError:
+                pass
+
+        for kind in self.HEADER_KINDS:
+            remaining = headers.get(f"anthropic-ratelimit-{kind}-remaining", "")
+            reset = headers.get(f"anthropic-ratelimit-{kind}-reset")
+            try:
+                exhausted = int(remaining) <= 0
+            except ValueError:
+                continue
+            if not reset or not exhausted:
+                continue
+            try:
+                reset_at = datetime.fromisoformat(reset.replace("Z", "+00:00"))
+            except ValueError:
+                continue
+            pause = max(pause, (reset_at - datetime.now(timezone.utc)).total_seconds())
+
+        limit = headers.get("anthropic-ratelimit-requests-limit")
+        with self.lock:
+            if limit and limit.isdigit() and int(limit) > 0:
+                self.rate = min(self.rate, int(limit) / 60.0)
+            if pause > 0:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + pause)
+
+
+RATE_LIMITER: Optional[RateLimiter] = None
+
+
+def post_messages(payload: dict, stream: bool = False) -> requests.Response:
+    for attempt in range(RATE_LIMIT_RETRIES + 1):
+        if RATE_LIMITER:
+            RATE_LIMITER.acquire()
+        response = requests.post(
+            f"{ANTHROPIC_BASE_URL}/v1/messages",
+            headers=anthropic_headers(),
+            json=payload,
+            timeout=120,
+            stream=stream,
+        )
+        if RATE_LIMITER:
+            RATE_LIMITER.observe(response)
+        if response.status_code not in (429, 529) or attempt == RATE_LIMIT_RETRIES:
+            return response
+
+        response.close()
+        record_metric("rate_limited_retries")
+        print(f"[WARN] Anthropic API returned {response.status_code}. Retrying ({attempt + 1}/{RATE_LIMIT_RETRIES})...")
+        if not RATE_LIMITER:
+            time.sleep(float(response.headers.get("retry-after") or 2 ** attempt * 5))
+    return response
+
+
+def anthropic_headers() -> Dict[str, str]:
+    api_key = os.getenv("ANTHROPIC_API_KEY", "").strip()
+    if not api_key:
+        raise RuntimeError("ANTHROPIC_API_KEY is not set")
+    return {
         "x-api-key": api_key,
         "anthropic-version": "2023-06-01",
         "content-type": "application/json",
     }
 
-    response = requests.post(
-        "https://api.anthropic.com/v1/messages",
-        headers=headers,
-        json=payload,
-        timeout=120,
-    )
+
+def send_claude_request(payload: dict) -> dict:
+    response = post_messages(payload)
     if not response.ok:
         raise RuntimeError(f"Anthropic API error: {response.status_code} {response.text}")
 
@@ -246,31 +872,134 @@ def call_claude(system_prompt: str, user_prompt: str) -> str:
         for part in body.get("content", [])
         if part.get("type") == "text"
     ]
-    text = "\n".join(chunks).strip()
+    return {
+        "text": "\n".join(chunks),
+        "stop_reason": body.get("stop_reason"),
+        "usage": body.get("usage") or {},
+    }
+
+
+def stream_claude_request(payload: dict, parser: StreamingPostParser) -> dict:
+    chunks: List[str] = []
+    usage: dict = {}
+    stop_reason = None
+    started = time.monotonic()
+    first_token_at = None
+
+    with post_messages({**payload, "stream": True}, stream=True) as response:
+        if not response.ok:
+            raise RuntimeError(f"Anthropic API error: {response.status_code} {response.text}")
+
+        for line in response.iter_lines(decode_unicode=True):
+            if not line or not line.startswith("data:"):
+                continue
+            event = json.loads(line[5:].strip())
+            event_type = event.get("type")
+            if event_type == "message_start":
+                usage.update((event.get("message") or {}).get("usage") or {})
+            elif event_type == "content_block_delta":
+                delta = event.get("delta") or {}
+                if delta.get("type") != "text_delta":
+                    continue
+                text = delta.get("text", "")
+                if first_token_at is None:
+                    first_token_at = time.monotonic()
+                chunks.append(text)
+                try:
+                    parser.feed(text)
+                except ValueError as exc:
+                    raise RuntimeError(f"Anthropic stream aborted, response does not match schema: {exc}")
+            elif event_type == "message_delta":
+                stop_reason = (event.get("delta") or {}).get("stop_reason") or stop_reason
+                usage.update(event.get("usage") or {})
+            elif event_type == "error":
+                error = event.get("error") or {}
+                raise RuntimeError(f"Anthropic stream error: {error.get('type')} {error.get('message')}")
+            elif event_type == "message_stop":
+                break
+
+    finished = time.monotonic()
+    if first_token_at is not None:
+        output_tokens = int(usage.get("output_tokens") or 0)
+        generation = max(finished - first_token_at, 1e-6)
+        print(
+            f"[INFO] Stream: ttft={first_token_at - started:.2f}s, "
+            f"{output_tokens / generation:.1f} tokens/s, output_tokens={output_tokens}"
+        )
+    return {"text": "".join(chunks), "stop_reason": stop_reason, "usage": usage}
+
+
+def log_usage(usage: dict) -> None:
+    counts = {
+        "input_tokens": int(usage.get("input_tokens") or 0),
+        "cache_write_tokens": int(usage.get("cache_creation_input_tokens") or 0),
+        "cache_read_tokens": int(usage.get("cache_read_input_tokens") or 0),
+        "output_tokens": int(usage.get("output_tokens") or 0),
+    }
+    for name, value in counts.items():
+        record_metric(name, value)
+    print(
+        f"[INFO] Usage: input={counts['input_tokens']}, "
+        f"cache_write={counts['cache_write_tokens']}, "
+        f"cache_read={counts['cache_read_tokens']}, "
+        f"output={counts['output_tokens']}"
+    )
+
+
+def request_claude(payload: dict, partial: str = "") -> str:
+    parser = StreamingPostParser()
+    messages = list(payload["messages"])
+    text = ""
+    if partial:
+        # Continue a response that was truncated elsewhere (e.g. in a batch).
+        parser.feed(partial)
+        text = partial.rstrip()
+        messages = [*payload["messages"], {"role": "assistant", "content": text}]
+        record_metric("continuations")
+
+    for attempt in range(MAX_CONTINUATIONS + 1):
+        request = {**payload, "messages": messages}
+        if STREAM_RESPONSES:
+            result = stream_claude_request(request, parser)
+        else:
+            result = send_claude_request(request)
+        text += result["text"]
+        log_usage(result["usage"])
+        if result["stop_reason"] != "max_tokens":
+            break
+        if attempt == MAX_CONTINUATIONS:
+            print(f"[WARN] Response still truncated after {MAX_CONTINUATIONS} continuations.")
+            break
+
+        # Resume from the partial output instead of regenerating it. The API
+        # rejects an assistant prefill that ends with whitespace.
+        text = text.rstrip()
+        messages = [*payload["messages"], {"role": "assistant", "content": text}]
+        record_metric("continuations")
+        print(f"[INFO] Response hit max_tokens. Requesting continuation {attempt + 1}/{MAX_CONTINUATIONS}...")
+
+    text = text.strip()
     if not text:
         raise RuntimeError("Anthropic API returned empty content")
     return text
 
 
-def build_news_prompt(items: List[NewsItem], today: str) -> str:
-    refs = "\n".join(
-        [
-            f"{idx}. {item.title} | {item.source} | {item.url}"
-            for idx, item in enumerate(items, start=1)
-        ]
-    )
-    return f"""
-Date: {today} (Asia/Seoul)
+NEWS_SYSTEM_PROMPT = (
+    "You are a technical blog writer. "
+    "You return strict JSON exactly matching requested schema."
+)
 
-Write a Korean blog post in Markdown about today's AI news.
-Use only the references below.
-
-References:
-{refs}
+STUDY_SYSTEM_PROMPT = (
+    "You are a senior software engineer writing practical study guides. "
+    "You return strict JSON exactly matching requested schema."
+)
 
+# Static instructions go into the system block with the system prompt; only the
+# short dynamic prompts built below change from call to call.
+NEWS_PROMPT_RULES = """
 Output requirements:
 1) Respond with JSON only.
-2) JSON schema: {{"title":"...","content":"..."}}
+2) JSON schema: {"title":"...","content":"..."}
 3) content must be valid Markdown (no code fences).
 4) Include:
    - short intro
@@ -289,18 +1018,10 @@ Mobile-friendly formatting rules (MUST follow):
 - If any code is included, always use fenced code blocks (```language), never 4-space indent.
 """.strip()
 
-
-def build_study_prompt(topic: StudyTopic, today: str) -> str:
-    return f"""
-Date: {today} (Asia/Seoul)
-Topic: {topic.prompt_topic}
-Category hint: {topic.category}
-
-Write a Korean daily study post in Markdown for developers.
-
+STUDY_PROMPT_RULES = """
 Output requirements:
 1) Respond with JSON only.
-2) JSON schema: {{"title":"...","content":"..."}}
+2) JSON schema: {"title":"...","content":"..."}
 3) content must be valid Markdown (no code fences).
 4) Include:
    - Why this topic matters in real projects
@@ -323,6 +1044,35 @@ Mobile-friendly formatting rules (MUST follow):
 """.strip()
 
 
+def build_news_prompt(items: List[NewsItem], today: str) -> str:
+    refs = "\n".join(
+        [
+            f"{idx}. {item.title} | {item.source} | {item.url}"
+            + (f" | also covered by: {', '.join(item.alternate_sources)}" if item.alternate_sources else "")
+            for idx, item in enumerate(items, start=1)
+        ]
+    )
+    return f"""
+Date: {today} (Asia/Seoul)
+
+Write a Korean blog post in Markdown about today's AI news.
+Use only the references below.
+
+References:
+{refs}
+""".strip()
+
+
+def build_study_prompt(topic: StudyTopic, today: str) -> str:
+    return f"""
+Date: {today} (Asia/Seoul)
+Topic: {topic.prompt_topic}
+Category hint: {topic.category}
+
+Write a Korean daily study post in Markdown for developers.
+""".strip()
+
+
 def quote_yaml(value: str) -> str:
     return value.replace('"', '\\"')
 
@@ -378,98 +1128,479 @@ def write_post_file(
     path.write_text(frontmatter + content.strip() + "\n", encoding="utf-8")
 
 
-def create_news_post(now: datetime) -> bool:
+def news_post_request(now: datetime) -> Optional[PostRequest]:
     date_str = now.strftime("%Y-%m-%d")
     post_path = POSTS_DIR / f"{date_str}-ai-news-daily.md"
     if post_path.exists():
         print(f"Skip news post. Already exists: {post_path.name}")
-        return False
+        return None
 
-    items = fetch_news_items(limit=8)
+    items = fetch_news_items(now, limit=8)
     if not items:
         print("No RSS items found. Skip news post.")
-        return False
+        return None
 
-    system_prompt = (
-        "You are a technical blog writer. "
-        "You return strict JSON exactly matching requested schema."
-    )
-    model_output = call_claude(
-        system_prompt=system_prompt,
-        user_prompt=build_news_prompt(items=items, today=date_str),
-    )
-    title, content = parse_json_response(model_output)
-    categories = ["ai-daily-news"]
-    write_post_file(
+    return PostRequest(
         path=post_path,
-        title=title,
-        now=now,
-        categories=categories,
+        categories=["ai-daily-news"],
         tags=["ai", "news", "automation"],
-        content=content,
+        system_prompt=NEWS_SYSTEM_PROMPT,
+        user_prompt=build_news_prompt(items=items, today=date_str),
+        prompt_rules=NEWS_PROMPT_RULES,
     )
-    print(f"Created: {post_path.name}")
-    print(f"URL: {build_post_url(post_path, now, categories)}")
-    return True
 
 
-def create_study_post(now: datetime, state: dict) -> bool:
-    topic_index = int(state.get("topic_index", 0)) % len(STUDY_TOPICS)
-    topic = STUDY_TOPICS[topic_index]
+def study_post_request(now: datetime, topic: StudyTopic) -> Optional[PostRequest]:
     date_str = now.strftime("%Y-%m-%d")
     post_path = POSTS_DIR / f"{date_str}-study-{topic.slug}.md"
     if post_path.exists():
         print(f"Skip study post. Already exists: {post_path.name}")
-        return False
+        return None
 
-    system_prompt = (
-        "You are a senior software engineer writing practical study guides. "
-        "You return strict JSON exactly matching requested schema."
-    )
-    model_output = call_claude(
-        system_prompt=system_prompt,
+    return PostRequest(
+        path=post_path,
+        categories=[topic.category],
+        tags=["study", *topic.tags, "automation"],
+        system_prompt=STUDY_SYSTEM_PROMPT,
         user_prompt=build_study_prompt(topic=topic, today=date_str),
+        prompt_rules=STUDY_PROMPT_RULES,
     )
+
+
+def publish_post(path: Path, categories: List[str], tags: List[str], now: datetime, model_output: str) -> None:
     title, content = parse_json_response(model_output)
-    categories = [topic.category]
     write_post_file(
-        path=post_path,
+        path=path,
         title=title,
         now=now,
         categories=categories,
-        tags=["study", *topic.tags, "automation"],
+        tags=tags,
         content=content,
     )
+    print(f"Created: {path.name}")
+    print(f"URL: {build_post_url(path, now, categories)}")
+
+
+def generate_post(request: Optional[PostRequest], now: datetime) -> bool:
+    if request is None:
+        return False
+    model_output = call_claude(
+        system_prompt=request.system_prompt,
+        user_prompt=request.user_prompt,
+        prompt_rules=request.prompt_rules,
+    )
+    publish_post(request.path, request.categories, request.tags, now, model_output)
+    return True
+
+
+def create_news_post(now: datetime) -> bool:
+    return generate_post(news_post_request(now), now)
+
+
+def create_study_post(now: datetime, state: dict) -> bool:
+    topic_index = int(state.get("topic_index", 0)) % len(STUDY_TOPICS)
+    if not create_topic_study_post(now, STUDY_TOPICS[topic_index]):
+        return False
     state["topic_index"] = (topic_index + 1) % len(STUDY_TOPICS)
-    print(f"Created: {post_path.name}")
-    print(f"URL: {build_post_url(post_path, now, categories)}")
     return True
 
 
-def main() -> None:
-    POSTS_DIR.mkdir(parents=True, exist_ok=True)
-    state = load_state()
-    now = now_kst()
+def create_topic_study_post(now: datetime, topic: StudyTopic) -> bool:
+    return generate_post(study_post_request(now, topic), now)
 
-    created_news = False
-    created_study = False
-    errors: List[str] = []
 
+def run_pipeline(name: str, func, *args) -> Tuple[bool, str, str]:
+    # Returns (created, error, log). Everything the pipeline prints, including
+    # the traceback of a failure, is returned instead of interleaving with
+    # other workers.
+    PIPELINE_OUTPUT.capture()
     try:
-        created_news = create_news_post(now)
+        created, error = func(*args), ""
     except Exception as exc:
-        errors.append(f"news: {exc}")
-        traceback.print_exc()
+        print(traceback.format_exc(), end="")
+        created, error = False, f"{name}: {exc}"
+    return created, error, PIPELINE_OUTPUT.release()
+
+
+def build_backfill_jobs(start: date, end: date, topic_base: int) -> List[BackfillJob]:
+    # The study topic is derived from the day's offset in the range, so the
+    # same date always gets the same topic no matter which worker runs it or
+    # whether the backfill was resumed.
+    jobs: List[BackfillJob] = []
+    for offset in range((end - start).days + 1):
+        day = start + timedelta(days=offset)
+        post_time = datetime(day.year, day.month, day.day, BACKFILL_POST_HOUR, tzinfo=ZoneInfo("Asia/Seoul"))
+        topic = STUDY_TOPICS[(topic_base + offset) % len(STUDY_TOPICS)]
+        jobs.append(BackfillJob(day=post_time, kind="news"))
+        jobs.append(BackfillJob(day=post_time, kind="study", topic=topic))
+    return jobs
+
+
+def load_backfill_checkpoint(start: date, end: date, topic_base: int) -> dict:
+    checkpoint = {"from": start.isoformat(), "to": end.isoformat(), "topic_base": topic_base, "done": []}
+    if not BACKFILL_CHECKPOINT_FILE.exists():
+        return checkpoint
+    try:
+        saved = json.loads(BACKFILL_CHECKPOINT_FILE.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return checkpoint
+    if saved.get("from") != checkpoint["from"] or saved.get("to") != checkpoint["to"]:
+        print("[INFO] Ignoring backfill checkpoint for a different date range.")
+        return checkpoint
+    print(f"[INFO] Resuming backfill. {len(saved.get('done', []))} jobs already done.")
+    return saved
+
+
+def backfill_post_request(job: BackfillJob) -> Optional[PostRequest]:
+    if job.kind == "news":
+        return news_post_request(job.day)
+    date_str = job.day.strftime("%Y-%m-%d")
+    existing = sorted(POSTS_DIR.glob(f"{date_str}-study-*.md"))
+    if existing:
+        print(f"Skip study post. Already exists: {existing[0].name}")
+        return None
+    return study_post_request(job.day, job.topic)
+
+
+def run_backfill_job(job: BackfillJob) -> bool:
+    return generate_post(backfill_post_request(job), job.day)
+
+
+def run_backfill(start: date, end: date, state: dict, workers: int) -> Tuple[int, List[str]]:
+    topic_base = int(state.get("topic_index", 0)) % len(STUDY_TOPICS)
+    checkpoint = load_backfill_checkpoint(start, end, topic_base)
+    jobs = build_backfill_jobs(start, end, int(checkpoint["topic_base"]))
+    done = set(checkpoint.get("done", []))
+    pending = [job for job in jobs if job.job_id not in done]
+    print(f"Backfill {start} -> {end}: {len(pending)} of {len(jobs)} jobs pending.")
+
+    lock = threading.Lock()
+
+    def work(job: BackfillJob) -> Tuple[bool, str, str]:
+        created, error, log = run_pipeline(job.job_id, run_backfill_job, job)
+        if not error:
+            with lock:
+                done.add(job.job_id)
+                checkpoint["done"] = sorted(done)
+                atomic_write_json(BACKFILL_CHECKPOINT_FILE, checkpoint)
+        return created, error, log
+
+    results = []
+    with shared_backfill_news(start, end), ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        # map() yields in job order, so each job's log is printed as soon as
+        # it and every job before it have finished.
+        for created, error, log in executor.map(work, pending):
+            print(log, end="")
+            results.append((created, error))
+
+    if len(done) == len(jobs):
+        days = (end - start).days + 1
+        state["topic_index"] = (int(checkpoint["topic_base"]) + days) % len(STUDY_TOPICS)
+        save_state(state)
+        BACKFILL_CHECKPOINT_FILE.unlink(missing_ok=True)
+
+    created = sum(1 for created, _ in results if created)
+    return created, [error for _, error in results if error]
+
+
+def batch_api(method: str, url: str, allow: Tuple[int, ...] = (), **kwargs) -> requests.Response:
+    response = requests.request(method, url, headers=anthropic_headers(), timeout=120, **kwargs)
+    if not response.ok and response.status_code not in allow:
+        raise RuntimeError(f"Anthropic batch API error: {response.status_code} {response.text}")
+    return response
 
+
+def load_batch_job() -> Optional[dict]:
+    if not BATCH_JOB_FILE.exists():
+        return None
     try:
-        created_study = create_study_post(now, state)
-    except Exception as exc:
-        errors.append(f"study: {exc}")
-        traceback.print_exc()
+        batch = json.loads(BATCH_JOB_FILE.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return None
+    return batch if isinstance(batch, dict) and batch.get("batch_id") else None
+
+
+def advance_topic(state: dict, topic_base: int, start: date, end: date) -> None:
+    days = (end - start).days + 1
+    state["topic_index"] = (topic_base + days) % len(STUDY_TOPICS)
+    save_state(state)
+
+
+def batch_job_time(job: dict) -> datetime:
+    day = date.fromisoformat(job["date"])
+    return datetime(day.year, day.month, day.day, BACKFILL_POST_HOUR, tzinfo=ZoneInfo("Asia/Seoul"))
+
+
+def publish_cached_job(job: dict, text: str) -> bool:
+    print(f"[INFO] LLM cache hit for {job['path']}. Publishing without a batch request.")
+    publish_post(POSTS_DIR / job["path"], job["categories"], job["tags"], batch_job_time(job), text)
+    return True
+
+
+def submit_batch(start: date, end: date, state: dict) -> Tuple[dict, int, Dict[str, str]]:
+    # Returns (batch, created, errors). Jobs whose post already exists are
+    # skipped and jobs whose prompt is already in LLM_CACHE are published from
+    # it, so a rerun after a partial failure only pays for what is missing.
+    topic_base = int(state.get("topic_index", 0)) % len(STUDY_TOPICS)
+    jobs: Dict[str, dict] = {}
+    requests_body: List[dict] = []
+    created = 0
+    errors: Dict[str, str] = {}
+
+    for job in build_backfill_jobs(start, end, topic_base):
+        request = backfill_post_request(job)
+        if request is None:
+            continue
+        payload, key = build_claude_payload(request.system_prompt, request.user_prompt, request.prompt_rules)
+        entry = {
+            "date": job.day.strftime("%Y-%m-%d"),
+            "path": request.path.name,
+            "categories": request.categories,
+            "tags": request.tags,
+            "cache_key": key,
+            "payload": payload,
+        }
+        cached = LLM_CACHE.get(key) if LLM_CACHE.mode in ("auto", "replay") else None
+        if cached is not None and not usable_post_output(cached):
+            # Never replay a reply that cannot be published; the job goes back
+            # into the batch instead.
+            print(f"[WARN] Discarding unusable cached response for {entry['path']}.")
+            LLM_CACHE.discard(key)
+            cached = None
+        if cached is not None:
+            ok, error, log = run_pipeline(job.job_id, publish_cached_job, entry, cached)
+            print(log, end="")
+            created += int(ok)
+            if error:
+                errors[job.job_id] = error
+            continue
+        if LLM_CACHE.mode == "replay":
+            errors[job.job_id] = f"{job.job_id}: LLM cache miss in replay mode: {key[:12]}"
+            continue
+        requests_body.append({"custom_id": job.job_id, "params": payload})
+        jobs[job.job_id] = entry
+
+    batch = {"from": start.isoformat(), "to": end.isoformat(), "topic_base": topic_base, "jobs": jobs}
+    if not requests_body:
+        return batch, created, errors
+
+    response = batch_api("POST", f"{ANTHROPIC_BASE_URL}/v1/messages/batches", json={"requests": requests_body})
+    batch["batch_id"] = response.json()["id"]
+    # Saved before polling so a crashed run resumes this batch instead of
+    # paying for a second one.
+    atomic_write_json(BATCH_JOB_FILE, batch)
+    print(f"Submitted batch {batch['batch_id']} with {len(requests_body)} requests.")
+    return batch, created, errors
+
+
+def wait_for_batch(batch_id: str) -> Optional[dict]:
+    # Returns None when the batch no longer exists.
+    delay = BATCH_POLL_INITIAL_SECONDS
+    while True:
+        response = batch_api("GET", f"{ANTHROPIC_BASE_URL}/v1/messages/batches/{batch_id}", allow=(404,))
+        if response.status_code == 404:
+            return None
+        status = response.json()
+        counts = status.get("request_counts") or {}
+        print(
+            f"[INFO] Batch {batch_id}: {status.get('processing_status')} "
+            f"(processing={counts.get('processing', 0)}, succeeded={counts.get('succeeded', 0)}, "
+            f"errored={counts.get('errored', 0)})"
+        )
+        if status.get("processing_status") == "ended":
+            return status
+        time.sleep(delay)
+        delay = min(delay * 1.5, BATCH_POLL_MAX_SECONDS)
+
+
+def publish_batch_result(job: dict, result: dict) -> bool:
+    post_path = POSTS_DIR / job["path"]
+    if post_path.exists():
+        print(f"Skip batch result. Already exists: {post_path.name}")
+        return False
+    if result.get("type") != "succeeded":
+        error = (result.get("error") or {}).get("error") or result.get("error") or {}
+        raise RuntimeError(f"batch request {result.get('type')}: {error}")
+
+    message = result.get("message") or {}
+    log_usage(message.get("usage") or {})
+    text = "\n".join(
+        part.get("text", "") for part in message.get("content", []) if part.get("type") == "text"
+    )
+    if message.get("stop_reason") == "max_tokens":
+        print(f"[INFO] Batch result for {post_path.name} hit max_tokens. Continuing synchronously...")
+        text = request_claude(job["payload"], partial=text)
+    text = text.strip()
+    publish_post(post_path, job["categories"], job["tags"], batch_job_time(job), text)
+    # Cached only once it has been published, so a reply that does not parse
+    # is resubmitted on the next run instead of being replayed.
+    LLM_CACHE.put(job["cache_key"], text, model=job["payload"]["model"])
+    return True
+
+
+def finish_batch(batch: dict) -> Tuple[int, Dict[str, str]]:
+    batch_id = batch["batch_id"]
+    status = wait_for_batch(batch_id)
+    created = 0
+    errors: Dict[str, str] = {}
+    missing = set(batch["jobs"])
+
+    if status is None:
+        print(f"[WARN] Batch {batch_id} no longer exists.")
+    else:
+        results_url = status.get("results_url") or f"{ANTHROPIC_BASE_URL}/v1/messages/batches/{batch_id}/results"
+        with requests.get(results_url, headers=anthropic_headers(), timeout=120, stream=True) as response:
+            if response.status_code == 404:
+                # Results are only kept for a limited time after a batch ends.
+                print(f"[WARN] Results for batch {batch_id} are no longer available.")
+            elif not response.ok:
+                raise RuntimeError(f"Anthropic batch results error: {response.status_code} {response.text}")
+            else:
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line:
+                        continue
+                    entry = json.loads(line)
+                    custom_id = entry.get("custom_id", "")
+                    job = batch["jobs"].get(custom_id)
+                    if job is None:
+                        continue
+                    missing.discard(custom_id)
+                    ok, error, log = run_pipeline(custom_id, publish_batch_result, job, entry.get("result") or {})
+                    print(log, end="")
+                    created += int(ok)
+                    if error:
+                        errors[custom_id] = error
+
+    for custom_id in missing:
+        errors[custom_id] = f"{custom_id}: no result in batch {batch_id}"
+    # A finished batch is never resumed. Failed jobs have no post file yet, so
+    # the next run over the range resubmits exactly those.
+    BATCH_JOB_FILE.unlink(missing_ok=True)
+    return created, errors
+
+
+def run_batch_backfill(start: date, end: date, state: dict) -> Tuple[int, List[str]]:
+    created = 0
+    errors: Dict[str, str] = {}
+    batch = load_batch_job()
+    if batch and (batch.get("from"), batch.get("to")) != (start.isoformat(), end.isoformat()):
+        print(
+            f"[INFO] Finishing batch {batch['batch_id']} for {batch.get('from')} -> {batch.get('to')} "
+            f"before submitting {start} -> {end}."
+        )
+        previous_created, previous_errors = finish_batch(batch)
+        created += previous_created
+        errors.update(previous_errors)
+        if not previous_errors:
+            advance_topic(
+                state,
+                int(batch["topic_base"]),
+                date.fromisoformat(batch["from"]),
+                date.fromisoformat(batch["to"]),
+            )
+        batch = None
+
+    range_errors: Dict[str, str] = {}
+    if batch:
+        print(f"[INFO] Resuming batch {batch['batch_id']}.")
+        topic_base = int(batch["topic_base"])
+    else:
+        with shared_backfill_news(start, end):
+            batch, range_created, range_errors = submit_batch(start, end, state)
+        topic_base = int(batch["topic_base"])
+        created += range_created
+        if not batch["jobs"] and not range_created and not range_errors:
+            print("Nothing to submit. All posts in range already exist.")
+            return created, [errors[custom_id] for custom_id in sorted(errors)]
+
+    if batch.get("batch_id"):
+        batch_created, batch_errors = finish_batch(batch)
+        created += batch_created
+        range_errors.update(batch_errors)
+    if not range_errors:
+        advance_topic(state, topic_base, start, end)
+    errors.update(range_errors)
+    return created, [errors[custom_id] for custom_id in sorted(errors)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate the daily AI news and study posts.")
+    cache_mode = parser.add_mutually_exclusive_group()
+    cache_mode.add_argument("--record", action="store_true", help="Always call the API and refresh cached LLM responses")
+    cache_mode.add_argument("--replay", action="store_true", help="Serve cached LLM responses only; never call the API")
+    parser.add_argument("--stream", action="store_true", help="Stream responses and validate the JSON schema as it arrives")
+    parser.add_argument("--from", dest="date_from", type=date.fromisoformat, help="Backfill start date (YYYY-MM-DD)")
+    parser.add_argument("--to", dest="date_to", type=date.fromisoformat, help="Backfill end date, inclusive (default: yesterday)")
+    parser.add_argument("--workers", type=int, default=2, help="Concurrent backfill jobs")
+    parser.add_argument("--rpm", type=float, default=20, help="Backfill request budget per minute")
+    parser.add_argument("--batch", action="store_true", help="Submit the backfill as one Message Batches job")
+    args = parser.parse_args()
+    if args.rpm <= 0:
+        # RateLimiter refills at rpm / 60 per second and divides by it.
+        parser.error("--rpm must be greater than 0")
+    if args.record:
+        LLM_CACHE.mode = "record"
+    elif args.replay:
+        LLM_CACHE.mode = "replay"
+    global STREAM_RESPONSES, RATE_LIMITER
+    if args.stream:
+        STREAM_RESPONSES = True
+
+    sys.stdout = PIPELINE_OUTPUT
+    POSTS_DIR.mkdir(parents=True, exist_ok=True)
+    state = load_state()
+    now = now_kst()
+
+    if args.batch and not args.date_from:
+        parser.error("--batch requires --from")
+
+    if args.date_from:
+        date_to = args.date_to or now.date() - timedelta(days=1)
+        if date_to < args.date_from:
+            parser.error("--to must not be earlier than --from")
+        RATE_LIMITER = RateLimiter(args.rpm, burst=args.workers)
+        if args.batch:
+            created, errors = run_batch_backfill(args.date_from, date_to, state)
+        else:
+            created, errors = run_backfill(args.date_from, date_to, state, args.workers)
+        if METRICS:
+            print("Metrics: " + ", ".join(f"{name}={value}" for name, value in sorted(METRICS.items())))
+        print(f"Backfill created {created} posts.")
+        if errors:
+            print("Generation errors:")
+            for err in errors:
+                print(f"- {err}")
+            raise SystemExit(1)
+        return
+
+    # Each pipeline is dominated by one network-bound LLM call, so they run
+    # side by side. Results and logs are read back in this fixed order to
+    # keep the output deterministic.
+    pipelines = [
+        ("news", create_news_post, (now,)),
+        ("study", create_study_post, (now, state)),
+    ]
+    with ThreadPoolExecutor(max_workers=len(pipelines)) as executor:
+        futures = [
+            (name, executor.submit(run_pipeline, name, func, *func_args))
+            for name, func, func_args in pipelines
+        ]
+        results = {}
+        for name, future in futures:
+            created, error, log = future.result()
+            print(log, end="")
+            results[name] = (created, error)
+
+    created_news = results["news"][0]
+    created_study = results["study"][0]
+    errors = [error for _, error in results.values() if error]
 
     if created_study:
         save_state(state)
 
+    if METRICS:
+        print("Metrics: " + ", ".join(f"{name}={value}" for name, value in sorted(METRICS.items())))
+
     if errors:
         print("Generation errors:")
         for err in errors:
@@ -0,0 +1,204 @@
+"""Build the sharded site search index from _posts/.
+
+Replaces the Liquid-rendered search.json, which shipped the full text of every
+post and was downloaded and parsed on each page load. This script writes a
+compact inverted index to assets/search/ before Jekyll runs:
+
+- meta.json: one [title, url, date, categories, snippet] row per post (newest
+  first) plus the list of shard keys and a version hash for cache busting
+- shard-<key>.json: {term: [doc, weight, doc, weight, ...]} for every term
+  whose first character maps to <key>
+
+Terms are lowercase ASCII words plus character bigrams of Hangul/CJK runs, so
+Korean text matches without a morphological analyzer. Latin terms are sharded
+by first letter and Hangul terms by their first syllable, which keeps every
+term sharing a prefix in one shard (the client expands the word being typed,
+or a lone syllable, as a prefix). Each JSON file also gets a .gz variant,
+which assets/site.js inflates with DecompressionStream; browsers cannot
+inflate brotli there, so no .br is written. assets/site.js fetches meta.json
+on first use and then only the shards a query touches.
+"""
+from __future__ import annotations
+
+import argparse
+import gzip
+import hashlib
+import html
+import json
+import re
+import shutil
+import unicodedata
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+from category_classifier import front_matter_list, read_front_matter
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+POSTS_DIR = ROOT_DIR / "_posts"
+OUTPUT_DIR = ROOT_DIR / "assets" / "search"
+# _config.yml timezone; Jekyll builds default permalinks from the date in it.
+SITE_TZ = timezone(timedelta(hours=9))
+
+TITLE_WEIGHT = 10
+MAX_TERM_FREQUENCY = 20
+SNIPPET_CHARS = 90
+TERM_PATTERN = re.compile(r"[a-z0-9]+|[\uac00-\ud7a3\u3040-\u30ff\u3400-\u9fff]+")
+POST_NAME_PATTERN = re.compile(r"(\d{4})-(\d{2})-(\d{2})-(.+)\.(md|markdown|html)$")
+HANGUL_START = 0xAC00
+HANGUL_END = 0xD7A3
+
+
+def tokenize(text: str) -> list[str]:
+    """Mirrors tokenize() in assets/site.js; keep the two in sync."""
+    terms: list[str] = []
+    for run in TERM_PATTERN.findall(unicodedata.normalize("NFKC", text).lower()):
+        if run[0].isascii():
+            if len(run) >= 2:
+                terms.append(run)
+        elif len(run) == 1:
+            terms.append(run)
+        else:
+            terms.extend(run[i : i + 2] for i in range(len(run) - 1))
+    return terms
+
+
+def shard_key(term: str) -> str:
+    """Mirrors shardKey() in assets/site.js."""
+    first = term[0]
+    if first.isascii():
+        return first
+    code = ord(first)
+    if HANGUL_START <= code <= HANGUL_END:
+        return f"h{code:x}"
+    return "x"
+
+
+def markdown_text(markdown: str) -> str:
+    text = re.sub(r"\{%-?\s*(?:raw|endraw)\s*-?%\}", "", markdown)
+    text = re.sub(r"^```.*$", " ", text, flags=re.MULTILINE)
+    text = re.sub(r"!\[([^\]]*)\]\([^)]*\)", r"\1", text)
+    text = re.sub(r"\[([^\]]*)\]\([^)]*\)", r"\1", text)
+    text = re.sub(r"<[^>]+>", " ", text)
+    text = re.sub(r"^\s{0,3}(?:#{1,6}|>|[-*+]|\d+\.)\s+", "", text, flags=re.MULTILINE)
+    text = re.sub(r"[*_`~|]+", " ", text)
+    return " ".join(html.unescape(text).split())
+
+
+def unquote_title(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] == '"':
+        return re.sub(r'\\(["\\])', r"\1", value[1:-1])
+    if len(value) >= 2 and value[0] == value[-1] == "'":
+        return value[1:-1].replace("''", "'")
+    return value
+
+
+def post_url(path: Path, fields: dict[str, str], published: datetime) -> str:
+    permalink = fields.get("permalink", "").strip("\"'")
+    if permalink:
+        return permalink
+    # Jekyll's default "date" permalink: /:categories/:year/:month/:day/:title.html
+    match = POST_NAME_PATTERN.match(path.name)
+    slug = match.group(4) if match else path.stem
+    categories = [category.lower() for category in front_matter_list(fields.get("categories", ""))]
+    parts = [*dict.fromkeys(categories), published.strftime("%Y"), published.strftime("%m"), published.strftime("%d")]
+    return "/" + "/".join(parts) + f"/{slug}.html"
+
+
+def post_date(path: Path, fields: dict[str, str]) -> datetime:
+    value = fields.get("date", "").strip("\"'")
+    if value:
+        try:
+            return datetime.strptime(value, "%Y-%m-%d %H:%M:%S %z").astimezone(SITE_TZ)
+        except ValueError:
+            pass
+    match = POST_NAME_PATTERN.match(path.name)
+    if not match:
+        raise ValueError(f"cannot determine date for {path.name}")
+    return datetime(int(match.group(1)), int(match.group(2)), int(match.group(3)), tzinfo=SITE_TZ)
+
+
+def load_posts(posts_dir: Path) -> list[dict[str, Any]]:
+    posts = []
+    for path in sorted(posts_dir.glob("*")):
+        if not POST_NAME_PATTERN.match(path.name):
+            continue
+        fields, body = read_front_matter(path.read_text(encoding="utf-8"))
+        if fields.get("published", "").lower() == "false":
+            continue
+        published = post_date(path, fields)
+        # Imported posts open with a "> 원문: <link>" line that says nothing about the post.
+        text = markdown_text(re.sub(r"\A\s*> 원문: .*\n+", "", body))
+        posts.append(
+            {
+                "title": unquote_title(fields.get("title", "")),
+                "url": post_url(path, fields, published),
+                "date": published,
+                "categories": ", ".join(front_matter_list(fields.get("categories", ""))),
+                "text": text,
+            }
+        )
+    # Same order as site.posts: newest first, so lower doc ids are newer.
+    posts.sort(key=lambda post: post["date"], reverse=True)
+    return posts
+
+
+def build_index(posts: list[dict[str, Any]]) -> tuple[list[list[str]], dict[str, dict[str, list[int]]]]:
+    docs = []
+    shards: dict[str, dict[str, list[int]]] = {}
+    for doc_id, post in enumerate(posts):
+        weights: dict[str, int] = {}
+        for term in tokenize(post["text"]):
+            weights[term] = weights.get(term, 0) + 1
+        for term in weights:
+            weights[term] = min(weights[term], MAX_TERM_FREQUENCY)
+        for term in set(tokenize(post["title"])):
+            weights[term] = weights.get(term, 0) + TITLE_WEIGHT
+        for term, weight in weights.items():
+            shards.setdefault(shard_key(term), {}).setdefault(term, []).extend((doc_id, weight))
+        snippet = post["text"][:SNIPPET_CHARS]
+        docs.append([post["title"], post["url"], post["date"].strftime("%Y-%m-%d"), post["categories"], snippet])
+    return docs, shards
+
+
+def write_variants(path: Path, data: bytes) -> None:
+    path.write_bytes(data)
+    # mtime=0 keeps the .gz byte-identical across builds of the same content.
+    path.with_name(path.name + ".gz").write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+
+
+def encode(value: Any) -> bytes:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build the sharded search index under assets/search/")
+    parser.add_argument("--posts", type=Path, default=POSTS_DIR, help="Posts directory")
+    parser.add_argument("--output", type=Path, default=OUTPUT_DIR, help="Output directory (replaced on each build)")
+    args = parser.parse_args()
+
+    posts = load_posts(args.posts)
+    docs, shards = build_index(posts)
+    encoded = {key: encode(dict(sorted(terms.items()))) for key, terms in sorted(shards.items())}
+    version = hashlib.sha256(encode(docs) + b"".join(encoded.values())).hexdigest()[:12]
+
+    if args.output.exists():
+        shutil.rmtree(args.output)
+    args.output.mkdir(parents=True)
+    for key, data in encoded.items():
+        write_variants(args.output / f"shard-{key}.json", data)
+    meta = {"version": version, "shards": sorted(encoded), "docs": docs}
+    write_variants(args.output / "meta.json", encode(meta))
+
+    total = sum(len(data) for data in encoded.values())
+    largest = max(encoded, key=lambda key: len(encoded[key]), default="")
+    print(
+        f"[DONE] {len(docs)} posts, {sum(len(terms) for terms in shards.values())} terms, "
+        f"{len(encoded)} shards ({total / 1024:.0f}KB total, largest {largest}: "
+        f"{len(encoded.get(largest, b'')) / 1024:.0f}KB), version {version}"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
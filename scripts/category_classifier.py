@@ -0,0 +1,107 @@
+"""Rule-driven category classifier for imported posts.
+
+Rules live in category_rules.json as weighted keywords per category. All
+keywords are compiled into a single regex; ASCII keywords only match on word
+boundaries (so "ai" no longer matches "detail" and "java" no longer matches
+"javascript"), while Hangul keywords may be followed by particles. Hits are
+weighted by keyword and by field (title > source category > content), the
+highest score wins, rule order breaks ties, and no hits falls back to the
+default category.
+"""
+from __future__ import annotations
+
+import json
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+RULES_FILE = Path(__file__).resolve().with_name("category_rules.json")
+WORD_CHARS = "a-z0-9"
+
+
+def keyword_pattern(keyword: str) -> str:
+    pattern = re.escape(keyword).replace(r"\ ", r"\s+")
+    if re.match(f"[{WORD_CHARS}]", keyword):
+        pattern = f"(?<![{WORD_CHARS}])" + pattern
+    if re.search(f"[{WORD_CHARS}]$", keyword):
+        pattern += f"(?![{WORD_CHARS}])"
+    return pattern
+
+
+class CategoryClassifier:
+    def __init__(self, rules: dict[str, Any]) -> None:
+        self.default = rules["default"]
+        self.field_weights = rules.get("field_weights", {"title": 1, "category": 1, "content": 1})
+        self.max_hits = int(rules.get("max_hits_per_keyword", 0)) or None
+        self.categories = [rule["category"] for rule in rules["rules"]]
+        self.keywords: dict[str, tuple[int, float]] = {}
+        for order, rule in enumerate(rules["rules"]):
+            for keyword, weight in rule["keywords"].items():
+                self.keywords.setdefault(" ".join(keyword.lower().split()), (order, float(weight)))
+        # Longest keywords first so "자바스크립트" wins over "자바" at the same position.
+        alternatives = sorted(self.keywords, key=len, reverse=True)
+        self.pattern = re.compile("|".join(keyword_pattern(keyword) for keyword in alternatives))
+
+    @classmethod
+    def from_file(cls, path: Path = RULES_FILE) -> "CategoryClassifier":
+        return cls(json.loads(path.read_text(encoding="utf-8")))
+
+    def scores(self, title: str, category: str, content_text: str) -> list[float]:
+        scores = [0.0] * len(self.categories)
+        for field, text in (("title", title), ("category", category), ("content", content_text)):
+            hits: dict[str, int] = {}
+            for match in self.pattern.finditer(" ".join((text or "").lower().split())):
+                keyword = " ".join(match.group(0).split())
+                hits[keyword] = hits.get(keyword, 0) + 1
+            for keyword, count in hits.items():
+                order, weight = self.keywords[keyword]
+                if self.max_hits is not None:
+                    count = min(count, self.max_hits)
+                scores[order] += weight * count * self.field_weights.get(field, 1)
+        return scores
+
+    def classify(self, title: str, category: str, content_text: str) -> str:
+        scores = self.scores(title, category, content_text)
+        best = max(range(len(scores)), key=lambda index: (scores[index], -index))
+        return self.categories[best] if scores[best] > 0 else self.default
+
+
+@lru_cache(maxsize=1)
+def default_classifier() -> CategoryClassifier:
+    return CategoryClassifier.from_file()
+
+
+def classify_category(title: str, category: str, content_text: str) -> str:
+    return default_classifier().classify(title, category, content_text)
+
+
+def read_front_matter(content: str) -> tuple[dict[str, str], str]:
+    if not content.startswith("---\n"):
+        return {}, content
+    _, front_matter, body = content.split("---\n", 2)
+    fields = {}
+    for line in front_matter.splitlines():
+        key, sep, value = line.partition(":")
+        if sep:
+            fields[key.strip()] = value.strip()
+    return fields, body
+
+
+def front_matter_list(value: str) -> list[str]:
+    return [item.strip() for item in value.strip("[]").split(",") if item.strip()]
+
+
+def reclassify_post(path: str, source_category: str) -> tuple[str, str, str, bool]:
+    """Returns (file name, current category, new category, managed) for one post."""
+    post_path = Path(path)
+    fields, body = read_front_matter(post_path.read_text(encoding="utf-8"))
+    categories = front_matter_list(fields.get("categories", ""))
+    current = categories[0] if categories else ""
+    # Only imported posts were categorised by this classifier; generated posts
+    # get their category from the generator and are scored for the report only.
+    managed = "naver-import" in front_matter_list(fields.get("tags", ""))
+    title = fields.get("title", "").strip('"').replace('\\"', '"')
+    # The importer scores the converted Markdown, which starts after the source link line.
+    markdown = re.sub(r"\A\s*> 원문: .*\n+", "", body)
+    return post_path.name, current, classify_category(title, source_category, markdown[:1500]), managed
@@ -0,0 +1,115 @@
+"""Conditional-GET cache for RSS feeds.
+
+Stores ETag / Last-Modified validators together with the parsed feed in
+.automation/feed_cache.json so reruns can send conditional requests and reuse
+the cached entries on 304 without downloading or re-parsing the body.
+"""
+from __future__ import annotations
+
+import json
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import feedparser
+import requests
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+CACHE_FILE = ROOT_DIR / ".automation" / "feed_cache.json"
+
+
+def restore_feed_value(key: str, value: Any) -> Any:
+    if isinstance(value, dict):
+        return feedparser.FeedParserDict({k: restore_feed_value(k, v) for k, v in value.items()})
+    if isinstance(value, list):
+        # struct_time is stored by json as a plain 9-item list.
+        if key.endswith("_parsed") and len(value) == 9 and all(isinstance(v, int) for v in value):
+            return time.struct_time(value)
+        return [restore_feed_value(key, v) for v in value]
+    return value
+
+
+class FeedCache:
+    def __init__(self, path: Path = CACHE_FILE) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.records: dict[str, dict[str, Any]] = {}
+        if path.exists():
+            try:
+                loaded = json.loads(path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                print(f"[WARN] Feed cache is invalid JSON. Ignoring: {path.name}")
+                loaded = {}
+            if isinstance(loaded, dict):
+                self.records = {k: v for k, v in loaded.items() if isinstance(v, dict)}
+
+    def cached_feed(self, feed_url: str) -> feedparser.FeedParserDict | None:
+        record = self.records.get(feed_url)
+        if not record:
+            return None
+        return feedparser.FeedParserDict(
+            feed=restore_feed_value("feed", record.get("feed") or {}),
+            entries=restore_feed_value("entries", record.get("entries") or []),
+            bozo=0,
+            status=304,
+        )
+
+    def fetch(
+        self,
+        feed_url: str,
+        timeout: float = 30,
+        headers: dict[str, str] | None = None,
+    ) -> feedparser.FeedParserDict:
+        request_headers = dict(headers or {})
+        with self.lock:
+            record = self.records.get(feed_url) or {}
+        if record.get("etag"):
+            request_headers["If-None-Match"] = record["etag"]
+        if record.get("modified"):
+            request_headers["If-Modified-Since"] = record["modified"]
+
+        started = time.monotonic()
+        with requests.get(feed_url, timeout=timeout, stream=True, headers=request_headers) as response:
+            if response.status_code == 304:
+                cached = self.cached_feed(feed_url)
+                if cached is not None:
+                    return cached
+            response.raise_for_status()
+            chunks: list[bytes] = []
+            # requests' timeout only bounds each socket read, so a slowly trickling
+            # server is cut off here once the whole body exceeds the feed budget.
+            for chunk in response.iter_content(chunk_size=65536):
+                chunks.append(chunk)
+                if time.monotonic() - started > timeout:
+                    raise RuntimeError(f"feed body exceeded {timeout:.0f}s")
+            etag = response.headers.get("ETag", "")
+            modified = response.headers.get("Last-Modified", "")
+
+        feed = feedparser.parse(b"".join(chunks))
+        if not feed.bozo and (etag or modified):
+            with self.lock:
+                self.records[feed_url] = {
+                    "etag": etag,
+                    "modified": modified,
+                    "fetched_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                    "feed": json.loads(json.dumps(feed.feed, default=str)),
+                    "entries": json.loads(json.dumps(feed.entries, default=str)),
+                }
+                self.dirty = True
+        return feed
+
+    def save(self) -> None:
+        with self.lock:
+            if not self.dirty:
+                return
+            serialized = json.dumps(self.records, ensure_ascii=False) + "\n"
+            self.dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.path.parent, delete=False) as tmp:
+            tmp.write(serialized)
+            tmp_path = Path(tmp.name)
+        tmp_path.replace(self.path)
@@ -0,0 +1,210 @@
+"""Rate-limit-aware GitHub REST client with an on-disk conditional-request cache.
+
+GET responses are stored with their ETag / Last-Modified validators under
+.automation/github_cache/, so repeated calls send conditional requests and a
+304 (which does not count against the quota) is answered from disk.
+
+Requests go through one pooled requests.Session. The client tracks
+X-RateLimit-Remaining / X-RateLimit-Reset per resource (core, search, graphql)
+and slows down before the budget runs out. A primary limit waits for the
+reset and a secondary limit honours Retry-After; waits longer than
+MAX_WAIT_SECONDS raise instead of stalling the job.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import requests
+from requests.adapters import HTTPAdapter
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+CACHE_DIR = ROOT_DIR / ".automation" / "github_cache"
+DEFAULT_MAX_MB = 100
+# Once a resource is down to this many calls, the rest are spread over the window.
+PACE_RESERVE = 5
+MAX_WAIT_SECONDS = 900
+SECONDARY_LIMIT_WAIT_SECONDS = 60
+MAX_RETRIES = 3
+
+
+def rate_limit_resource(url: str) -> str:
+    if "/search/" in url:
+        return "search"
+    if url.rstrip("/").endswith("/graphql"):
+        return "graphql"
+    return "core"
+
+
+class GitHubClient:
+    def __init__(
+        self,
+        user_agent: str,
+        cache_dir: Path = CACHE_DIR,
+        max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024,
+    ) -> None:
+        self.user_agent = user_agent
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.limits: dict[str, tuple[int, float]] = {}
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+
+    def headers(self) -> dict[str, str]:
+        headers = {
+            "Accept": "application/vnd.github+json",
+            "X-GitHub-Api-Version": "2022-11-28",
+            "User-Agent": self.user_agent,
+        }
+        token = os.getenv("GITHUB_TOKEN", "").strip()
+        if token:
+            headers["Authorization"] = f"Bearer {token}"
+        return headers
+
+    def pace(self, resource: str) -> None:
+        with self.lock:
+            state = self.limits.get(resource)
+            if state is None:
+                return
+            remaining, reset_at = state
+            window = reset_at - time.time()
+            if window <= 0:
+                # The window has reset; the next response reports the new budget.
+                del self.limits[resource]
+                return
+            # Count this call up front so concurrent callers see the smaller budget.
+            self.limits[resource] = (remaining - 1, reset_at)
+        if remaining <= 0:
+            wait = window + 1
+        elif remaining <= PACE_RESERVE:
+            wait = window / (remaining + 1)
+        else:
+            return
+        if wait > MAX_WAIT_SECONDS:
+            raise RuntimeError(f"GitHub API rate limit reached ({resource}). Set GITHUB_TOKEN or retry later.")
+        if wait >= 1:
+            print(f"[INFO] GitHub {resource} budget low (remaining={remaining}). Waiting {wait:.0f}s.")
+        time.sleep(wait)
+
+    def observe(self, resource: str, response: requests.Response) -> None:
+        remaining = response.headers.get("X-RateLimit-Remaining")
+        reset = response.headers.get("X-RateLimit-Reset")
+        if remaining is None or reset is None:
+            return
+        try:
+            state = (int(remaining), float(reset))
+        except ValueError:
+            return
+        with self.lock:
+            self.limits[response.headers.get("X-RateLimit-Resource", resource)] = state
+
+    def limit_wait(self, response: requests.Response) -> float | None:
+        """Seconds to wait before retrying a rate-limited response, or None if it is not one."""
+        if response.status_code not in (403, 429):
+            return None
+        retry_after = response.headers.get("Retry-After")
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        if response.headers.get("X-RateLimit-Remaining") == "0":
+            reset = float(response.headers.get("X-RateLimit-Reset") or 0)
+            return max(0.0, reset - time.time()) + 1
+        if "rate limit" in response.text.lower():
+            # Secondary limits without Retry-After: GitHub asks for at least a minute.
+            return SECONDARY_LIMIT_WAIT_SECONDS
+        return None
+
+    def request(self, method: str, url: str, **kwargs: Any) -> requests.Response:
+        resource = rate_limit_resource(url)
+        headers = {**self.headers(), **kwargs.pop("headers", {})}
+        for attempt in range(MAX_RETRIES + 1):
+            self.pace(resource)
+            response = self.session.request(method, url, headers=headers, **kwargs)
+            self.observe(resource, response)
+            wait = self.limit_wait(response)
+            if wait is None:
+                return response
+            response.close()
+            if attempt == MAX_RETRIES or wait > MAX_WAIT_SECONDS:
+                raise RuntimeError("GitHub API rate limit reached. Set GITHUB_TOKEN or retry later.")
+            print(f"[WARN] GitHub rate limited ({response.status_code}). Retrying in {wait:.0f}s.")
+            time.sleep(wait)
+        raise AssertionError("unreachable")
+
+    def cache_path(self, url: str) -> Path:
+        key = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.cache_dir / key[:2] / f"{key}.json"
+
+    def load_cached(self, url: str) -> dict[str, Any] | None:
+        path = self.cache_path(url)
+        try:
+            record = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return record if isinstance(record, dict) and record.get("url") == url else None
+
+    def store(self, url: str, response: requests.Response, body: Any) -> None:
+        etag = response.headers.get("ETag", "")
+        modified = response.headers.get("Last-Modified", "")
+        if not etag and not modified:
+            return
+        path = self.cache_path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        record = {
+            "url": url,
+            "etag": etag,
+            "modified": modified,
+            "fetched_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "body": body,
+        }
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=path.parent, delete=False) as tmp:
+            tmp.write(json.dumps(record, ensure_ascii=False))
+            tmp_path = Path(tmp.name)
+        tmp_path.replace(path)
+        self.evict()
+
+    def evict(self) -> None:
+        with self.lock:
+            entries = []
+            total = 0
+            for path in self.cache_dir.glob("*/*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+    def get_json(self, url: str, timeout: int = 30) -> Any:
+        cached = self.load_cached(url)
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("modified"):
+            headers["If-Modified-Since"] = cached["modified"]
+
+        response = self.request("GET", url, headers=headers, timeout=timeout)
+        if response.status_code == 304 and cached is not None:
+            try:
+                os.utime(self.cache_path(url))
+            except OSError:
+                pass
+            return cached.get("body")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        body = response.json()
+        self.store(url, response, body)
+        return body
@@ -1,21 +1,65 @@
 import argparse
+import hashlib
+import html
+import json
+import os
 import re
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import ExitStack, contextmanager
 from dataclasses import dataclass
 from datetime import datetime, timedelta, timezone
 from email.utils import parsedate_to_datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Iterator, List, Optional
+from urllib.parse import unquote_plus, urlsplit
 
 import feedparser
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, SoupStrainer
 from markdownify import markdownify as md
 
+from category_classifier import classify_category, reclassify_post
+from feed_cache import FeedCache
+from naver_images import SITE_PREFIX, ImageLocalizer
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+try:
+    import lxml  # noqa: F401
+
+    STRAINER_PARSER = "lxml"
+except ImportError:
+    STRAINER_PARSER = "html.parser"
+
 
 ROOT_DIR = Path(__file__).resolve().parents[1]
 POSTS_DIR = ROOT_DIR / "_posts"
+ARCHIVE_CHECKPOINT_FILE = ROOT_DIR / ".automation" / "naver_import_checkpoint.json"
+MANIFEST_FILE = ROOT_DIR / ".automation" / "naver_manifest.json"
 KST = timezone(timedelta(hours=9))
 
+# Overridable so the archive walk can run against a local stand-in server.
+NAVER_BLOG_BASE_URL = os.getenv("NAVER_BLOG_BASE_URL", "https://blog.naver.com").rstrip("/")
+NAVER_MOBILE_BASE_URL = os.getenv("NAVER_MOBILE_BASE_URL", "https://m.blog.naver.com").rstrip("/")
+ARCHIVE_PAGE_SIZE = 30
+
+FETCH_WORKERS = 8
+PER_HOST_CONCURRENCY = 4
+PER_HOST_INTERVAL_SECONDS = 0.25
+
+# "soup" is the original full-page html.parser parse, always available and the
+# default. "strainer" only builds the few elements we read (with lxml when
+# installed) and "selectolax" uses the C lexbor engine. Both fast paths match
+# soup on well-formed SmartEditor pages but repair malformed legacy markup
+# differently (tests/test_naver_extract.py), so they stay opt-in.
+PARSER_BACKENDS = ("auto", "soup", "strainer", "selectolax")
+
 
 @dataclass
 class NaverPost:
@@ -27,6 +71,83 @@ class NaverPost:
     markdown: str
 
 
+@dataclass
+class ListedPost:
+    log_no: str
+    link: str
+    title: str
+    published_at: datetime
+    # Cheap change marker taken from the listing; a refetch happens only when it moves.
+    signal: str = ""
+
+
+class ImportManifest:
+    """Per-logNo record of what was imported: source URL, change signal, content hash,
+    path and whether its images were localized."""
+
+    def __init__(self, path: Path = MANIFEST_FILE) -> None:
+        self.path = path
+        self.dirty = False
+        self.records: dict[str, dict] = {}
+        if path.exists():
+            try:
+                loaded = json.loads(path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                print(f"[WARN] Import manifest is invalid JSON. Ignoring: {path.name}")
+                loaded = {}
+            if isinstance(loaded, dict):
+                self.records = {k: v for k, v in loaded.items() if isinstance(v, dict)}
+
+    def get(self, log_no: str) -> Optional[dict]:
+        return self.records.get(log_no)
+
+    def update(self, log_no: str, **fields: object) -> None:
+        record = self.records.setdefault(log_no, {})
+        if any(record.get(key) != value for key, value in fields.items()):
+            record.update(fields)
+            self.dirty = True
+
+    def save(self) -> None:
+        if not self.dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        ordered = dict(sorted(self.records.items(), key=lambda item: int(item[0]), reverse=True))
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.path.parent, delete=False) as tmp:
+            tmp.write(json.dumps(ordered, ensure_ascii=False, indent=2) + "\n")
+            tmp_path = Path(tmp.name)
+        tmp_path.replace(self.path)
+        self.dirty = False
+
+
+class HostThrottle:
+    """Caps concurrent requests per host and spaces their start times."""
+
+    def __init__(self, max_concurrency: int, min_interval: float) -> None:
+        self.max_concurrency = max_concurrency
+        self.min_interval = min_interval
+        self.lock = threading.Lock()
+        self.semaphores: dict[str, threading.Semaphore] = {}
+        self.next_start: dict[str, float] = {}
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        host = urlsplit(url).netloc
+        with self.lock:
+            semaphore = self.semaphores.setdefault(host, threading.Semaphore(self.max_concurrency))
+        with semaphore:
+            with self.lock:
+                now = time.monotonic()
+                start = max(now, self.next_start.get(host, 0.0))
+                self.next_start[host] = start + self.min_interval
+            if start > now:
+                time.sleep(start - now)
+            yield
+
+
+def short_hash(*parts: str) -> str:
+    return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
 def quote_yaml(value: str) -> str:
     return value.replace('"', '\\"')
 
@@ -98,35 +219,43 @@ def sanitize_markdown(text: str) -> str:
     return text
 
 
-def classify_category(title: str, category: str, content_text: str) -> str:
-    text = f"{title} {category} {content_text}".lower()
-
-    if any(k in text for k in ["elasticsearch", "elastic search", "kafka", "logstash", "kibana"]):
-        return "data-infra"
-    if any(k in text for k in ["oracle", "postgresql", "mysql", "sql ", " sql", "redis"]):
-        return "sql"
-    if any(k in text for k in ["python", "pydantic", "fastapi"]):
-        return "python"
-    if any(k in text for k in ["next.js", "nextjs", "react", "typescript", "javascript", "vue"]):
-        return "nextjs"
-    if any(k in text for k in ["java", "spring", "springboot", "jpa"]):
-        return "java"
-    if any(k in text for k in ["ai", "llm", "chatgpt", "claude", "gpt"]):
-        return "ai-daily-news"
-    return "java"
-
-
-def fetch_post_markdown(blog_id: str, log_no: str) -> tuple[str, str, str]:
-    mobile_url = f"https://m.blog.naver.com/PostView.naver?blogId={blog_id}&logNo={log_no}"
-    response = requests.get(
-        mobile_url,
-        timeout=30,
-        headers={"User-Agent": "Mozilla/5.0"},
-    )
+def fetch_post_html(blog_id: str, log_no: str, throttle: Optional[HostThrottle] = None) -> str:
+    mobile_url = f"{NAVER_MOBILE_BASE_URL}/PostView.naver?blogId={blog_id}&logNo={log_no}"
+    if throttle is None:
+        throttle = HostThrottle(PER_HOST_CONCURRENCY, 0.0)
+    with throttle.slot(mobile_url):
+        response = requests.get(
+            mobile_url,
+            timeout=30,
+            headers={"User-Agent": "Mozilla/5.0"},
+        )
     response.raise_for_status()
+    return response.text
+
+
+def is_wanted_element(name: str, attrs: dict) -> bool:
+    classes = attrs.get("class") or ""
+    if isinstance(classes, list):
+        classes = " ".join(classes)
+    class_set = set(classes.split())
+    if name == "meta":
+        return attrs.get("property") == "og:title"
+    if name == "h3":
+        return "se_textarea" in class_set
+    if name == "div":
+        return bool(class_set & {"blog_category", "se-main-container"}) or attrs.get("id") == "postViewArea"
+    return False
+
+
+def resolve_parser_backend(backend: str) -> str:
+    if backend == "auto":
+        return "selectolax" if LexborHTMLParser is not None else "strainer"
+    if backend == "selectolax" and LexborHTMLParser is None:
+        raise RuntimeError("selectolax is not installed. pip install selectolax or use --parser strainer")
+    return backend
 
-    soup = BeautifulSoup(response.text, "html.parser")
 
+def extract_with_soup(soup: BeautifulSoup) -> tuple[str, str, Optional[str]]:
     title = ""
     og_title = soup.select_one("meta[property='og:title']")
     if og_title and og_title.get("content"):
@@ -145,12 +274,54 @@ def fetch_post_markdown(blog_id: str, log_no: str) -> tuple[str, str, str]:
     if container is None:
         container = soup.select_one("div#postViewArea")
     if container is None:
-        raise RuntimeError(f"본문 컨테이너를 찾지 못했습니다. logNo={log_no}")
+        return title, category, None
 
     for unwanted in container.select("script, style"):
         unwanted.decompose()
+    return title, category, str(container)
+
+
+def extract_with_selectolax(html_text: str) -> tuple[str, str, Optional[str]]:
+    tree = LexborHTMLParser(html_text)
+
+    title = ""
+    og_title = tree.css_first("meta[property='og:title']")
+    if og_title is not None and og_title.attributes.get("content"):
+        title = normalize_ws(og_title.attributes["content"])
+    if not title:
+        heading = tree.css_first("h3.se_textarea")
+        if heading is not None:
+            title = normalize_ws(heading.text(separator=" ", strip=True))
+
+    category = ""
+    category_anchor = tree.css_first("div.blog_category a")
+    if category_anchor is not None:
+        category = normalize_ws(category_anchor.text(separator=" ", strip=True))
+
+    container = tree.css_first("div.se-main-container")
+    if container is None:
+        container = tree.css_first("div#postViewArea")
+    if container is None:
+        return title, category, None
+
+    for unwanted in container.css("script, style"):
+        unwanted.decompose()
+    return title, category, container.html
+
+
+def convert_post_html(html_text: str, log_no: str, backend: str = "soup") -> tuple[str, str, str]:
+    backend = resolve_parser_backend(backend)
+    if backend == "selectolax":
+        title, category, html = extract_with_selectolax(html_text)
+    elif backend == "strainer":
+        soup = BeautifulSoup(html_text, STRAINER_PARSER, parse_only=SoupStrainer(is_wanted_element))
+        title, category, html = extract_with_soup(soup)
+    else:
+        title, category, html = extract_with_soup(BeautifulSoup(html_text, "html.parser"))
+
+    if html is None:
+        raise RuntimeError(f"본문 컨테이너를 찾지 못했습니다. logNo={log_no}")
 
-    html = str(container)
     markdown = md(html, heading_style="ATX")
     markdown = sanitize_markdown(markdown)
 
@@ -160,21 +331,178 @@ def fetch_post_markdown(blog_id: str, log_no: str) -> tuple[str, str, str]:
     return title, category, markdown
 
 
+def fetch_post_markdown(blog_id: str, log_no: str, backend: str = "soup") -> tuple[str, str, str]:
+    return convert_post_html(fetch_post_html(blog_id, log_no), log_no, backend)
+
+
+def chain_conversion(
+    fetch_future: Future,
+    convert_pool: ProcessPoolExecutor,
+    log_no: str,
+    backend: str,
+    save_html_dir: Optional[Path] = None,
+) -> Future:
+    # Hands each downloaded page to the process pool as soon as it arrives, so
+    # HTML-to-Markdown work overlaps with the remaining network fetches.
+    result: Future = Future()
+
+    def copy_result(done: Future) -> None:
+        if done.exception() is not None:
+            result.set_exception(done.exception())
+        else:
+            result.set_result(done.result())
+
+    def on_fetched(done: Future) -> None:
+        if done.exception() is not None:
+            result.set_exception(done.exception())
+            return
+        try:
+            if save_html_dir is not None:
+                (save_html_dir / f"{log_no}.html").write_text(done.result(), encoding="utf-8")
+            convert_pool.submit(convert_post_html, done.result(), log_no, backend).add_done_callback(copy_result)
+        except Exception as exc:
+            result.set_exception(exc)
+
+    fetch_future.add_done_callback(on_fetched)
+    return result
+
+
 def load_entries(blog_id: str) -> List[feedparser.FeedParserDict]:
     rss_url = f"https://rss.blog.naver.com/{blog_id}.xml"
-    feed = feedparser.parse(rss_url)
+    feed_cache = FeedCache()
+    feed = feed_cache.fetch(rss_url, timeout=30, headers={"User-Agent": "Mozilla/5.0"})
+    feed_cache.save()
     if feed.bozo:
         raise RuntimeError(f"RSS 파싱 실패: {feed.bozo_exception}")
     return list(feed.entries)
 
 
-def write_post(post: NaverPost, blog_id: str) -> Path:
-    date_prefix = post.published_at.strftime("%Y-%m-%d")
-    filename = f"{date_prefix}-naver-{post.log_no}.md"
-    path = POSTS_DIR / filename
-
+def rss_listed_posts(blog_id: str) -> List[ListedPost]:
+    posts = []
+    for entry in load_entries(blog_id):
+        link = str(entry.get("link", "")).strip()
+        log_no = extract_log_no(link) or ""
+        published_raw = str(entry.get("published", ""))
+        published_at = parse_date(published_raw) if log_no else datetime.now(KST)
+        title = str(entry.get("title", ""))
+        signal = short_hash(published_raw, str(entry.get("updated", "")), title, str(entry.get("summary", "")))
+        posts.append(ListedPost(log_no, link, title, published_at, signal))
+    return posts
+
+
+def parse_add_date(raw: str, now: datetime) -> datetime:
+    raw = normalize_ws(raw)
+    match = re.fullmatch(r"(\d{4})\.\s*(\d{1,2})\.\s*(\d{1,2})\.?", raw)
+    if match:
+        year, month, day = (int(part) for part in match.groups())
+        return datetime(year, month, day, tzinfo=KST)
+    # Posts from the last day are listed as "5분 전" / "3시간 전" instead of a date.
+    match = re.fullmatch(r"(\d+)\s*(초|분|시간|일)\s*전", raw)
+    if match:
+        amount = int(match.group(1))
+        unit = {"초": "seconds", "분": "minutes", "시간": "hours", "일": "days"}[match.group(2)]
+        return (now - timedelta(**{unit: amount})).replace(second=0, microsecond=0)
+    if raw.startswith("방금"):
+        return now.replace(second=0, microsecond=0)
+    raise ValueError(f"Unknown addDate format: {raw!r}")
+
+
+def parse_post_list_page(text: str, blog_id: str, now: datetime) -> tuple[List[ListedPost], int]:
+    # PostTitleListAsync escapes quotes as \' which is not valid JSON.
+    data = json.loads(text.replace("\\'", "'"))
+    if data.get("resultCode") not in (None, "S"):
+        raise RuntimeError(f"글 목록 조회 실패: {data.get('resultMessage') or data.get('resultCode')}")
+    posts = []
+    for item in data.get("postList") or []:
+        log_no = str(item.get("logNo", "")).strip()
+        if not log_no.isdigit():
+            continue
+        title = normalize_ws(html.unescape(unquote_plus(str(item.get("title", "")))))
+        add_date = str(item.get("addDate", ""))
+        try:
+            published_at = parse_add_date(add_date, now)
+        except ValueError as exc:
+            # One odd entry must not abort the walk; the rest of the page still imports.
+            print(f"[SKIP] {log_no}: {exc}")
+            continue
+        posts.append(
+            ListedPost(
+                log_no=log_no,
+                link=f"https://blog.naver.com/{blog_id}/{log_no}",
+                title=title,
+                published_at=published_at,
+                # Relative dates ("3시간 전") change on every call, so only the title counts then.
+                signal=short_hash(title, add_date if "전" not in add_date else ""),
+            )
+        )
+    return posts, int(data.get("totalCount") or 0)
+
+
+def fetch_post_list_page(blog_id: str, page: int, throttle: HostThrottle) -> str:
+    list_url = f"{NAVER_BLOG_BASE_URL}/PostTitleListAsync.naver"
+    params = {
+        "blogId": blog_id,
+        "viewdate": "",
+        "currentPage": page,
+        "categoryNo": 0,
+        "parentCategoryNo": "",
+        "countPerPage": ARCHIVE_PAGE_SIZE,
+    }
+    with throttle.slot(list_url):
+        response = requests.get(list_url, params=params, timeout=30, headers={"User-Agent": "Mozilla/5.0"})
+    response.raise_for_status()
+    return response.text
+
+
+def iter_archive_pages(blog_id: str, start_page: int, throttle: HostThrottle) -> Iterator[tuple[int, List[ListedPost]]]:
+    """Walks the blog's full post list newest-first, one page at a time."""
+    page = start_page
+    while True:
+        posts, total = parse_post_list_page(fetch_post_list_page(blog_id, page, throttle), blog_id, datetime.now(KST))
+        if not posts:
+            return
+        yield page, posts
+        if page * ARCHIVE_PAGE_SIZE >= total:
+            return
+        page += 1
+
+
+def load_archive_checkpoint(blog_id: str) -> dict:
+    checkpoint = {"blog_id": blog_id, "page": 1, "cursor_log_no": "", "failed": []}
+    if not ARCHIVE_CHECKPOINT_FILE.exists():
+        return checkpoint
+    try:
+        saved = json.loads(ARCHIVE_CHECKPOINT_FILE.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return checkpoint
+    if saved.get("blog_id") != blog_id:
+        print("[INFO] Ignoring archive checkpoint for a different blog.")
+        return checkpoint
+    print(f"[INFO] Resuming archive import at page {saved.get('page')} (older than logNo {saved.get('cursor_log_no')}).")
+    return saved
+
+
+def save_archive_checkpoint(checkpoint: dict) -> None:
+    ARCHIVE_CHECKPOINT_FILE.parent.mkdir(parents=True, exist_ok=True)
+    checkpoint["updated_at"] = datetime.now(KST).isoformat(timespec="seconds")
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=ARCHIVE_CHECKPOINT_FILE.parent, delete=False) as tmp:
+        tmp.write(json.dumps(checkpoint, ensure_ascii=False, indent=2) + "\n")
+        tmp_path = Path(tmp.name)
+    tmp_path.replace(ARCHIVE_CHECKPOINT_FILE)
+
+
+def existing_post_files() -> dict[str, Path]:
+    existing = {}
+    for path in POSTS_DIR.glob("*-naver-*.md"):
+        log_no = path.stem.rsplit("-naver-", 1)[-1]
+        if log_no.isdigit():
+            existing[log_no] = path
+    return existing
+
+
+def render_post(post: NaverPost, blog_id: str) -> str:
     source_url = f"https://blog.naver.com/{blog_id}/{post.log_no}"
-    content = (
+    return (
         "---\n"
         "layout: post\n"
         f'title: "{quote_yaml(post.title)}"\n'
@@ -187,65 +515,390 @@ def write_post(post: NaverPost, blog_id: str) -> Path:
         f"{post.markdown}\n"
     )
 
-    path.write_text(content, encoding="utf-8")
+
+def write_post(post: NaverPost, blog_id: str, path: Optional[Path] = None) -> Path:
+    if path is None:
+        date_prefix = post.published_at.strftime("%Y-%m-%d")
+        path = POSTS_DIR / f"{date_prefix}-naver-{post.log_no}.md"
+    path.write_text(render_post(post, blog_id), encoding="utf-8")
     return path
 
 
-def run(blog_id: str, limit: int, skip_existing: bool) -> None:
-    POSTS_DIR.mkdir(parents=True, exist_ok=True)
-    entries = load_entries(blog_id)
-    if limit > 0:
-        entries = entries[:limit]
+def front_matter_date(path: Path) -> Optional[datetime]:
+    for line in path.read_text(encoding="utf-8").splitlines()[:12]:
+        if line.startswith("date:"):
+            try:
+                return datetime.strptime(line[5:].strip(), "%Y-%m-%d %H:%M:%S %z")
+            except ValueError:
+                return None
+    return None
+
+
+class Importer:
+    """Runs listed posts through the shared fetch -> convert -> write pipeline."""
+
+    def __init__(
+        self,
+        blog_id: str,
+        skip_existing: bool,
+        fetch_pool: ThreadPoolExecutor,
+        convert_pool: ProcessPoolExecutor,
+        parser_backend: str,
+        save_html_dir: Optional[Path],
+        localizer: Optional[ImageLocalizer] = None,
+        localize_images: bool = False,
+    ) -> None:
+        self.blog_id = blog_id
+        self.skip_existing = skip_existing
+        self.fetch_pool = fetch_pool
+        self.convert_pool = convert_pool
+        self.parser_backend = parser_backend
+        self.save_html_dir = save_html_dir
+        self.localizer = localizer
+        self.localize_images = localize_images
+        self.throttle = HostThrottle(PER_HOST_CONCURRENCY, PER_HOST_INTERVAL_SECONDS)
+        self.existing = existing_post_files()
+        self.manifest = ImportManifest()
+        self.imported = 0
+        self.unchanged = 0
+        self.skipped = 0
+
+    def known_record(self, listed: ListedPost) -> Optional[dict]:
+        record = self.manifest.get(listed.log_no)
+        if record and (ROOT_DIR / record.get("path", "")).is_file():
+            return record
+        existing_path = self.existing.get(listed.log_no)
+        if existing_path is None or not existing_path.is_file():
+            return None
+        # Posts imported before the manifest existed are adopted as-is with the
+        # current signal, so introducing the manifest does not trigger a refetch.
+        published_at = front_matter_date(existing_path) or listed.published_at
+        self.manifest.update(
+            listed.log_no,
+            source_url=listed.link,
+            signal=listed.signal,
+            content_hash=hashlib.sha256(existing_path.read_bytes()).hexdigest(),
+            path=existing_path.relative_to(ROOT_DIR).as_posix(),
+            published_at=published_at.isoformat(),
+        )
+        return self.manifest.get(listed.log_no)
+
+    def was_localized(self, record: dict) -> bool:
+        if "images_localized" in record:
+            return bool(record["images_localized"])
+        # Records written before the flag existed: look at the file itself.
+        return f'src="{SITE_PREFIX}/' in (ROOT_DIR / record["path"]).read_text(encoding="utf-8")
+
+    def import_batch(self, posts: List[ListedPost]) -> List[str]:
+        """Imports one batch and returns the logNos that failed."""
+        # Every page in the batch is scheduled up front; results are then
+        # consumed in list order so the report reads exactly like a serial run.
+        plan: list[tuple] = []
+        for listed in posts:
+            if not listed.log_no:
+                plan.append(("skip", f"[SKIP] logNo 파싱 실패: {listed.link}"))
+                continue
+            record = self.known_record(listed)
+            if self.skip_existing and record is not None and record.get("signal") == listed.signal:
+                plan.append(("unchanged", f"[SKIP] 변경 없음: {Path(record['path']).name}"))
+                continue
+
+            fetch_future = self.fetch_pool.submit(fetch_post_html, self.blog_id, listed.log_no, self.throttle)
+            converted = chain_conversion(
+                fetch_future, self.convert_pool, listed.log_no, self.parser_backend, self.save_html_dir
+            )
+            # A post that was localized once stays localized; re-syncing it
+            # without --localize-images must not put the hotlinks back.
+            localize = self.localize_images or (record is not None and self.was_localized(record))
+            if localize and self.localizer is not None:
+                # Start image downloads as soon as a post is converted so they
+                # overlap with the posts still being fetched.
+                converted.add_done_callback(self.schedule_images)
+            plan.append(("post", listed, converted, record, localize))
+
+        failed = []
+        for item in plan:
+            if item[0] in ("skip", "unchanged"):
+                print(item[1])
+                if item[0] == "skip":
+                    self.skipped += 1
+                else:
+                    self.unchanged += 1
+                continue
+
+            _, listed, future, record, localize = item
+            try:
+                title, source_category, markdown = future.result()
+                mapped_category = classify_category(title, source_category, markdown[:1500])
+                if localize:
+                    if self.localizer is None:
+                        raise RuntimeError("images were localized before; refusing to write hotlinked images")
+                    markdown = self.localizer.rewrite(markdown)
+                # A re-sync keeps the original timestamp and file name; list pages
+                # only know the day a post was written.
+                published_at = listed.published_at
+                path = None
+                if record is not None:
+                    published_at = datetime.fromisoformat(record["published_at"])
+                    path = ROOT_DIR / record["path"]
+                post = NaverPost(
+                    log_no=listed.log_no,
+                    title=title or listed.title or f"Naver Post {listed.log_no}",
+                    link=listed.link,
+                    category=mapped_category,
+                    published_at=published_at,
+                    markdown=markdown,
+                )
+                content_hash = hashlib.sha256(render_post(post, self.blog_id).encode("utf-8")).hexdigest()
+                if record is not None and record.get("content_hash") == content_hash:
+                    self.manifest.update(listed.log_no, signal=listed.signal)
+                    self.unchanged += 1
+                    print(f"[SAME] {path.name}")
+                    continue
+                path = write_post(post, blog_id=self.blog_id, path=path)
+                self.existing[post.log_no] = path
+                self.manifest.update(
+                    listed.log_no,
+                    source_url=listed.link,
+                    signal=listed.signal,
+                    content_hash=content_hash,
+                    path=path.relative_to(ROOT_DIR).as_posix(),
+                    published_at=published_at.isoformat(),
+                    source_category=source_category,
+                    images_localized=localize,
+                )
+                self.imported += 1
+                print(f"[OK] {path.name} ({mapped_category})")
+            except Exception as exc:
+                self.skipped += 1
+                failed.append(listed.log_no)
+                print(f"[SKIP] {listed.log_no}: {exc}")
+        self.manifest.save()
+        if self.localizer is not None:
+            self.localizer.save()
+        return failed
+
+    def schedule_images(self, converted: Future) -> None:
+        if converted.exception() is None:
+            self.localizer.schedule_markdown(converted.result()[2])
+
+    def localize_existing(self) -> None:
+        """Rewrites hotlinked images in already imported posts to local copies."""
+        posts = sorted(self.existing.items())
+        for _, path in posts:
+            self.localizer.schedule_markdown(path.read_text(encoding="utf-8"))
+
+        for log_no, path in posts:
+            content = path.read_text(encoding="utf-8")
+            _, front_matter, body = content.split("---\n", 2)
+            localized = f"---\n{front_matter}---\n{self.localizer.rewrite(body)}"
+            if self.manifest.get(log_no):
+                self.manifest.update(log_no, images_localized=True)
+            if localized == content:
+                self.unchanged += 1
+                continue
+            path.write_text(localized, encoding="utf-8")
+            if self.manifest.get(log_no):
+                self.manifest.update(log_no, content_hash=hashlib.sha256(localized.encode("utf-8")).hexdigest())
+            self.imported += 1
+            print(f"[OK] {path.name} (images localized)")
+        self.manifest.save()
+        self.localizer.save()
+
+
+def listed_to_checkpoint(listed: ListedPost) -> dict:
+    return {
+        "log_no": listed.log_no,
+        "link": listed.link,
+        "title": listed.title,
+        "published_at": listed.published_at.isoformat(),
+        "signal": listed.signal,
+    }
+
+
+def listed_from_checkpoint(entry: dict) -> ListedPost:
+    return ListedPost(
+        log_no=entry["log_no"],
+        link=entry["link"],
+        title=entry.get("title", ""),
+        published_at=datetime.fromisoformat(entry["published_at"]),
+        signal=entry.get("signal", ""),
+    )
 
-    imported = 0
-    skipped = 0
 
-    for entry in entries:
-        link = str(entry.get("link", "")).strip()
-        log_no = extract_log_no(link)
-        if not log_no:
-            print(f"[SKIP] logNo 파싱 실패: {link}")
-            skipped += 1
+def import_archive(importer: Importer, limit: int, restart: bool) -> None:
+    checkpoint = load_archive_checkpoint(importer.blog_id)
+    if restart:
+        checkpoint = {"blog_id": importer.blog_id, "page": 1, "cursor_log_no": "", "failed": []}
+    # Failed posts sit above the cursor, so the walk never reaches them again;
+    # they are retried first and stay in the checkpoint until they succeed.
+    failed = {
+        entry["log_no"]: listed_from_checkpoint(entry)
+        for entry in checkpoint.get("failed", [])
+        if isinstance(entry, dict) and entry.get("log_no")
+    }
+    if failed:
+        retry = sorted(failed.values(), key=lambda post: int(post.log_no), reverse=True)
+        print(f"[INFO] Retrying {len(retry)} previously failed posts.")
+        still_failed = set(importer.import_batch(retry))
+        failed = {log_no: post for log_no, post in failed.items() if log_no in still_failed}
+        checkpoint["failed"] = [listed_to_checkpoint(post) for post in failed.values()]
+        save_archive_checkpoint(checkpoint)
+
+    cursor = int(checkpoint.get("cursor_log_no") or 0)
+    # Resume one page early: deleted posts shift the listing towards page 1.
+    # Anything at or above the cursor was already handled by the killed run.
+    start_page = max(1, int(checkpoint.get("page") or 1) - 1) if cursor else 1
+    remaining = limit if limit > 0 else None
+
+    for page, posts in iter_archive_pages(importer.blog_id, start_page, importer.throttle):
+        if cursor:
+            posts = [post for post in posts if int(post.log_no) < cursor]
+        if remaining is not None:
+            posts = posts[:remaining]
+        if not posts:
             continue
 
-        published_raw = str(entry.get("published", ""))
-        published_at = parse_date(published_raw)
-        expected_path = POSTS_DIR / f"{published_at.strftime('%Y-%m-%d')}-naver-{log_no}.md"
-        if skip_existing and expected_path.exists():
-            print(f"[SKIP] 이미 존재: {expected_path.name}")
-            skipped += 1
+        listed = {post.log_no: post for post in posts}
+        for log_no in importer.import_batch(posts):
+            failed[log_no] = listed[log_no]
+        cursor = min(int(post.log_no) for post in posts)
+        checkpoint["page"] = page
+        checkpoint["cursor_log_no"] = str(cursor)
+        checkpoint["failed"] = [listed_to_checkpoint(post) for post in failed.values()]
+        save_archive_checkpoint(checkpoint)
+
+        if remaining is not None:
+            remaining -= len(posts)
+            if remaining <= 0:
+                print(f"[INFO] Limit reached. Next run resumes after logNo {cursor}.")
+                return
+
+    if failed:
+        # The checkpoint is kept so the next run retries these before walking on.
+        print(f"[WARN] Archive walk finished with failed logNos: {', '.join(sorted(failed))}. Rerun to retry them.")
+        return
+    ARCHIVE_CHECKPOINT_FILE.unlink(missing_ok=True)
+
+
+def reclassify(apply: bool, workers: int = 0) -> int:
+    """Re-scores every post with the current rules and reports category changes."""
+    manifest = ImportManifest()
+    log_nos = {path: log_no for log_no, path in existing_post_files().items()}
+    paths = sorted(POSTS_DIR.glob("*.md"))
+    sources = []
+    for path in paths:
+        record = manifest.get(log_nos.get(path, "")) or {}
+        sources.append(record.get("source_category", ""))
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        results = list(pool.map(reclassify_post, map(str, paths), sources, chunksize=32))
+
+    changed = 0
+    drift = 0
+    for path, (name, current, new, managed) in zip(paths, results):
+        if current == new:
             continue
+        if not managed:
+            drift += 1
+            continue
+        changed += 1
+        print(f"[CHANGE] {name}: {current} -> {new}")
+        if apply:
+            content = path.read_text(encoding="utf-8")
+            updated = content.replace(f"categories: [{current}, ", f"categories: [{new}, ", 1)
+            path.write_text(updated, encoding="utf-8")
+            log_no = log_nos.get(path)
+            if log_no and manifest.get(log_no):
+                manifest.update(log_no, content_hash=hashlib.sha256(updated.encode("utf-8")).hexdigest())
+    manifest.save()
+
+    print(f"Done. scored={len(paths)}, changed={changed}, applied={changed if apply else 0}, unmanaged_mismatch={drift}")
+    return 1 if changed and not apply else 0
+
+
+def run(
+    blog_id: str,
+    limit: int,
+    skip_existing: bool,
+    fetch_workers: int = FETCH_WORKERS,
+    convert_workers: int = 0,
+    parser_backend: str = "soup",
+    save_html_dir: Optional[Path] = None,
+    archive: bool = False,
+    restart: bool = False,
+    localize_images: bool = False,
+    localize_existing: bool = False,
+) -> None:
+    POSTS_DIR.mkdir(parents=True, exist_ok=True)
+    parser_backend = resolve_parser_backend(parser_backend)
+    if save_html_dir is not None:
+        save_html_dir.mkdir(parents=True, exist_ok=True)
+
+    with ThreadPoolExecutor(max_workers=max(1, fetch_workers)) as fetch_pool, ProcessPoolExecutor(
+        max_workers=convert_workers or os.cpu_count() or 1
+    ) as convert_pool, ExitStack() as stack:
+        # Always available: posts recorded as localized are re-synced with local
+        # images even without --localize-images. Nothing is downloaded unless used.
+        localizer = stack.enter_context(ImageLocalizer(workers=fetch_workers))
+        importer = Importer(
+            blog_id,
+            skip_existing,
+            fetch_pool,
+            convert_pool,
+            parser_backend,
+            save_html_dir,
+            localizer,
+            localize_images=localize_images,
+        )
+        localizer.throttle = importer.throttle
+        if localize_existing:
+            importer.localize_existing()
+        elif archive:
+            import_archive(importer, limit, restart)
+        else:
+            posts = rss_listed_posts(blog_id)
+            if limit > 0:
+                posts = posts[:limit]
+            importer.import_batch(posts)
 
-        try:
-            title, source_category, markdown = fetch_post_markdown(blog_id, log_no)
-            mapped_category = classify_category(title, source_category, markdown[:1500])
-            post = NaverPost(
-                log_no=log_no,
-                title=title or str(entry.get("title", f"Naver Post {log_no}")),
-                link=link,
-                category=mapped_category,
-                published_at=published_at,
-                markdown=markdown,
-            )
-            path = write_post(post, blog_id=blog_id)
-            imported += 1
-            print(f"[OK] {path.name} ({mapped_category})")
-        except Exception as exc:
-            skipped += 1
-            print(f"[SKIP] {log_no}: {exc}")
-
-    print(f"Done. imported={imported}, skipped={skipped}")
+    print(f"Done. imported={importer.imported}, unchanged={importer.unchanged}, skipped={importer.skipped}")
 
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Import Naver blog posts into Jekyll markdown files.")
     parser.add_argument("--blog-id", default="qoxmfaktmxj")
-    parser.add_argument("--limit", type=int, default=0, help="0 means all entries from RSS")
+    parser.add_argument("--limit", type=int, default=0, help="0 means all entries from RSS (or the whole archive)")
     parser.add_argument("--no-skip-existing", action="store_true")
+    parser.add_argument("--workers", type=int, default=FETCH_WORKERS, help="Concurrent page fetches")
+    parser.add_argument("--convert-workers", type=int, default=0, help="HTML-to-Markdown processes (0 means CPU count)")
+    parser.add_argument("--parser", choices=PARSER_BACKENDS, default="soup", help="HTML extraction backend")
+    parser.add_argument("--save-html", type=Path, help="Also save fetched mobile pages here (benchmark fixtures)")
+    parser.add_argument("--archive", action="store_true", help="Walk the full post list instead of the RSS window")
+    parser.add_argument("--restart", action="store_true", help="Ignore the archive checkpoint and start from page 1")
+    parser.add_argument("--localize-images", action="store_true", help="Copy images into assets/naver/ and link them locally")
+    parser.add_argument(
+        "--localize-existing", action="store_true", help="Only localize images in already imported posts, then exit"
+    )
+    parser.add_argument(
+        "--reclassify", action="store_true", help="Re-score all posts and report category changes (exit 1 if any)"
+    )
+    parser.add_argument("--apply", action="store_true", help="With --reclassify, rewrite changed categories")
     args = parser.parse_args()
 
+    if args.reclassify:
+        raise SystemExit(reclassify(apply=args.apply, workers=args.convert_workers))
+
     run(
         blog_id=args.blog_id,
         limit=args.limit,
         skip_existing=not args.no_skip_existing,
+        fetch_workers=args.workers,
+        convert_workers=args.convert_workers,
+        parser_backend=args.parser,
+        save_html_dir=args.save_html,
+        archive=args.archive,
+        restart=args.restart,
+        localize_images=args.localize_images,
+        localize_existing=args.localize_existing,
     )
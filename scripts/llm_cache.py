@@ -0,0 +1,145 @@
+"""Content-addressed disk cache for LLM responses.
+
+Responses are keyed by a hash of (model, system, prompt, temperature,
+max_tokens) and stored under .automation/llm_cache/. Modes:
+
+- auto: serve cached responses, call the API on a miss and store the result
+- record: always call the API and overwrite the cached response
+- replay: serve cached responses only; a miss raises LLMCacheMiss
+- off: bypass the cache entirely
+
+Callers pass a validate callable to call() so replies they cannot use are
+neither stored nor served.
+
+The mode comes from LLM_CACHE_MODE (default: auto; unknown values warn and
+fall back to auto) unless a script overrides it with --record/--replay.
+LLM_CACHE_MAX_MB bounds the cache size; the least recently used responses are
+evicted first.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+CACHE_DIR = ROOT_DIR / ".automation" / "llm_cache"
+CACHE_MODES = ("auto", "record", "replay", "off")
+DEFAULT_MAX_MB = 50
+
+
+class LLMCacheMiss(RuntimeError):
+    pass
+
+
+def cache_key(model: str, system: Any, prompt: Any, temperature: float | None, max_tokens: int | None) -> str:
+    material = json.dumps(
+        [model, system, prompt, temperature, max_tokens],
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class LLMCache:
+    def __init__(self, directory: Path = CACHE_DIR, mode: str = "auto", max_bytes: int = DEFAULT_MAX_MB * 1024 * 1024) -> None:
+        if mode not in CACHE_MODES:
+            raise ValueError(f"Unknown LLM cache mode: {mode}")
+        self.directory = directory
+        self.mode = mode
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "LLMCache":
+        mode = os.getenv("LLM_CACHE_MODE", "auto").strip().lower() or "auto"
+        if mode not in CACHE_MODES:
+            # Scripts build their cache at import time, before argument parsing,
+            # so a typo must not crash them there.
+            print(f"[WARN] Unknown LLM_CACHE_MODE '{mode}' (expected {', '.join(CACHE_MODES)}). Using auto.")
+            mode = "auto"
+        try:
+            max_mb = float(os.getenv("LLM_CACHE_MAX_MB", "") or DEFAULT_MAX_MB)
+        except ValueError:
+            max_mb = DEFAULT_MAX_MB
+        return cls(mode=mode, max_bytes=int(max_mb * 1024 * 1024))
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / key[:2] / f"{key}.json"
+
+    def get(self, key: str) -> str | None:
+        path = self.path_for(key)
+        try:
+            record = json.loads(path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        text = record.get("text") if isinstance(record, dict) else None
+        return text if isinstance(text, str) and text else None
+
+    def put(self, key: str, text: str, model: str = "") -> None:
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        record = {
+            "key": key,
+            "model": model,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "text": text,
+        }
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=path.parent, delete=False) as tmp:
+            tmp.write(json.dumps(record, ensure_ascii=False) + "\n")
+            tmp_path = Path(tmp.name)
+        tmp_path.replace(path)
+        self.evict()
+
+    def discard(self, key: str) -> None:
+        self.path_for(key).unlink(missing_ok=True)
+
+    def evict(self) -> None:
+        with self.lock:
+            entries = []
+            total = 0
+            for path in self.directory.glob("*/*.json"):
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total -= size
+
+    def call(
+        self,
+        key: str,
+        model: str,
+        request: Callable[[], str | None],
+        validate: Callable[[str], bool] | None = None,
+    ) -> str | None:
+        """Cached request(). With validate, only replies that pass it are stored
+        or served, so an unusable reply is retried instead of replayed."""
+        if self.mode == "off":
+            return request()
+        if self.mode != "record":
+            cached = self.get(key)
+            if cached is not None and (validate is None or validate(cached)):
+                print(f"[INFO] LLM cache hit: {key[:12]}")
+                return cached
+            if self.mode == "replay":
+                raise LLMCacheMiss(f"LLM cache miss in replay mode: {key[:12]}")
+        text = request()
+        if text and (validate is None or validate(text)):
+            self.put(key, text, model=model)
+        return text
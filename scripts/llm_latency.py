@@ -0,0 +1,83 @@
+"""Per-provider LLM latency samples used to time hedged requests.
+
+Each real API round trip (cache hits are not counted) is recorded per
+provider in .automation/llm_latency.json: the most recent MAX_SAMPLES
+durations, used for percentiles, and a cumulative histogram for a long-run
+view. The file is committed with the rest of the automation state, so the
+hedge delay keeps adapting across CI runs.
+"""
+from __future__ import annotations
+
+import json
+import math
+import tempfile
+import threading
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+LATENCY_FILE = ROOT_DIR / ".automation" / "llm_latency.json"
+MAX_SAMPLES = 200
+MIN_SAMPLES = 5
+HISTOGRAM_BOUNDS = (1, 2, 5, 10, 20, 30, 45, 60, 90, 120)
+HISTOGRAM_LABELS = [f"<={bound}s" for bound in HISTOGRAM_BOUNDS] + [f">{HISTOGRAM_BOUNDS[-1]}s"]
+
+
+class LatencyTracker:
+    def __init__(self, path: Path = LATENCY_FILE) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.providers: dict[str, dict[str, Any]] = {}
+        if path.exists():
+            try:
+                loaded = json.loads(path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                print(f"[WARN] Latency file is invalid JSON. Ignoring: {path.name}")
+                loaded = {}
+            if isinstance(loaded, dict):
+                self.providers = {k: v for k, v in loaded.items() if isinstance(v, dict)}
+
+    def record(self, provider: str, seconds: float) -> None:
+        with self.lock:
+            stats = self.providers.setdefault(provider, {})
+            samples = stats.setdefault("samples", [])
+            samples.append(round(seconds, 2))
+            del samples[:-MAX_SAMPLES]
+            histogram = stats.setdefault("histogram", {})
+            label = HISTOGRAM_LABELS[bisect_left(HISTOGRAM_BOUNDS, seconds)]
+            histogram[label] = histogram.get(label, 0) + 1
+            self.dirty = True
+
+    def percentile(self, provider: str, q: float) -> float | None:
+        """Nearest-rank percentile of the recent samples, or None while there are too few."""
+        with self.lock:
+            samples = sorted((self.providers.get(provider) or {}).get("samples") or [])
+        if len(samples) < MIN_SAMPLES:
+            return None
+        rank = max(1, math.ceil(q / 100 * len(samples)))
+        return float(samples[min(rank, len(samples)) - 1])
+
+    def save(self) -> None:
+        with self.lock:
+            if not self.dirty:
+                return
+            ordered = {
+                provider: {
+                    "samples": stats.get("samples", []),
+                    "histogram": {
+                        label: stats.get("histogram", {}).get(label, 0)
+                        for label in HISTOGRAM_LABELS
+                        if stats.get("histogram", {}).get(label)
+                    },
+                }
+                for provider, stats in sorted(self.providers.items())
+            }
+            serialized = json.dumps(ordered, ensure_ascii=False, indent=2) + "\n"
+            self.dirty = False
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.path.parent, delete=False) as tmp:
+            tmp.write(serialized)
+            tmp_path = Path(tmp.name)
+        tmp_path.replace(self.path)
@@ -0,0 +1,253 @@
+"""Localize images referenced by imported Naver posts.
+
+Images are downloaded concurrently, deduplicated by content hash into
+assets/naver/ and, when Pillow is installed, re-encoded to WebP at a few
+widths. Markdown image references are then rewritten to local <img> tags with
+width/height, srcset and lazy loading. Without Pillow the original bytes are
+stored and the intrinsic size is read from the file header.
+"""
+from __future__ import annotations
+
+import hashlib
+import html
+import io
+import json
+import re
+import struct
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import nullcontext
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+ASSETS_DIR = ROOT_DIR / "assets" / "naver"
+INDEX_FILE = ROOT_DIR / ".automation" / "naver_images.json"
+SITE_PREFIX = "/assets/naver"
+
+IMAGE_WIDTHS = (480, 960, 1440)
+WEBP_QUALITY = 80
+IMAGE_TIMEOUT_SECONDS = 30
+MAX_IMAGE_BYTES = 20 * 1024 * 1024
+MARKDOWN_IMAGE_PATTERN = re.compile(r'!\[((?:\\.|\[[^\]]*\]|[^\[\]\\])*)\]\((https?://[^\s)]+)(?:\s+"([^"]*)")?\)')
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def full_size_url(url: str) -> str:
+    # Mobile pages carry a blurred w80 placeholder in src and swap in the real
+    # image with JavaScript, so that placeholder is what ends up in Markdown.
+    parts = urlsplit(url)
+    if not parts.netloc.endswith("pstatic.net"):
+        return url
+    query = parse_qsl(parts.query, keep_blank_values=True)
+    if not any(key == "type" and value.endswith("_blur") for key, value in query):
+        return url
+    query = [(key, "w966" if key == "type" and value.endswith("_blur") else value) for key, value in query]
+    return urlunsplit(parts._replace(query=urlencode(query)))
+
+
+def sniff_image(data: bytes) -> tuple[str, int, int] | None:
+    if data[:8] == b"\x89PNG\r\n\x1a\n" and len(data) >= 24:
+        width, height = struct.unpack(">II", data[16:24])
+        return "png", width, height
+    if data[:6] in (b"GIF87a", b"GIF89a") and len(data) >= 10:
+        width, height = struct.unpack("<HH", data[6:10])
+        return "gif", width, height
+    if data[:4] == b"RIFF" and data[8:12] == b"WEBP" and len(data) >= 30:
+        chunk = data[12:16]
+        if chunk == b"VP8X":
+            return "webp", 1 + int.from_bytes(data[24:27], "little"), 1 + int.from_bytes(data[27:30], "little")
+        if chunk == b"VP8 ":
+            width, height = struct.unpack("<HH", data[26:30])
+            return "webp", width & 0x3FFF, height & 0x3FFF
+        if chunk == b"VP8L":
+            bits = int.from_bytes(data[21:25], "little")
+            return "webp", (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if data[:2] == b"\xff\xd8":
+        offset = 2
+        while offset + 9 < len(data):
+            if data[offset] != 0xFF:
+                offset += 1
+                continue
+            marker = data[offset + 1]
+            if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7 or marker == 0xFF:
+                offset += 1 if marker == 0xFF else 2
+                continue
+            if marker in JPEG_SOF_MARKERS:
+                height, width = struct.unpack(">HH", data[offset + 5 : offset + 9])
+                return "jpg", width, height
+            offset += 2 + struct.unpack(">H", data[offset + 2 : offset + 4])[0]
+    return None
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile("wb", dir=path.parent, delete=False) as tmp:
+        tmp.write(data)
+        tmp_path = Path(tmp.name)
+    # NamedTemporaryFile creates 0600 files; assets are served as-is.
+    tmp_path.chmod(0o644)
+    tmp_path.replace(path)
+
+
+def encode_webp_variants(data: bytes, digest: str) -> tuple[list[list[Any]], int, int]:
+    with Image.open(io.BytesIO(data)) as opened:
+        image = ImageOps.exif_transpose(opened)
+        image = image.convert("RGBA" if "A" in image.getbands() or "transparency" in image.info else "RGB")
+    width, height = image.size
+    widths = sorted({min(w, width) for w in IMAGE_WIDTHS})
+
+    variants = []
+    for target in widths:
+        path = ASSETS_DIR / f"{digest}-{target}.webp"
+        target_height = max(1, round(height * target / width))
+        if not path.exists():
+            resized = image if target == width else image.resize((target, target_height), Image.LANCZOS)
+            buffer = io.BytesIO()
+            resized.save(buffer, "WEBP", quality=WEBP_QUALITY, method=6)
+            write_atomic(path, buffer.getvalue())
+        variants.append([f"{SITE_PREFIX}/{path.name}", target])
+    return variants, widths[-1], max(1, round(height * widths[-1] / width))
+
+
+def store_image(data: bytes) -> dict[str, Any]:
+    sniffed = sniff_image(data)
+    if sniffed is None:
+        raise RuntimeError("unsupported image format")
+    ext, width, height = sniffed
+    digest = hashlib.sha256(data).hexdigest()[:20]
+
+    # Animated GIFs are kept as-is; everything else is re-encoded when possible.
+    if Image is not None and ext != "gif":
+        variants, width, height = encode_webp_variants(data, digest)
+    else:
+        path = ASSETS_DIR / f"{digest}.{ext}"
+        if not path.exists():
+            write_atomic(path, data)
+        variants = [[f"{SITE_PREFIX}/{path.name}", width]]
+    return {"hash": digest, "width": width, "height": height, "variants": variants}
+
+
+def image_tag(record: dict[str, Any], alt: str, title: str | None) -> str:
+    variants = record["variants"]
+    largest = variants[-1][1]
+    attrs = [f'src="{variants[-1][0]}"']
+    if len(variants) > 1:
+        srcset = ", ".join(f"{path} {width}w" for path, width in variants)
+        attrs.append(f'srcset="{srcset}"')
+        attrs.append(f'sizes="(max-width: {largest}px) 100vw, {largest}px"')
+    attrs.append(f'width="{record["width"]}" height="{record["height"]}"')
+    # markdownify backslash-escapes Markdown punctuation inside alt text.
+    alt = re.sub(r"\\(.)", r"\1", alt)
+    attrs.append(f'alt="{html.escape(alt)}"')
+    if title:
+        attrs.append(f'title="{html.escape(title)}"')
+    attrs.append('loading="lazy" decoding="async"')
+    return f"<img {' '.join(attrs)}>"
+
+
+class ImageLocalizer:
+    def __init__(self, workers: int = 8, throttle: Any = None, index_path: Path = INDEX_FILE) -> None:
+        self.pool = ThreadPoolExecutor(max_workers=max(1, workers))
+        self.throttle = throttle
+        self.index_path = index_path
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.futures: dict[str, Future] = {}
+        self.index: dict[str, dict[str, Any]] = {}
+        if index_path.exists():
+            try:
+                loaded = json.loads(index_path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                print(f"[WARN] Image index is invalid JSON. Ignoring: {index_path.name}")
+                loaded = {}
+            if isinstance(loaded, dict):
+                self.index = {k: v for k, v in loaded.items() if isinstance(v, dict)}
+
+    def __enter__(self) -> "ImageLocalizer":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.pool.shutdown(wait=True, cancel_futures=True)
+        self.save()
+
+    def cached(self, url: str) -> dict[str, Any] | None:
+        record = self.index.get(url)
+        if not record:
+            return None
+        for path, _ in record.get("variants", []):
+            if not (ROOT_DIR / path.lstrip("/")).is_file():
+                return None
+        return record
+
+    def schedule(self, url: str) -> Future:
+        with self.lock:
+            future = self.futures.get(url)
+            if future is None:
+                record = self.cached(url)
+                if record is not None:
+                    future = Future()
+                    future.set_result(record)
+                else:
+                    future = self.pool.submit(self.localize, url)
+                self.futures[url] = future
+            return future
+
+    def schedule_markdown(self, markdown: str) -> None:
+        for match in MARKDOWN_IMAGE_PATTERN.finditer(markdown):
+            self.schedule(match.group(2))
+
+    def download(self, url: str) -> bytes:
+        slot = self.throttle.slot(url) if self.throttle is not None else nullcontext()
+        with slot, requests.get(
+            url,
+            timeout=IMAGE_TIMEOUT_SECONDS,
+            stream=True,
+            headers={"User-Agent": "Mozilla/5.0", "Referer": "https://blog.naver.com/"},
+        ) as response:
+            response.raise_for_status()
+            chunks: list[bytes] = []
+            size = 0
+            for chunk in response.iter_content(chunk_size=65536):
+                size += len(chunk)
+                if size > MAX_IMAGE_BYTES:
+                    raise RuntimeError(f"image larger than {MAX_IMAGE_BYTES // (1024 * 1024)}MB")
+                chunks.append(chunk)
+        return b"".join(chunks)
+
+    def localize(self, url: str) -> dict[str, Any]:
+        record = store_image(self.download(full_size_url(url)))
+        with self.lock:
+            self.index[url] = record
+            self.dirty = True
+        return record
+
+    def rewrite(self, markdown: str) -> str:
+        self.schedule_markdown(markdown)
+
+        def replace(match: re.Match) -> str:
+            try:
+                record = self.futures[match.group(2)].result()
+            except Exception as exc:
+                print(f"[WARN] Keeping remote image {match.group(2)}: {exc}")
+                return match.group(0)
+            return image_tag(record, match.group(1), match.group(3))
+
+        return MARKDOWN_IMAGE_PATTERN.sub(replace, markdown)
+
+    def save(self) -> None:
+        with self.lock:
+            if not self.dirty:
+                return
+            serialized = json.dumps(self.index, ensure_ascii=False, indent=2, sort_keys=True) + "\n"
+            self.dirty = False
+        write_atomic(self.index_path, serialized.encode("utf-8"))
@@ -0,0 +1,445 @@
+"""Offline code metrics for a repository archive.
+
+Reads a .tar.gz of a repository (as served by GitHub's tarball endpoint) and
+computes per-language line counts, a file-size histogram, the test-to-source
+ratio and a package dependency graph from manifests (package.json,
+pyproject.toml, go.mod, Cargo.toml, requirements.txt). File bodies are
+streamed out of the archive in batches and counted in a process pool; only
+manifests are parsed in the main process.
+
+Results are cached by commit SHA in .automation/repo_metrics_cache.json, so a
+commit is only ever analyzed once. Usage:
+
+    python scripts/repo_metrics.py repo.tar.gz [--sha SHA] [--workers N]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import os
+import re
+import tarfile
+import tempfile
+import threading
+import tomllib
+from bisect import bisect_right
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path, PurePosixPath
+from typing import Any
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+CACHE_FILE = ROOT_DIR / ".automation" / "repo_metrics_cache.json"
+CACHE_MAX_ENTRIES = 200
+
+# Also used by star_repo_deep_dive.py for tree listings and tarball contents.
+IGNORED_PATH_PARTS = ["node_modules/", "vendor/", "dist/", "build/", ".git/"]
+MAX_COUNTED_BYTES = 2 * 1024 * 1024
+MAX_MANIFEST_BYTES = 512 * 1024
+MAX_MANIFESTS = 500
+BATCH_FILES = 512
+BATCH_BYTES = 8 * 1024 * 1024
+SIZE_BUCKETS = ((1024, "<1KB"), (10 * 1024, "1-10KB"), (100 * 1024, "10-100KB"), (1024 * 1024, "100KB-1MB"))
+SIZE_BUCKET_LIMITS = [limit for limit, _ in SIZE_BUCKETS]
+SIZE_BUCKET_LABELS = [label for _, label in SIZE_BUCKETS] + [">=1MB"]
+SHA_PATTERN = re.compile(r"[0-9a-f]{40}")
+# star_repo_deep_dive.py analyzes archives from a worker thread while other
+# threads run; forking then can deadlock the child, so workers start from a
+# fork server instead (spawn where that is unavailable).
+POOL_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+LANGUAGES = {
+    ".py": "Python",
+    ".pyi": "Python",
+    ".js": "JavaScript",
+    ".mjs": "JavaScript",
+    ".cjs": "JavaScript",
+    ".jsx": "JavaScript",
+    ".ts": "TypeScript",
+    ".tsx": "TypeScript",
+    ".mts": "TypeScript",
+    ".go": "Go",
+    ".rs": "Rust",
+    ".java": "Java",
+    ".kt": "Kotlin",
+    ".kts": "Kotlin",
+    ".scala": "Scala",
+    ".c": "C",
+    ".h": "C",
+    ".cc": "C++",
+    ".cpp": "C++",
+    ".cxx": "C++",
+    ".hpp": "C++",
+    ".cs": "C#",
+    ".swift": "Swift",
+    ".m": "Objective-C",
+    ".rb": "Ruby",
+    ".php": "PHP",
+    ".dart": "Dart",
+    ".ex": "Elixir",
+    ".exs": "Elixir",
+    ".lua": "Lua",
+    ".sh": "Shell",
+    ".bash": "Shell",
+    ".sql": "SQL",
+    ".vue": "Vue",
+    ".svelte": "Svelte",
+    ".html": "HTML",
+    ".css": "CSS",
+    ".scss": "CSS",
+    ".md": "Markdown",
+    ".mdx": "Markdown",
+    ".rst": "reStructuredText",
+    ".json": "JSON",
+    ".yml": "YAML",
+    ".yaml": "YAML",
+    ".toml": "TOML",
+    ".xml": "XML",
+}
+LANGUAGE_FILENAMES = {"Dockerfile": "Dockerfile", "Makefile": "Makefile", "CMakeLists.txt": "CMake"}
+# Languages that are documentation or data rather than source code.
+NON_CODE_LANGUAGES = {"Markdown", "reStructuredText", "JSON", "YAML", "TOML", "XML", "HTML", "CSS"}
+TEST_DIRS = {"test", "tests", "__tests__", "spec", "specs", "testing", "e2e"}
+TEST_FILE_PATTERN = re.compile(
+    r"(^test_.*\.py$|_test\.(py|go)$|\.(test|spec)\.[cm]?[jt]sx?$|(Test|Tests|Spec)\.(java|kt|scala|cs|swift)$|_spec\.rb$)"
+)
+MANIFEST_NAMES = {"package.json", "pyproject.toml", "go.mod", "Cargo.toml", "requirements.txt"}
+REQUIREMENT_NAME = re.compile(r"^\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+# A blank line is a newline followed by whitespace up to the next newline;
+# the lookahead lets consecutive blank lines share their newlines.
+BLANK_LINE = re.compile(rb"\n[ \t\r\f\v]*(?=\n)")
+
+
+def is_ignored_path(path: str) -> bool:
+    return any(part in path for part in IGNORED_PATH_PARTS)
+
+
+def detect_language(path: str) -> str | None:
+    name = PurePosixPath(path).name
+    return LANGUAGE_FILENAMES.get(name) or LANGUAGES.get(PurePosixPath(name).suffix.lower())
+
+
+def is_test_path(path: str) -> bool:
+    parts = path.split("/")
+    return any(part.lower() in TEST_DIRS for part in parts[:-1]) or bool(TEST_FILE_PATTERN.search(parts[-1]))
+
+
+def count_batch(batch: list[tuple[str, bytes]]) -> dict[str, Any]:
+    """Process-pool worker: line counts for one batch of (path, body) pairs."""
+    languages: dict[str, list[int]] = {}
+    totals = {"test": [0, 0], "source": [0, 0]}
+    binary = 0
+    for path, data in batch:
+        if b"\0" in data[:8000]:
+            binary += 1
+            continue
+        language = detect_language(path)
+        if language is None:
+            continue
+        lines = data.count(b"\n") + (1 if data and not data.endswith(b"\n") else 0)
+        blank = len(BLANK_LINE.findall(b"\n" + data))
+        code = lines - blank
+        stats = languages.setdefault(language, [0, 0, 0])
+        stats[0] += 1
+        stats[1] += code
+        stats[2] += blank
+        if language not in NON_CODE_LANGUAGES:
+            kind = "test" if is_test_path(path) else "source"
+            totals[kind][0] += 1
+            totals[kind][1] += code
+    return {"languages": languages, "totals": totals, "binary": binary}
+
+
+def normalize_package(ecosystem: str, name: str) -> str:
+    if ecosystem == "python":
+        return re.sub(r"[-_.]+", "-", name).lower()
+    return name
+
+
+def requirement_names(lines: list[str]) -> list[str]:
+    names = []
+    for line in lines:
+        match = REQUIREMENT_NAME.match(line.split("#", 1)[0])
+        if match and not line.lstrip().startswith("-"):
+            names.append(match.group(1))
+    return names
+
+
+def parse_manifest(path: str, data: bytes) -> dict[str, Any] | None:
+    name = PurePosixPath(path).name
+    directory = str(PurePosixPath(path).parent)
+    directory = "" if directory == "." else directory
+    text = data.decode("utf-8", errors="replace")
+    try:
+        if name == "package.json":
+            body = json.loads(text)
+            if not isinstance(body, dict):
+                return None
+            deps = list((body.get("dependencies") or {}).keys()) + list((body.get("peerDependencies") or {}).keys())
+            return {
+                "ecosystem": "npm",
+                "name": str(body.get("name") or directory or "(root)"),
+                "dependencies": deps,
+                "dev_dependencies": list((body.get("devDependencies") or {}).keys()),
+            }
+        if name == "pyproject.toml":
+            body = tomllib.loads(text)
+            project = body.get("project") or {}
+            poetry = (body.get("tool") or {}).get("poetry") or {}
+            deps = requirement_names(project.get("dependencies") or [])
+            deps += [dep for dep in (poetry.get("dependencies") or {}) if dep.lower() != "python"]
+            dev: list[str] = []
+            for group in (project.get("optional-dependencies") or {}).values():
+                dev += requirement_names(group)
+            for group in (poetry.get("group") or {}).values():
+                dev += list((group.get("dependencies") or {}).keys())
+            return {
+                "ecosystem": "python",
+                "name": str(project.get("name") or poetry.get("name") or directory or "(root)"),
+                "dependencies": deps,
+                "dev_dependencies": dev,
+            }
+        if name == "requirements.txt":
+            return {
+                "ecosystem": "python",
+                "name": directory or "(root)",
+                "dependencies": requirement_names(text.splitlines()),
+                "dev_dependencies": [],
+            }
+        if name == "go.mod":
+            module = re.search(r"^module\s+(\S+)", text, flags=re.MULTILINE)
+            requires = re.findall(r"^\s*(?:require\s+)?([\w.-]+\.[\w.-]+/\S+)\s+v\S+", text, flags=re.MULTILINE)
+            return {
+                "ecosystem": "go",
+                "name": module.group(1) if module else directory or "(root)",
+                "dependencies": requires,
+                "dev_dependencies": [],
+            }
+        if name == "Cargo.toml":
+            body = tomllib.loads(text)
+            package = body.get("package") or {}
+            if not package:
+                return None  # a virtual workspace manifest has no dependencies of its own
+            return {
+                "ecosystem": "cargo",
+                "name": str(package.get("name") or directory or "(root)"),
+                "dependencies": list((body.get("dependencies") or {}).keys()),
+                "dev_dependencies": list((body.get("dev-dependencies") or {}).keys()),
+            }
+    except (ValueError, tomllib.TOMLDecodeError, AttributeError) as exc:
+        print(f"[WARN] Skipping unparsable manifest {path}: {exc}")
+    return None
+
+
+def dependency_graph(manifests: list[dict[str, Any]]) -> dict[str, Any]:
+    """Packages found in the archive plus the edges between them (workspace links)."""
+    local = {(m["ecosystem"], normalize_package(m["ecosystem"], m["name"])): m["name"] for m in manifests}
+    go_modules = sorted((m["name"] for m in manifests if m["ecosystem"] == "go"), key=len, reverse=True)
+    edges: set[tuple[str, str]] = set()
+    external: dict[str, int] = {}
+    for manifest in manifests:
+        ecosystem = manifest["ecosystem"]
+        for dep in manifest["dependencies"] + manifest["dev_dependencies"]:
+            target = local.get((ecosystem, normalize_package(ecosystem, dep)))
+            if target is None and ecosystem == "go":
+                target = next((module for module in go_modules if dep == module or dep.startswith(module + "/")), None)
+            if target is not None and target != manifest["name"]:
+                edges.add((manifest["name"], target))
+            elif target is None and dep in manifest["dependencies"]:
+                external[dep] = external.get(dep, 0) + 1
+    return {
+        "packages": [
+            {
+                "path": m["path"],
+                "ecosystem": m["ecosystem"],
+                "name": m["name"],
+                "dependencies": len(m["dependencies"]),
+                "dev_dependencies": len(m["dev_dependencies"]),
+            }
+            for m in manifests
+        ],
+        "internal_edges": sorted([source, target] for source, target in edges),
+        "top_external": sorted(external.items(), key=lambda item: (-item[1], item[0]))[:20],
+    }
+
+
+def percentile(sorted_values: list[int], fraction: float) -> int:
+    if not sorted_values:
+        return 0
+    return sorted_values[min(len(sorted_values) - 1, int(fraction * len(sorted_values)))]
+
+
+def pax_commit(archive: tarfile.TarFile) -> str:
+    # git archive stores the commit id as the global pax comment.
+    comment = str(archive.pax_headers.get("comment", ""))
+    return comment if SHA_PATTERN.fullmatch(comment) else ""
+
+
+def archive_commit(archive_path: Path) -> str:
+    with tarfile.open(archive_path, mode="r|gz") as archive:
+        next(iter(archive), None)
+        return pax_commit(archive)
+
+
+def analyze_archive(archive_path: Path, workers: int | None = None) -> dict[str, Any]:
+    workers = max(1, workers or os.cpu_count() or 1)
+    sizes: list[int] = []
+    histogram = [0] * len(SIZE_BUCKET_LABELS)
+    manifests: list[dict[str, Any]] = []
+    languages: dict[str, list[int]] = {}
+    totals = {"test": [0, 0], "source": [0, 0]}
+    binary = 0
+    commit = None
+
+    def merge(result: dict[str, Any]) -> None:
+        nonlocal binary
+        for language, stats in result["languages"].items():
+            merged = languages.setdefault(language, [0, 0, 0])
+            for index, value in enumerate(stats):
+                merged[index] += value
+        for kind, (files, code) in result["totals"].items():
+            totals[kind][0] += files
+            totals[kind][1] += code
+        binary += result["binary"]
+
+    pool_context = multiprocessing.get_context(POOL_START_METHOD)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=pool_context) as pool, tarfile.open(archive_path, mode="r|gz") as archive:
+        pending: deque[Future] = deque()
+        batch: list[tuple[str, bytes]] = []
+        batch_bytes = 0
+
+        def flush() -> None:
+            nonlocal batch, batch_bytes
+            if batch:
+                pending.append(pool.submit(count_batch, batch))
+                batch, batch_bytes = [], 0
+            # Bound the bodies held in flight to a couple of batches per worker.
+            while len(pending) > workers * 2:
+                merge(pending.popleft().result())
+
+        for member in archive:
+            if commit is None:
+                commit = pax_commit(archive)
+            if not member.isfile() or "/" not in member.name:
+                continue
+            path = member.name.split("/", 1)[1]
+            if is_ignored_path(path):
+                continue
+            sizes.append(member.size)
+            histogram[bisect_right(SIZE_BUCKET_LIMITS, member.size)] += 1
+            name = PurePosixPath(path).name
+            is_manifest = name in MANIFEST_NAMES and member.size <= MAX_MANIFEST_BYTES and len(manifests) < MAX_MANIFESTS
+            counted = member.size <= MAX_COUNTED_BYTES and detect_language(path) is not None
+            if not counted and not is_manifest:
+                continue
+            handle = archive.extractfile(member)
+            data = handle.read() if handle is not None else b""
+            if is_manifest:
+                manifest = parse_manifest(path, data)
+                if manifest is not None:
+                    manifests.append({"path": path, **manifest})
+            if not counted:
+                continue
+            batch.append((path, data))
+            batch_bytes += len(data)
+            if len(batch) >= BATCH_FILES or batch_bytes >= BATCH_BYTES:
+                flush()
+        flush()
+        while pending:
+            merge(pending.popleft().result())
+
+    sizes.sort()
+    test_code, source_code = totals["test"][1], totals["source"][1]
+    return {
+        "commit": commit or None,
+        "files": len(sizes),
+        "bytes": sum(sizes),
+        "binary_files": binary,
+        "languages": {
+            language: {"files": files, "code": code, "blank": blank}
+            for language, (files, code, blank) in sorted(languages.items(), key=lambda item: -item[1][1])
+        },
+        "size_histogram": dict(zip(SIZE_BUCKET_LABELS, histogram)),
+        "size_percentiles": {"p50": percentile(sizes, 0.5), "p90": percentile(sizes, 0.9), "max": sizes[-1] if sizes else 0},
+        "tests": {"files": totals["test"][0], "code": test_code},
+        "source": {"files": totals["source"][0], "code": source_code},
+        "test_ratio": round(test_code / source_code, 3) if source_code else None,
+        "dependencies": dependency_graph(manifests),
+    }
+
+
+class MetricsCache:
+    """Shared by the --metrics-workers threads, so every access takes the lock."""
+
+    def __init__(self, path: Path = CACHE_FILE) -> None:
+        self.path = path
+        self.lock = threading.Lock()
+        self.records: dict[str, dict[str, Any]] = {}
+        if path.exists():
+            try:
+                loaded = json.loads(path.read_text(encoding="utf-8"))
+            except json.JSONDecodeError:
+                print(f"[WARN] Metrics cache is invalid JSON. Ignoring: {path.name}")
+                loaded = {}
+            if isinstance(loaded, dict):
+                self.records = {k: v for k, v in loaded.items() if isinstance(v, dict)}
+
+    def get(self, sha: str) -> dict[str, Any] | None:
+        with self.lock:
+            record = self.records.get(sha)
+        return record.get("metrics") if record else None
+
+    def put(self, sha: str, metrics: dict[str, Any]) -> None:
+        with self.lock:
+            self.records[sha] = {
+                "analyzed_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "metrics": metrics,
+            }
+            if len(self.records) > CACHE_MAX_ENTRIES:
+                oldest = sorted(self.records, key=lambda key: self.records[key].get("analyzed_at", ""))
+                for key in oldest[: len(self.records) - CACHE_MAX_ENTRIES]:
+                    del self.records[key]
+            self.save_locked()
+
+    def save(self) -> None:
+        with self.lock:
+            self.save_locked()
+
+    def save_locked(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=self.path.parent, delete=False) as tmp:
+            tmp.write(json.dumps(self.records, ensure_ascii=False))
+            tmp_path = Path(tmp.name)
+        tmp_path.replace(self.path)
+
+
+def cached_metrics(archive_path: Path, sha: str | None, cache: MetricsCache | None, workers: int | None = None) -> dict[str, Any]:
+    sha = sha or archive_commit(archive_path)
+    if sha and cache is not None:
+        hit = cache.get(sha)
+        if hit is not None:
+            return hit
+    metrics = analyze_archive(archive_path, workers)
+    if sha and cache is not None:
+        cache.put(sha, metrics)
+    return metrics
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Compute code metrics for a repository .tar.gz archive")
+    parser.add_argument("archive", type=Path, help="Repository archive, e.g. a GitHub tarball download")
+    parser.add_argument("--sha", help="Commit SHA used as the cache key (default: read from the archive)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the metrics cache")
+    args = parser.parse_args()
+
+    cache = None if args.no_cache else MetricsCache()
+    metrics = cached_metrics(args.archive, args.sha, cache, args.workers)
+    print(json.dumps(metrics, ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -5,7 +5,11 @@ Contract:
 - GitHub query: stars:>50000 fork:false archived:false, stars desc
 - Exclude repos listed in .automation/star_repo_analysis.json: analyzed
 - Skip if last_run_at is within 48 hours
+- Keep a ranked queue of unanalyzed candidates in .automation/star_repo_candidates.json
+  and re-run the search only when it is older than CANDIDATE_TTL
 - Mark exhausted=true when no candidate remains
+- --count N analyzes N repos in one run as a staged pipeline; analyzed is saved
+  after every written post so a crash keeps the finished ones
 - Never print API keys/secrets
 - Write state atomically so failures do not corrupt it
 """
@@ -13,11 +17,19 @@ from __future__ import annotations
 
 import argparse
 import base64
+import codecs
 import json
 import os
+import queue
 import re
+import shutil
+import tarfile
 import tempfile
-from dataclasses import dataclass
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
 from typing import Any
@@ -25,10 +37,59 @@ from urllib.parse import quote
 
 import requests
 
+from github_client import GitHubClient
+from llm_cache import LLMCache, LLMCacheMiss, cache_key
+from llm_latency import LatencyTracker
+from repo_metrics import MetricsCache, analyze_archive, is_ignored_path
+
 ROOT_DIR = Path(__file__).resolve().parents[1]
 POSTS_DIR = ROOT_DIR / "_posts"
 STATE_FILE = ROOT_DIR / ".automation" / "star_repo_analysis.json"
+CANDIDATES_FILE = ROOT_DIR / ".automation" / "star_repo_candidates.json"
 KST = timezone(timedelta(hours=9))
+CANDIDATE_TTL = timedelta(days=7)
+# Same variables GitHub Actions sets; tests point them at a local stub server.
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com").rstrip("/")
+GITHUB_GRAPHQL_URL = os.getenv("GITHUB_GRAPHQL_URL", f"{GITHUB_API_URL}/graphql")
+SEARCH_PAGES = 10
+SEARCH_PAGE_SIZE = 100
+
+# api: per-file REST calls. tarball: one streamed default-branch archive.
+# graphql: the tree plus one batched blob query (needs GITHUB_TOKEN).
+FETCH_MODES = ("api", "tarball", "graphql")
+TARBALL_MAX_BYTES = 150 * 1024 * 1024
+MAX_TREE_PATHS = 1000
+# Tree listings are streamed; a truncated recursive listing is re-walked one
+# subtree at a time, spending at most this many tree requests per repo.
+MAX_TREE_REQUESTS = 40
+TREE_CHUNK_BYTES = 64 * 1024
+TREE_MAX_PENDING_CHARS = 1024 * 1024
+TREE_ARRAY_START = re.compile(r'"tree"\s*:\s*\[')
+TREE_TRUNCATED = re.compile(r'"truncated"\s*:\s*true')
+TREE_SEPARATORS = re.compile(r"[\s,]*")
+MAX_CONFIG_FILES = 20
+README_MAX_CHARS = 16000
+CONFIG_MAX_CHARS = 3000
+CONFIG_NAMES = {
+    "package.json",
+    "pnpm-workspace.yaml",
+    "pyproject.toml",
+    "requirements.txt",
+    "Cargo.toml",
+    "go.mod",
+    "pom.xml",
+    "build.gradle",
+    "settings.gradle",
+    "docker-compose.yml",
+    "Dockerfile",
+    "Makefile",
+    "CHANGELOG.md",
+    "CONTRIBUTING.md",
+    "SECURITY.md",
+}
+# Same lookup order as GitHub's /readme endpoint: repo root, then .github/, then docs/.
+README_DIRS = ("", ".github/", "docs/")
+README_NAME_PATTERN = re.compile(r"readme(\.[a-z0-9]+)?", re.IGNORECASE)
 
 DEFAULT_STATE: dict[str, Any] = {
     "min_stars": 50000,
@@ -39,6 +100,30 @@ DEFAULT_STATE: dict[str, Any] = {
 }
 
 QUERY_TEMPLATE = "stars:>{min_stars} fork:false archived:false"
+SYSTEM_PROMPT = "You are a senior backend architect writing Korean technical analysis. Return JSON only."
+REQUIRED_KEYS = (
+    "important_reason",
+    "one_sentence",
+    "product_problem",
+    "architecture",
+    "core_modules",
+    "backend_lessons",
+    "stealable_patterns",
+    "cautions",
+    "apply_to_my_projects",
+    "source_links",
+)
+# The fallback provider is started once the primary has been slower than this
+# percentile of its recent latencies (LLM_HEDGE_PERCENTILE / LLM_HEDGE_DELAY
+# override it; LLM_HEDGE=0 restores strictly sequential calls).
+HEDGE_PERCENTILE = 95
+HEDGE_DEFAULT_SECONDS = 30.0
+HEDGE_MIN_SECONDS = 2.0
+HEDGE_MAX_SECONDS = 120.0
+
+LLM_CACHE = LLMCache.from_env()
+LLM_LATENCY = LatencyTracker()
+GITHUB = GitHubClient(user_agent="qoxmfaktmxj-star-repo-deep-dive")
 
 
 @dataclass(frozen=True)
@@ -59,6 +144,63 @@ class RepoCandidate:
     license_name: str
 
 
+@dataclass
+class RepoTree:
+    """Bounded summary of a repository file list.
+
+    Only the first MAX_TREE_PATHS paths are kept, but every file is counted in
+    total_files and dir_counts (one counter per top-level directory), and
+    README/config candidates are picked from the whole tree.
+    """
+
+    paths: list[str] = field(default_factory=list)
+    dir_counts: dict[str, int] = field(default_factory=dict)
+    total_files: int = 0
+    readme_paths: list[str] = field(default_factory=list)
+    config_paths: list[str] = field(default_factory=list)
+    complete: bool = True
+
+    def add(self, path: str) -> None:
+        self.total_files += 1
+        if len(self.paths) < MAX_TREE_PATHS:
+            self.paths.append(path)
+        first = path.split("/", 1)[0] if "/" in path else "<root files>"
+        if not first.startswith("."):
+            self.dir_counts[first] = self.dir_counts.get(first, 0) + 1
+        if is_readme_path(path):
+            self.readme_paths.append(path)
+        elif is_config_path(path) and len(self.config_paths) < MAX_CONFIG_FILES:
+            self.config_paths.append(path)
+
+    def snapshot(self) -> tuple[int, dict[str, int], int, int, int]:
+        return len(self.paths), dict(self.dir_counts), self.total_files, len(self.readme_paths), len(self.config_paths)
+
+    def restore(self, snapshot: tuple[int, dict[str, int], int, int, int]) -> None:
+        paths, self.dir_counts, self.total_files, readmes, configs = snapshot
+        del self.paths[paths:], self.readme_paths[readmes:], self.config_paths[configs:]
+
+
+@dataclass
+class RepoContents:
+    languages: dict[str, int]
+    readme: str
+    tree: RepoTree
+    config_files: dict[str, str]
+
+
+@dataclass
+class DeepDiveJob:
+    """One repo moving through the fetch -> metrics -> draft -> write pipeline."""
+
+    repo: RepoCandidate
+    workdir: Path
+    sha: str | None = None
+    archive_path: Path | None = None
+    contents: RepoContents | None = None
+    metrics: dict[str, Any] | None = None
+    sections: dict[str, str] | None = None
+
+
 def now_kst() -> datetime:
     return datetime.now(KST)
 
@@ -95,26 +237,8 @@ def atomic_save_state(state: dict[str, Any]) -> None:
     tmp_path.replace(STATE_FILE)
 
 
-def github_headers() -> dict[str, str]:
-    headers = {
-        "Accept": "application/vnd.github+json",
-        "X-GitHub-Api-Version": "2022-11-28",
-        "User-Agent": "qoxmfaktmxj-star-repo-deep-dive",
-    }
-    token = os.getenv("GITHUB_TOKEN", "").strip()
-    if token:
-        headers["Authorization"] = f"Bearer {token}"
-    return headers
-
-
 def github_get(url: str, *, timeout: int = 30) -> Any:
-    response = requests.get(url, headers=github_headers(), timeout=timeout)
-    if response.status_code == 403 and "rate limit" in response.text.lower():
-        raise RuntimeError("GitHub API rate limit reached. Set GITHUB_TOKEN or retry later.")
-    if response.status_code == 404:
-        return None
-    response.raise_for_status()
-    return response.json()
+    return GITHUB.get_json(url, timeout=timeout)
 
 
 def parse_repo(item: dict[str, Any]) -> RepoCandidate:
@@ -139,73 +263,237 @@ def parse_repo(item: dict[str, Any]) -> RepoCandidate:
     )
 
 
-def find_next_candidate(min_stars: int, analyzed: set[str]) -> RepoCandidate | None:
+def search_candidate_names(min_stars: int) -> list[str]:
     query = quote(QUERY_TEMPLATE.format(min_stars=min_stars))
-    for page in range(1, 11):
+    names: list[str] = []
+    for page in range(1, SEARCH_PAGES + 1):
         url = (
-            "https://api.github.com/search/repositories"
-            f"?q={query}&sort=stars&order=desc&per_page=100&page={page}"
+            f"{GITHUB_API_URL}/search/repositories"
+            f"?q={query}&sort=stars&order=desc&per_page={SEARCH_PAGE_SIZE}&page={page}"
         )
-        data = github_get(url)
-        for item in data.get("items", []):
-            repo = parse_repo(item)
-            if repo.full_name and repo.full_name not in analyzed:
-                return repo
-    return None
+        items = (github_get(url) or {}).get("items", [])
+        names.extend(str(item.get("full_name") or "") for item in items if item.get("full_name"))
+        if len(items) < SEARCH_PAGE_SIZE:
+            break
+    return list(dict.fromkeys(names))
+
+
+class CandidateQueue:
+    """Star-ranked names of repos not analyzed yet, cached between runs."""
+
+    def __init__(self, min_stars: int, names: list[str], refreshed_at: str | None) -> None:
+        self.min_stars = min_stars
+        self.names = deque(names)
+        self.refreshed_at = refreshed_at
+
+    @classmethod
+    def load(cls, min_stars: int) -> "CandidateQueue":
+        empty = cls(min_stars, [], None)
+        if not CANDIDATES_FILE.exists():
+            return empty
+        try:
+            loaded = json.loads(CANDIDATES_FILE.read_text(encoding="utf-8"))
+        except json.JSONDecodeError:
+            print("[WARN] Candidate cache is invalid JSON. Refreshing it.")
+            return empty
+        if not isinstance(loaded, dict) or loaded.get("min_stars") != min_stars:
+            return empty
+        return cls(min_stars, [str(name) for name in loaded.get("names", [])], loaded.get("refreshed_at"))
+
+    def is_stale(self, now: datetime) -> bool:
+        if not self.refreshed_at:
+            return True
+        try:
+            refreshed = datetime.fromisoformat(self.refreshed_at)
+        except ValueError:
+            return True
+        return now - refreshed >= CANDIDATE_TTL
+
+    def replace(self, names: list[str], refreshed_at: str) -> None:
+        self.names = deque(names)
+        self.refreshed_at = refreshed_at
+
+    def pop_next(self, analyzed: set[str]) -> str | None:
+        while self.names:
+            name = self.names.popleft()
+            if name not in analyzed:
+                return name
+        return None
+
+    def remaining(self, analyzed: set[str], in_flight: list[str] | None = None) -> list[str]:
+        # Names popped for a batch that has not finished go back at the front,
+        # so a crash or a failed repo does not drop them from the queue.
+        names = dict.fromkeys([*(in_flight or []), *self.names])
+        return [name for name in names if name not in analyzed]
+
+    def save(self, analyzed: set[str], in_flight: list[str] | None = None) -> None:
+        CANDIDATES_FILE.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "min_stars": self.min_stars,
+            "refreshed_at": self.refreshed_at,
+            "names": self.remaining(analyzed, in_flight),
+        }
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=CANDIDATES_FILE.parent, delete=False) as tmp:
+            tmp.write(json.dumps(data, indent=2, ensure_ascii=False) + "\n")
+            tmp_path = Path(tmp.name)
+        tmp_path.replace(CANDIDATES_FILE)
+
+
+def find_next_candidate(queue: CandidateQueue, analyzed: set[str]) -> RepoCandidate | None:
+    while True:
+        name = queue.pop_next(analyzed)
+        if name is None:
+            return None
+        # The queue only keeps names; one call refreshes metadata for the pick
+        # and catches repos archived or removed since the search ran.
+        data = github_get(f"{GITHUB_API_URL}/repos/{name}")
+        if not data or data.get("archived") or data.get("fork"):
+            print(f"[INFO] Dropping candidate that is no longer eligible: {name}")
+            continue
+        repo = parse_repo(data)
+        if repo.full_name in analyzed:
+            continue
+        return repo
 
 
 def fetch_languages(repo: RepoCandidate) -> dict[str, int]:
-    return github_get(f"https://api.github.com/repos/{repo.full_name}/languages") or {}
+    return github_get(f"{GITHUB_API_URL}/repos/{repo.full_name}/languages") or {}
 
 
 def fetch_readme(repo: RepoCandidate) -> str:
-    data = github_get(f"https://api.github.com/repos/{repo.full_name}/readme")
+    data = github_get(f"{GITHUB_API_URL}/repos/{repo.full_name}/readme")
     if not data or not data.get("content"):
         return ""
     try:
-        return base64.b64decode(data["content"]).decode("utf-8", errors="ignore")[:16000]
+        return base64.b64decode(data["content"]).decode("utf-8", errors="ignore")[:README_MAX_CHARS]
     except Exception:
         return ""
 
 
-def fetch_tree(repo: RepoCandidate) -> list[str]:
-    branch = quote(repo.default_branch, safe="")
-    data = github_get(f"https://api.github.com/repos/{repo.full_name}/git/trees/{branch}?recursive=1")
-    if not data:
-        return []
-    paths: list[str] = []
-    for item in data.get("tree", []):
-        path = str(item.get("path") or "")
-        if item.get("type") != "blob" or not path:
-            continue
-        if any(part in path for part in ["node_modules/", "vendor/", "dist/", "build/", ".git/"]):
+def is_config_path(path: str) -> bool:
+    return path.split("/")[-1] in CONFIG_NAMES or path.startswith(".github/workflows/")
+
+
+def readme_dir(path: str) -> str:
+    directory = path.rpartition("/")[0]
+    return directory + "/" if directory else ""
+
+
+def is_readme_path(path: str) -> bool:
+    return readme_dir(path) in README_DIRS and bool(README_NAME_PATTERN.fullmatch(path.rpartition("/")[2]))
+
+
+def choose_readme(paths: list[str]) -> str | None:
+    candidates = [path for path in paths if is_readme_path(path)]
+    if not candidates:
+        return None
+    return min(candidates, key=lambda path: (README_DIRS.index(readme_dir(path)), not path.lower().endswith(".md"), path))
+
+
+class TreeListing:
+    """Streams the entries of one git/trees response.
+
+    The body is decoded incrementally: entries of the "tree" array are handed
+    out one at a time as they arrive, so memory stays at one network chunk
+    plus one entry however large the listing is. The "truncated" flag follows
+    the array and is only known once iteration has finished.
+    """
+
+    def __init__(self, url: str) -> None:
+        self.url = url
+        self.truncated = False
+
+    def __iter__(self) -> Any:
+        decoder = json.JSONDecoder()
+        text = codecs.getincrementaldecoder("utf-8")()
+        outside: list[str] = []
+        buffer = ""
+        state = "head"
+        with GITHUB.request("GET", self.url, timeout=60, stream=True) as response:
+            if response.status_code == 404:
+                return
+            response.raise_for_status()
+            for chunk in response.iter_content(chunk_size=TREE_CHUNK_BYTES):
+                buffer += text.decode(chunk)
+                if state == "head":
+                    match = TREE_ARRAY_START.search(buffer)
+                    if not match:
+                        continue
+                    outside.append(buffer[: match.start()])
+                    buffer = buffer[match.end() :]
+                    state = "entries"
+                if state == "entries":
+                    pos = 0
+                    while True:
+                        pos = TREE_SEPARATORS.match(buffer, pos).end()
+                        if pos >= len(buffer):
+                            break
+                        if buffer[pos] == "]":
+                            state = "tail"
+                            pos += 1
+                            break
+                        try:
+                            entry, pos = decoder.raw_decode(buffer, pos)
+                        except json.JSONDecodeError:
+                            # The entry is split across chunks; wait for the rest.
+                            break
+                        yield entry
+                    buffer = buffer[pos:]
+                    if len(buffer) > TREE_MAX_PENDING_CHARS:
+                        raise RuntimeError(f"Malformed tree response: {self.url}")
+                if state == "tail":
+                    outside.append(buffer)
+                    buffer = ""
+        if state != "tail":
+            raise RuntimeError(f"Incomplete tree response: {self.url}")
+        self.truncated = bool(TREE_TRUNCATED.search("".join(outside)))
+
+
+def list_subtree(repo: RepoCandidate, ref: str, prefix: str, tree: RepoTree, budget: list[int]) -> None:
+    base = f"{GITHUB_API_URL}/repos/{repo.full_name}/git/trees/{quote(ref, safe='')}"
+    snapshot = tree.snapshot()
+    budget[0] -= 1
+    listing = TreeListing(base + "?recursive=1")
+    for entry in listing:
+        path = prefix + str(entry.get("path") or "")
+        if entry.get("type") == "blob" and path != prefix and not is_ignored_path(path):
+            tree.add(path)
+    if not listing.truncated:
+        return
+
+    # The recursive listing hit GitHub's size limit, so what was counted is an
+    # arbitrary subset. Drop it and descend: this level without recursion,
+    # then each child directory as its own (usually complete) recursive listing.
+    tree.restore(snapshot)
+    budget[0] -= 1
+    children: list[tuple[str, str]] = []
+    for entry in TreeListing(base):
+        path = prefix + str(entry.get("path") or "")
+        if path == prefix:
             continue
-        paths.append(path)
-    return paths[:1000]
-
-
-def fetch_config_files(repo: RepoCandidate, paths: list[str]) -> dict[str, str]:
-    important_names = {
-        "package.json",
-        "pnpm-workspace.yaml",
-        "pyproject.toml",
-        "requirements.txt",
-        "Cargo.toml",
-        "go.mod",
-        "pom.xml",
-        "build.gradle",
-        "settings.gradle",
-        "docker-compose.yml",
-        "Dockerfile",
-        "Makefile",
-        "CHANGELOG.md",
-        "CONTRIBUTING.md",
-        "SECURITY.md",
-    }
-    selected = [p for p in paths if p.split("/")[-1] in important_names or p.startswith(".github/workflows/")]
+        if entry.get("type") == "tree" and not is_ignored_path(path + "/"):
+            children.append((str(entry.get("sha") or ""), path + "/"))
+        elif entry.get("type") == "blob" and not is_ignored_path(path):
+            tree.add(path)
+    for sha, child_prefix in children:
+        if budget[0] <= 0:
+            tree.complete = False
+            return
+        list_subtree(repo, sha, child_prefix, tree, budget)
+
+
+def fetch_tree(repo: RepoCandidate) -> RepoTree:
+    tree = RepoTree()
+    list_subtree(repo, repo.default_branch, "", tree, [MAX_TREE_REQUESTS])
+    if not tree.complete:
+        print(f"[INFO] Tree of {repo.full_name} is too large to walk fully; directory stats are partial.")
+    return tree
+
+
+def fetch_config_files(repo: RepoCandidate, tree: RepoTree) -> dict[str, str]:
     result: dict[str, str] = {}
-    for path in selected[:20]:
-        url = f"https://api.github.com/repos/{repo.full_name}/contents/{quote(path, safe='/')}?ref={quote(repo.default_branch, safe='')}"
+    for path in tree.config_paths:
+        url = f"{GITHUB_API_URL}/repos/{repo.full_name}/contents/{quote(path, safe='/')}?ref={quote(repo.default_branch, safe='')}"
         data = github_get(url)
         if not data or not data.get("content") or data.get("encoding") != "base64":
             continue
@@ -213,23 +501,232 @@ def fetch_config_files(repo: RepoCandidate, paths: list[str]) -> dict[str, str]:
             text = base64.b64decode(data["content"]).decode("utf-8", errors="ignore")
         except Exception:
             continue
-        result[path] = text[:3000]
+        result[path] = text[:CONFIG_MAX_CHARS]
     return result
 
 
-def top_dirs(paths: list[str], limit: int = 12) -> list[tuple[str, int]]:
-    counts: dict[str, int] = {}
-    root_files = 0
-    for path in paths:
-        if "/" not in path:
-            root_files += 1
-            continue
-        first = path.split("/", 1)[0]
-        if first and not first.startswith("."):
-            counts[first] = counts.get(first, 0) + 1
-    if root_files:
-        counts["<root files>"] = root_files
-    return sorted(counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+def fetch_contents_api(repo: RepoCandidate) -> RepoContents:
+    tree = fetch_tree(repo)
+    return RepoContents(fetch_languages(repo), fetch_readme(repo), tree, fetch_config_files(repo, tree))
+
+
+class CappedReader:
+    """File-like wrapper that aborts a streamed download past max_bytes."""
+
+    def __init__(self, raw: Any, max_bytes: int) -> None:
+        self.raw = raw
+        self.max_bytes = max_bytes
+        self.read_bytes = 0
+
+    def read(self, size: int = -1) -> bytes:
+        chunk = self.raw.read(size)
+        self.read_bytes += len(chunk)
+        if self.read_bytes > self.max_bytes:
+            raise RuntimeError(f"tarball exceeds {self.max_bytes // (1024 * 1024)}MB")
+        return chunk
+
+
+def read_member(archive: tarfile.TarFile, member: tarfile.TarInfo, max_chars: int) -> str:
+    handle = archive.extractfile(member)
+    if handle is None:
+        return ""
+    # UTF-8 needs at most 4 bytes per character.
+    return handle.read(max_chars * 4).decode("utf-8", errors="ignore")[:max_chars]
+
+
+def scan_tarball(fileobj: Any) -> tuple[RepoTree, dict[str, str], dict[str, str]]:
+    tree = RepoTree()
+    readmes: dict[str, str] = {}
+    config_files: dict[str, str] = {}
+    # "r|gz" reads the archive strictly as a stream: nothing is extracted to
+    # disk and only README/config members are read into memory. Every member
+    # is counted so directory stats cover the whole repository.
+    archive = tarfile.open(fileobj=fileobj, mode="r|gz")
+    try:
+        for member in archive:
+            if not member.isfile() or "/" not in member.name:
+                continue
+            path = member.name.split("/", 1)[1]
+            if is_ignored_path(path):
+                continue
+            configs = len(tree.config_paths)
+            tree.add(path)
+            if is_readme_path(path):
+                readmes[path] = read_member(archive, member, README_MAX_CHARS)
+            elif len(tree.config_paths) > configs:
+                config_files[path] = read_member(archive, member, CONFIG_MAX_CHARS)
+    except RuntimeError:
+        # Past the size cap: the files already seen are still usable if they
+        # include the root README; the stats are then marked partial.
+        if not any("/" not in name for name in readmes):
+            raise
+        tree.complete = False
+    finally:
+        archive.close()
+    return tree, readmes, config_files
+
+
+def fetch_contents_tarball(repo: RepoCandidate, archive_path: Path | None = None) -> RepoContents:
+    if archive_path is not None:
+        with archive_path.open("rb") as handle:
+            tree, readmes, config_files = scan_tarball(handle)
+    else:
+        url = f"{GITHUB_API_URL}/repos/{repo.full_name}/tarball/{quote(repo.default_branch, safe='')}"
+        with GITHUB.request("GET", url, timeout=60, stream=True) as response:
+            response.raise_for_status()
+            tree, readmes, config_files = scan_tarball(CappedReader(response.raw, TARBALL_MAX_BYTES))
+
+    readme_path = choose_readme(list(readmes))
+    readme = readmes[readme_path] if readme_path else ""
+    return RepoContents(fetch_languages(repo), readme, tree, config_files)
+
+
+def github_graphql(query: str) -> dict[str, Any]:
+    if not os.getenv("GITHUB_TOKEN", "").strip():
+        raise RuntimeError("GraphQL fetch mode needs GITHUB_TOKEN")
+    response = GITHUB.request("POST", GITHUB_GRAPHQL_URL, json={"query": query}, timeout=60)
+    response.raise_for_status()
+    body = response.json()
+    if body.get("errors"):
+        raise RuntimeError(f"GraphQL error: {body['errors'][0].get('message', 'unknown')}")
+    return body.get("data") or {}
+
+
+def fetch_contents_graphql(repo: RepoCandidate) -> RepoContents:
+    tree = fetch_tree(repo)
+    readme_path = choose_readme(tree.readme_paths)
+    blob_paths = ([readme_path] if readme_path else []) + tree.config_paths
+
+    # One aliased object() per file, so README, configs and languages come back
+    # in a single request. json.dumps yields valid GraphQL string literals.
+    fields = [
+        f"b{index}: object(expression: {json.dumps(f'{repo.default_branch}:{path}')}) {{ ... on Blob {{ text }} }}"
+        for index, path in enumerate(blob_paths)
+    ]
+    fields.append("languages(first: 100, orderBy: {field: SIZE, direction: DESC}) { edges { size node { name } } }")
+    query = (
+        f"query {{ repository(owner: {json.dumps(repo.owner)}, name: {json.dumps(repo.name)}) {{ "
+        + " ".join(fields)
+        + " } }"
+    )
+    data = github_graphql(query).get("repository") or {}
+
+    texts = {path: str((data.get(f"b{index}") or {}).get("text") or "") for index, path in enumerate(blob_paths)}
+    languages = {
+        str(edge["node"]["name"]): int(edge["size"]) for edge in (data.get("languages") or {}).get("edges", [])
+    }
+    readme = texts.get(readme_path, "")[:README_MAX_CHARS] if readme_path else ""
+    config_files = {path: text[:CONFIG_MAX_CHARS] for path, text in texts.items() if path != readme_path and text}
+    return RepoContents(languages, readme, tree, config_files)
+
+
+def fetch_repo_contents(repo: RepoCandidate, mode: str, archive_path: Path | None = None) -> RepoContents:
+    fetchers = {"api": fetch_contents_api, "tarball": fetch_contents_tarball, "graphql": fetch_contents_graphql}
+    if mode != "api":
+        try:
+            if mode == "tarball" and archive_path is not None:
+                return fetch_contents_tarball(repo, archive_path)
+            return fetchers[mode](repo)
+        except Exception as exc:
+            print(f"[WARN] {mode} fetch failed ({exc}). Falling back to per-file API calls.")
+    return fetch_contents_api(repo)
+
+
+def resolve_head_sha(repo: RepoCandidate) -> str | None:
+    data = github_get(f"{GITHUB_API_URL}/repos/{repo.full_name}/git/ref/heads/{quote(repo.default_branch, safe='/')}")
+    sha = ((data or {}).get("object") or {}).get("sha")
+    return str(sha) if sha else None
+
+
+def download_tarball(repo: RepoCandidate, ref: str, dest: Path) -> None:
+    url = f"{GITHUB_API_URL}/repos/{repo.full_name}/tarball/{quote(ref, safe='')}"
+    size = 0
+    with GITHUB.request("GET", url, timeout=60, stream=True) as response, dest.open("wb") as handle:
+        response.raise_for_status()
+        for chunk in response.iter_content(chunk_size=1024 * 1024):
+            size += len(chunk)
+            if size > TARBALL_MAX_BYTES:
+                raise RuntimeError(f"tarball exceeds {TARBALL_MAX_BYTES // (1024 * 1024)}MB")
+            handle.write(chunk)
+
+
+def fetch_stage(job: DeepDiveJob, fetch_mode: str, metrics_cache: MetricsCache | None) -> DeepDiveJob:
+    if metrics_cache is not None:
+        try:
+            job.sha = resolve_head_sha(job.repo)
+            job.metrics = metrics_cache.get(job.sha) if job.sha else None
+            if job.metrics is not None:
+                print(f"Metrics cache hit for {job.repo.full_name}@{job.sha[:7]}.")
+            else:
+                # Pin the download to the resolved commit so the cache key matches the content.
+                job.archive_path = job.workdir / "repo.tar.gz"
+                download_tarball(job.repo, job.sha or job.repo.default_branch, job.archive_path)
+        except Exception as exc:
+            print(f"[WARN] Repository metrics unavailable for {job.repo.full_name}: {exc}")
+            job.archive_path = None
+    # In tarball mode the archive downloaded for metrics is reused.
+    job.contents = fetch_repo_contents(job.repo, fetch_mode, job.archive_path)
+    return job
+
+
+def metrics_stage(job: DeepDiveJob, metrics_cache: MetricsCache | None, workers: int) -> DeepDiveJob:
+    try:
+        if job.archive_path is not None and metrics_cache is not None:
+            job.metrics = analyze_archive(job.archive_path, workers)
+            sha = job.sha or job.metrics.get("commit")
+            if sha:
+                metrics_cache.put(sha, job.metrics)
+    except Exception as exc:
+        print(f"[WARN] Repository metrics unavailable for {job.repo.full_name}: {exc}")
+    finally:
+        shutil.rmtree(job.workdir, ignore_errors=True)
+    return job
+
+
+def draft_stage(job: DeepDiveJob) -> DeepDiveJob:
+    repo, contents = job.repo, job.contents
+    job.sections = llm_sections(
+        repo, contents.languages, contents.readme, contents.tree, contents.config_files, job.metrics
+    )
+    if job.sections:
+        print(f"LLM draft generated: {repo.full_name}")
+    else:
+        print(f"LLM draft unavailable. Using structured draft: {repo.full_name}")
+        job.sections = structured_sections(
+            repo, contents.languages, contents.readme, contents.tree, contents.config_files, job.metrics
+        )
+    return job
+
+
+def then(future: Future, pool: ThreadPoolExecutor, fn: Any, *args: Any) -> Future:
+    """Runs fn(result, *args) on pool once future succeeds; failures pass straight through."""
+    result: Future = Future()
+
+    def copy_result(done: Future) -> None:
+        if done.exception() is not None:
+            result.set_exception(done.exception())
+        else:
+            result.set_result(done.result())
+
+    def on_done(done: Future) -> None:
+        if done.exception() is not None:
+            result.set_exception(done.exception())
+            return
+        try:
+            pool.submit(fn, done.result(), *args).add_done_callback(copy_result)
+        except Exception as exc:
+            result.set_exception(exc)
+
+    future.add_done_callback(on_done)
+    return result
+
+
+def top_dirs(tree: RepoTree, limit: int = 12) -> list[tuple[str, int]]:
+    return sorted(tree.dir_counts.items(), key=lambda item: item[1], reverse=True)[:limit]
+
+
+def file_count(tree: RepoTree) -> str:
+    return f"{tree.total_files:,}" if tree.complete else f"{tree.total_files:,}+"
 
 
 def readme_signals(readme: str) -> list[str]:
@@ -266,6 +763,64 @@ def config_summary(config_files: dict[str, str]) -> str:
     return "\n".join(rows)
 
 
+def format_bytes(size: int) -> str:
+    if size < 1024:
+        return f"{size}B"
+    if size < 1024 * 1024:
+        return f"{size / 1024:.1f}KB"
+    return f"{size / (1024 * 1024):.1f}MB"
+
+
+def metrics_summary(metrics: dict[str, Any] | None) -> str:
+    if not metrics:
+        return "- 확인 필요"
+    rows = [
+        f"- **{name}**: {stats['code']:,}줄 ({stats['files']:,} files)"
+        for name, stats in list(metrics["languages"].items())[:8]
+    ]
+    ratio = metrics.get("test_ratio")
+    rows.append(
+        f"- 테스트/소스 코드 비율: {ratio if ratio is not None else '확인 필요'} "
+        f"(테스트 {metrics['tests']['code']:,}줄 / 소스 {metrics['source']['code']:,}줄)"
+    )
+    sizes = metrics["size_percentiles"]
+    rows.append(
+        f"- 파일 크기: 중앙값 {format_bytes(sizes['p50'])}, p90 {format_bytes(sizes['p90'])}, 최대 {format_bytes(sizes['max'])}"
+    )
+    return "\n".join(rows)
+
+
+def dependency_summary(metrics: dict[str, Any] | None) -> str:
+    graph = (metrics or {}).get("dependencies") or {}
+    packages = graph.get("packages") or []
+    if not packages:
+        return ""
+    edges = graph.get("internal_edges") or []
+    ecosystems = ", ".join(sorted({package["ecosystem"] for package in packages}))
+    rows = [f"- 매니페스트 {len(packages)}개 ({ecosystems}), 내부 패키지 의존 {len(edges)}개"]
+    rows += [f"  - `{source}` → `{target}`" for source, target in edges[:10]]
+    external = graph.get("top_external") or []
+    if external:
+        rows.append("- 많이 쓰는 외부 의존성: " + ", ".join(f"`{name}`" for name, _ in external[:8]))
+    return "\n".join(rows)
+
+
+def metrics_brief(metrics: dict[str, Any] | None) -> str:
+    if not metrics:
+        return "unavailable"
+    graph = metrics.get("dependencies") or {}
+    brief = {
+        "loc_by_language": {name: stats["code"] for name, stats in list(metrics["languages"].items())[:8]},
+        "files": metrics["files"],
+        "test_to_source_loc": metrics.get("test_ratio"),
+        "file_size_percentiles": metrics["size_percentiles"],
+        "packages": [package["name"] for package in (graph.get("packages") or [])[:20]],
+        "internal_dependencies": (graph.get("internal_edges") or [])[:20],
+        "top_external_dependencies": [name for name, _ in (graph.get("top_external") or [])[:10]],
+    }
+    return json.dumps(brief, ensure_ascii=False)
+
+
 def safe_json_from_text(text: str) -> dict[str, str] | None:
     candidate = text.strip()
     if candidate.startswith("```"):
@@ -286,19 +841,126 @@ def safe_json_from_text(text: str) -> dict[str, str] | None:
     return {str(k): str(v).strip() for k, v in data.items() if str(v).strip()}
 
 
-def call_anthropic(prompt: str) -> str | None:
-    api_key = os.getenv("ANTHROPIC_API_KEY", "").strip()
-    if not api_key:
+class HedgedAttempt:
+    """One provider call inside hedged_sections().
+
+    Each attempt has its own Session so the losing request can be torn down
+    when the other provider wins. Cancelling also fences off its side effects:
+    once cancel() returns, the attempt never writes LLM_CACHE or a latency
+    sample, even if its response arrives later.
+    """
+
+    def __init__(self) -> None:
+        self.session = requests.Session()
+        self.response: requests.Response | None = None
+        self.cancelled = False
+        self.lock = threading.Lock()
+
+    def unless_cancelled(self, effect: Any) -> None:
+        with self.lock:
+            if not self.cancelled:
+                effect()
+
+    def cancel(self) -> None:
+        with self.lock:
+            self.cancelled = True
+        # Closing the streamed response aborts a body still downloading; closing
+        # the session drops its pooled connections.
+        if self.response is not None:
+            self.response.close()
+        self.session.close()
+
+
+def cached_llm_call(
+    model: str,
+    prompt: str,
+    temperature: float,
+    max_tokens: int | None,
+    request: Any,
+    cached_only: bool = False,
+    attempt: HedgedAttempt | None = None,
+) -> str | None:
+    key = cache_key(model, SYSTEM_PROMPT, prompt, temperature, max_tokens)
+    if cached_only:
+        cached = LLM_CACHE.get(key) if LLM_CACHE.mode in ("auto", "replay") else None
+        if cached is None or not usable_sections(cached):
+            return None
+        print(f"[INFO] LLM cache hit: {key[:12]}")
+        return cached
+    if attempt is not None:
+        # hedged_sections() has already looked the prompt up with cached_only,
+        # so only the request and a guarded store are left.
+        if LLM_CACHE.mode == "replay":
+            print(f"[WARN] LLM cache miss in replay mode: {key[:12]}")
+            return None
+        text = request()
+        if text and usable_sections(text) and LLM_CACHE.mode != "off":
+            attempt.unless_cancelled(lambda: LLM_CACHE.put(key, text, model=model))
+        return text
+    try:
+        return LLM_CACHE.call(key, model, request, validate=usable_sections)
+    except LLMCacheMiss as exc:
+        print(f"[WARN] {exc}")
         return None
+
+
+def timed_post(provider: str, url: str, attempt: HedgedAttempt | None = None, **kwargs: Any) -> requests.Response:
+    # Only real round trips feed the hedge delay; timeouts count at their full length.
+    started = time.monotonic()
+
+    def record() -> None:
+        LLM_LATENCY.record(provider, time.monotonic() - started)
+
+    try:
+        if attempt is None:
+            response = requests.post(url, **kwargs)
+        else:
+            attempt.response = attempt.session.post(url, stream=True, **kwargs)
+            response = attempt.response
+            # Read the body here so the latency covers the whole response.
+            response.content
+    except requests.Timeout:
+        if attempt is None:
+            record()
+        else:
+            attempt.unless_cancelled(record)
+        raise
+    if response.ok:
+        if attempt is None:
+            record()
+        else:
+            attempt.unless_cancelled(record)
+    return response
+
+
+def call_anthropic(prompt: str, cached_only: bool = False, attempt: HedgedAttempt | None = None) -> str | None:
+    model = os.getenv("ANTHROPIC_MODEL", "claude-haiku-4-5-20251001")
     payload = {
-        "model": os.getenv("ANTHROPIC_MODEL", "claude-haiku-4-5-20251001"),
+        "model": model,
         "max_tokens": 3500,
         "temperature": 0.35,
-        "system": "You are a senior backend architect writing Korean technical analysis. Return JSON only.",
+        "system": SYSTEM_PROMPT,
         "messages": [{"role": "user", "content": prompt}],
     }
-    response = requests.post(
+    return cached_llm_call(
+        model,
+        prompt,
+        payload["temperature"],
+        payload["max_tokens"],
+        lambda: request_anthropic(payload, attempt),
+        cached_only,
+        attempt,
+    )
+
+
+def request_anthropic(payload: dict[str, Any], attempt: HedgedAttempt | None = None) -> str | None:
+    api_key = os.getenv("ANTHROPIC_API_KEY", "").strip()
+    if not api_key:
+        return None
+    response = timed_post(
+        "anthropic",
         "https://api.anthropic.com/v1/messages",
+        attempt,
         headers={
             "x-api-key": api_key,
             "anthropic-version": "2023-06-01",
@@ -314,20 +976,29 @@ def call_anthropic(prompt: str) -> str | None:
     return "\n".join(part.get("text", "") for part in body.get("content", []) if part.get("type") == "text").strip()
 
 
-def call_openai(prompt: str) -> str | None:
-    api_key = os.getenv("OPENAI_API_KEY", "").strip()
-    if not api_key:
-        return None
+def call_openai(prompt: str, cached_only: bool = False, attempt: HedgedAttempt | None = None) -> str | None:
+    model = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
     payload = {
-        "model": os.getenv("OPENAI_MODEL", "gpt-4o-mini"),
+        "model": model,
         "messages": [
-            {"role": "system", "content": "You are a senior backend architect writing Korean technical analysis. Return JSON only."},
+            {"role": "system", "content": SYSTEM_PROMPT},
             {"role": "user", "content": prompt},
         ],
         "temperature": 0.35,
     }
-    response = requests.post(
+    return cached_llm_call(
+        model, prompt, payload["temperature"], None, lambda: request_openai(payload, attempt), cached_only, attempt
+    )
+
+
+def request_openai(payload: dict[str, Any], attempt: HedgedAttempt | None = None) -> str | None:
+    api_key = os.getenv("OPENAI_API_KEY", "").strip()
+    if not api_key:
+        return None
+    response = timed_post(
+        "openai",
         "https://api.openai.com/v1/chat/completions",
+        attempt,
         headers={"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"},
         json=payload,
         timeout=120,
@@ -343,17 +1014,18 @@ def build_llm_prompt(
     repo: RepoCandidate,
     languages: dict[str, int],
     readme: str,
-    paths: list[str],
+    tree: RepoTree,
     config_files: dict[str, str],
+    metrics: dict[str, Any] | None = None,
 ) -> str:
-    dirs = top_dirs(paths)
+    dirs = top_dirs(tree)
     config_names = list(config_files.keys())
     return f"""
 다음 GitHub repo를 한국어로 깊게 분석해라.
 출력은 JSON only. key는 아래 10개를 정확히 사용해라.
 
 keys:
-important_reason, one_sentence, product_problem, architecture, core_modules, backend_lessons, stealable_patterns, cautions, apply_to_my_projects, source_links
+{', '.join(REQUIRED_KEYS)}
 
 Repo: {repo.full_name}
 URL: {repo.html_url}
@@ -363,35 +1035,130 @@ Forks: {repo.forks}
 Language: {repo.language}
 Topics: {', '.join(repo.topics)}
 Languages: {languages}
+Files: {file_count(tree)}
 Top directories: {dirs}
 Config files: {config_names}
+Code metrics: {metrics_brief(metrics)}
 README excerpt:
 {readme[:8000]}
 """.strip()
 
 
+def complete_sections(sections: dict[str, str] | None) -> bool:
+    return sections is not None and all(key in sections for key in REQUIRED_KEYS)
+
+
+def usable_sections(text: str) -> bool:
+    return complete_sections(safe_json_from_text(text))
+
+
+def hedge_delay(provider: str) -> float:
+    override = os.getenv("LLM_HEDGE_DELAY", "").strip()
+    if override:
+        try:
+            return max(0.0, float(override))
+        except ValueError:
+            print(f"[WARN] Ignoring invalid LLM_HEDGE_DELAY={override!r}.")
+    try:
+        q = float(os.getenv("LLM_HEDGE_PERCENTILE", "") or HEDGE_PERCENTILE)
+    except ValueError:
+        q = HEDGE_PERCENTILE
+    observed = LLM_LATENCY.percentile(provider, q)
+    if observed is None:
+        return HEDGE_DEFAULT_SECONDS
+    return min(max(observed, HEDGE_MIN_SECONDS), HEDGE_MAX_SECONDS)
+
+
+def hedged_sections(prompt: str, providers: list[tuple[str, Any]]) -> dict[str, str] | None:
+    # A cached answer from either provider wins without starting any request.
+    for _, call in providers:
+        text = call(prompt, cached_only=True)
+        sections = safe_json_from_text(text) if text else None
+        if complete_sections(sections):
+            return sections
+
+    results: queue.Queue = queue.Queue()
+    attempts: list[HedgedAttempt] = []
+
+    def run(name: str, call: Any, attempt: HedgedAttempt) -> None:
+        try:
+            text = call(prompt, attempt=attempt)
+        except Exception as exc:
+            if not attempt.cancelled:
+                print(f"[WARN] {name} request failed: {exc}")
+            text = None
+        finally:
+            attempt.session.close()
+        results.put((name, safe_json_from_text(text) if text else None))
+
+    def start(index: int) -> None:
+        name, call = providers[index]
+        attempt = HedgedAttempt()
+        attempts.append(attempt)
+        # Daemon threads: a request still waiting for its response headers
+        # cannot be interrupted, so it must never block the run from finishing.
+        threading.Thread(target=run, args=(name, call, attempt), name=f"llm-{name}", daemon=True).start()
+
+    start(0)
+    started, running = 1, 1
+    deadline = time.monotonic() + hedge_delay(providers[0][0])
+    partial: dict[str, str] | None = None
+    while running or started < len(providers):
+        timeout = max(0.0, deadline - time.monotonic()) if started < len(providers) else None
+        try:
+            name, sections = results.get(timeout=timeout)
+        except queue.Empty:
+            print(f"[INFO] {providers[0][0]} is slower than its hedge delay; also asking {providers[started][0]}.")
+            start(started)
+            started, running = started + 1, running + 1
+            continue
+        running -= 1
+        if complete_sections(sections):
+            if running:
+                print(f"[INFO] Using {name} response; cancelling the slower request.")
+            for attempt in attempts:
+                attempt.cancel()
+            return sections
+        partial = partial or sections
+        if not running and started < len(providers):
+            # Nothing usable in flight: start the next provider without waiting.
+            start(started)
+            started, running = started + 1, running + 1
+    # No response had every key; fall back to the first parseable one.
+    return partial
+
+
 def llm_sections(
     repo: RepoCandidate,
     languages: dict[str, int],
     readme: str,
-    paths: list[str],
+    tree: RepoTree,
     config_files: dict[str, str],
+    metrics: dict[str, Any] | None = None,
 ) -> dict[str, str] | None:
-    prompt = build_llm_prompt(repo, languages, readme, paths, config_files)
-    text = call_anthropic(prompt) or call_openai(prompt)
-    if not text:
-        return None
-    return safe_json_from_text(text)
+    prompt = build_llm_prompt(repo, languages, readme, tree, config_files, metrics)
+    if os.getenv("LLM_HEDGE", "1").strip() == "0":
+        # Sequential: the next provider is asked whenever a reply lacks a key.
+        partial: dict[str, str] | None = None
+        for call in (call_anthropic, call_openai):
+            text = call(prompt)
+            sections = safe_json_from_text(text) if text else None
+            if complete_sections(sections):
+                return sections
+            partial = partial or sections
+        return partial
+    return hedged_sections(prompt, [("anthropic", call_anthropic), ("openai", call_openai)])
 
 
 def structured_sections(
     repo: RepoCandidate,
     languages: dict[str, int],
     readme: str,
-    paths: list[str],
+    tree: RepoTree,
     config_files: dict[str, str],
+    metrics: dict[str, Any] | None = None,
 ) -> dict[str, str]:
-    dirs = top_dirs(paths)
+    dirs = top_dirs(tree)
     dirs_text = "\n".join(f"- `{name}/`: {count} files" for name, count in dirs) or "- 확인 필요"
     signals = "\n".join(f"- {line}" for line in readme_signals(readme)) or "- 확인 필요"
     return {
@@ -405,9 +1172,10 @@ def structured_sections(
         ),
         "architecture": (
             f"Primary language는 `{repo.language}`이고 언어 구성은 다음과 같다.\n\n{language_summary(languages)}\n\n"
-            f"상위 디렉터리 분포:\n{dirs_text}"
+            f"상위 디렉터리 분포 (전체 {file_count(tree)}개 파일):\n{dirs_text}\n\n"
+            f"코드 규모 (기본 브랜치 오프라인 분석):\n{metrics_summary(metrics)}"
         ),
-        "core_modules": config_summary(config_files),
+        "core_modules": "\n\n".join(part for part in (config_summary(config_files), dependency_summary(metrics)) if part),
         "backend_lessons": (
             "- README에서 quickstart와 실제 설정 파일이 연결되는지 확인해야 한다.\n"
             "- CI, Dockerfile, package/build 설정은 재현 가능한 개발환경의 핵심이다.\n"
@@ -514,7 +1282,30 @@ def main() -> int:
     parser = argparse.ArgumentParser()
     parser.add_argument("--force", action="store_true", help="Ignore 48-hour guard")
     parser.add_argument("--dry-run", action="store_true", help="Do not write post/state")
+    parser.add_argument("--count", type=int, default=1, help="Number of repos to analyze in this run")
+    parser.add_argument(
+        "--fetch-mode",
+        choices=FETCH_MODES,
+        default=os.getenv("STAR_REPO_FETCH_MODE", "api"),
+        help="How to read README/config files/paths (falls back to api on failure)",
+    )
+    parser.add_argument(
+        "--metrics",
+        action=argparse.BooleanOptionalAction,
+        default=os.getenv("STAR_REPO_METRICS", "") == "1",
+        help="Download the default-branch archive and compute LOC/test/dependency metrics (cached by commit SHA)",
+    )
+    parser.add_argument("--fetch-workers", type=int, default=4, help="Repos fetched from GitHub concurrently")
+    parser.add_argument("--metrics-workers", type=int, default=1, help="Archives analyzed concurrently")
+    parser.add_argument("--llm-workers", type=int, default=2, help="LLM drafts requested concurrently")
+    cache_mode = parser.add_mutually_exclusive_group()
+    cache_mode.add_argument("--record", action="store_true", help="Always call the LLM APIs and refresh cached responses")
+    cache_mode.add_argument("--replay", action="store_true", help="Serve cached LLM responses only; never call the APIs")
     args = parser.parse_args()
+    if args.record:
+        LLM_CACHE.mode = "record"
+    elif args.replay:
+        LLM_CACHE.mode = "replay"
 
     state = load_state()
     now = now_kst()
@@ -526,53 +1317,118 @@ def main() -> int:
     min_stars = int(state.get("min_stars") or 50000)
     analyzed = {str(repo) for repo in state.get("analyzed", [])}
 
-    repo = find_next_candidate(min_stars, analyzed)
-    refreshed_at = iso_now_kst()
-    if not repo:
+    queue = CandidateQueue.load(min_stars)
+    refresh_pool = ThreadPoolExecutor(max_workers=1)
+    refresh: Future | None = None
+    if queue.is_stale(now):
+        if any(name not in analyzed for name in queue.names):
+            # Stale but usable: pick from the cached ranking now and re-run the
+            # search in the background while the repos are being analyzed.
+            refresh = refresh_pool.submit(search_candidate_names, min_stars)
+        else:
+            queue.replace(search_candidate_names(min_stars), iso_now_kst())
+
+    # Stages: candidate selection (here, one metadata call per pick) ->
+    # GitHub fetch -> archive metrics -> LLM draft -> post writing (below, in
+    # completion order). Each stage has its own pool, so a slow LLM call does
+    # not hold up the next repo's downloads.
+    fetch_pool = ThreadPoolExecutor(max_workers=max(1, args.fetch_workers))
+    metrics_pool = ThreadPoolExecutor(max_workers=max(1, args.metrics_workers))
+    draft_pool = ThreadPoolExecutor(max_workers=max(1, args.llm_workers))
+    metrics_cache = MetricsCache() if args.metrics else None
+    metrics_processes = max(1, (os.cpu_count() or 1) // max(1, args.metrics_workers))
+    workroot = Path(tempfile.mkdtemp(prefix="star-repo-"))
+
+    jobs: dict[Future, RepoCandidate] = {}
+    selected: set[str] = set()
+    exhausted = False
+    while len(jobs) < max(1, args.count):
+        repo = find_next_candidate(queue, analyzed | selected)
+        if not repo and refresh is not None:
+            queue.replace(refresh.result(), iso_now_kst())
+            refresh = None
+            repo = find_next_candidate(queue, analyzed | selected)
+        if not repo:
+            exhausted = True
+            break
+        print(f"Selected repo: {repo.full_name} ({repo.stars:,} stars)")
+        selected.add(repo.full_name)
+        job = DeepDiveJob(repo, workroot / repo_slug(repo.full_name))
+        job.workdir.mkdir()
+        fetched = fetch_pool.submit(fetch_stage, job, args.fetch_mode, metrics_cache)
+        measured = then(fetched, metrics_pool, metrics_stage, metrics_cache, metrics_processes)
+        jobs[then(measured, draft_pool, draft_stage)] = repo
+    refresh_pool.shutdown(wait=False)
+
+    if not jobs:
         print("No candidate found. Mark exhausted=true.")
+        shutil.rmtree(workroot, ignore_errors=True)
         if not args.dry_run:
+            queue.save(analyzed)
             next_state = dict(state)
             next_state["exhausted"] = True
-            next_state["last_candidate_refresh"] = refreshed_at
+            next_state["last_candidate_refresh"] = queue.refreshed_at
             atomic_save_state(next_state)
         return 0
 
-    print(f"Selected repo: {repo.full_name} ({repo.stars:,} stars)")
-    languages = fetch_languages(repo)
-    readme = fetch_readme(repo)
-    paths = fetch_tree(repo)
-    config_files = fetch_config_files(repo, paths)
-
-    sections = llm_sections(repo, languages, readme, paths, config_files)
-    if sections:
-        print("LLM draft generated.")
-    else:
-        print("LLM draft unavailable. Using structured draft.")
-        sections = structured_sections(repo, languages, readme, paths, config_files)
-
-    post_path = POSTS_DIR / f"{now.strftime('%Y-%m-%d')}-repo-deep-dive-{repo_slug(repo.full_name)}.md"
-    if post_path.exists():
-        print(f"Skip: post already exists: {post_path.name}")
-        return 0
-
-    if args.dry_run:
-        print(f"Dry run. Would create: {post_path.relative_to(ROOT_DIR)}")
-        return 0
-
-    POSTS_DIR.mkdir(parents=True, exist_ok=True)
-    post_path.write_text(build_post(repo, sections, now), encoding="utf-8")
-
-    next_state = dict(state)
-    next_state["min_stars"] = min_stars
-    next_state["last_run_at"] = now.isoformat(timespec="seconds")
-    next_state["last_candidate_refresh"] = refreshed_at
-    next_state["exhausted"] = False
-    analyzed.add(repo.full_name)
-    next_state["analyzed"] = sorted(analyzed)
-    atomic_save_state(next_state)
-
-    print(f"Created: {post_path.relative_to(ROOT_DIR)}")
-    return 0
+    # Failed repos go back to the front of the queue for the next run.
+    failed: list[str] = []
+    in_flight = [repo.full_name for repo in jobs.values()]
+    try:
+        for future in as_completed(jobs):
+            repo = jobs[future]
+            in_flight.remove(repo.full_name)
+            try:
+                job = future.result()
+            except Exception as exc:
+                print(f"[ERROR] {repo.full_name} failed: {exc}")
+                failed.append(repo.full_name)
+                continue
+
+            post_path = POSTS_DIR / f"{now.strftime('%Y-%m-%d')}-repo-deep-dive-{repo_slug(repo.full_name)}.md"
+            if post_path.exists():
+                print(f"Skip: post already exists: {post_path.name}")
+                continue
+
+            if args.dry_run:
+                print(f"Dry run. Would create: {post_path.relative_to(ROOT_DIR)}")
+                continue
+
+            POSTS_DIR.mkdir(parents=True, exist_ok=True)
+            post_path.write_text(build_post(repo, job.sections, now), encoding="utf-8")
+
+            # Record each post as soon as it is written, so a crash later in
+            # the batch keeps the finished ones.
+            analyzed.add(repo.full_name)
+            state["min_stars"] = min_stars
+            state["last_run_at"] = now.isoformat(timespec="seconds")
+            state["exhausted"] = False
+            state["analyzed"] = sorted(analyzed)
+            state["last_candidate_refresh"] = queue.refreshed_at
+            queue.save(analyzed, failed + in_flight)
+            atomic_save_state(state)
+            LLM_LATENCY.save()
+            print(f"Created: {post_path.relative_to(ROOT_DIR)}")
+    finally:
+        for pool in (fetch_pool, metrics_pool, draft_pool):
+            pool.shutdown(wait=True, cancel_futures=True)
+        shutil.rmtree(workroot, ignore_errors=True)
+
+    if not args.dry_run:
+        if refresh is not None:
+            try:
+                queue.replace(refresh.result(), iso_now_kst())
+            except Exception as exc:
+                print(f"[WARN] Background candidate refresh failed; keeping the cached queue: {exc}")
+        state["last_candidate_refresh"] = queue.refreshed_at
+        # Failed repos were requeued above, so the queue is only used up when
+        # nothing is left after putting them back.
+        if exhausted and not queue.remaining(analyzed, failed):
+            state["exhausted"] = True
+        queue.save(analyzed, failed)
+        atomic_save_state(state)
+        LLM_LATENCY.save()
+    return 1 if failed else 0
 
 
 if __name__ == "__main__":
@@ -0,0 +1,76 @@
+"""Shared test fixtures.
+
+The scripts are standalone modules that import their siblings directly, so
+scripts/ goes on sys.path. `stub_server` is a local HTTP stand-in: each test
+assigns a handler(method, path, body) that returns (status, body) or
+(status, body, headers), and the server records every request it receives
+along with its headers.
+"""
+from __future__ import annotations
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+from urllib.parse import urlsplit
+
+import pytest
+
+ROOT_DIR = Path(__file__).resolve().parents[1]
+FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures"
+sys.path.insert(0, str(ROOT_DIR / "scripts"))
+
+
+class StubServer:
+    def __init__(self) -> None:
+        self.handler: Callable[[str, str, bytes], tuple] = lambda method, path, body: (404, b"")
+        self.requests: list[tuple[str, str]] = []
+        self.request_headers: list[dict[str, str]] = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def respond(self) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                stub.requests.append((self.command, self.path))
+                stub.request_headers.append(dict(self.headers))
+                status, payload, *extra = stub.handler(self.command, self.path, body)
+                if isinstance(payload, (dict, list)):
+                    data, content_type = json.dumps(payload).encode("utf-8"), "application/json"
+                elif isinstance(payload, str):
+                    data, content_type = payload.encode("utf-8"), "text/html; charset=utf-8"
+                else:
+                    data, content_type = payload, "application/octet-stream"
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (extra[0] if extra else {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = respond
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+        self.thread.start()
+
+    def paths(self, method: str = "GET") -> list[str]:
+        return [urlsplit(path).path for command, path in self.requests if command == method]
+
+    def close(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    server = StubServer()
+    yield server
+    server.close()
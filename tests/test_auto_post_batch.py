@@ -0,0 +1,204 @@
+"""Message Batches backfill against a local stand-in for the batch API."""
+from __future__ import annotations
+
+import json
+import re
+from datetime import date
+
+import pytest
+
+import auto_post
+from llm_cache import LLMCache
+
+START = date(2026, 1, 1)
+END = date(2026, 1, 2)
+
+
+class BatchAPI:
+    """Submit, poll (in_progress once, then ended) and JSONL results."""
+
+    def __init__(self, base_url: str) -> None:
+        self.base_url = base_url
+        self.batches: dict[str, list[dict]] = {}
+        self.polls: dict[str, int] = {}
+        self.fail: set[str] = set()
+        self.texts: dict[str, str] = {}
+        self.results_status = 200
+
+    def __call__(self, method: str, path: str, body: bytes):
+        if method == "POST" and path == "/v1/messages/batches":
+            batch_id = f"msgbatch_{len(self.batches) + 1}"
+            self.batches[batch_id] = json.loads(body)["requests"]
+            return 200, {"id": batch_id, "processing_status": "in_progress"}
+        match = re.fullmatch(r"/v1/messages/batches/(\w+)(/results)?", path)
+        if not match or match.group(1) not in self.batches:
+            return 404, {"error": {"type": "not_found_error"}}
+        batch_id = match.group(1)
+        if match.group(2):
+            if self.results_status != 200:
+                return self.results_status, {"error": {"type": "api_error"}}
+            return 200, "\n".join(json.dumps(self.result(request)) for request in self.batches[batch_id])
+        self.polls[batch_id] = self.polls.get(batch_id, 0) + 1
+        ended = self.polls[batch_id] > 1
+        return 200, {
+            "id": batch_id,
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {"processing": 0 if ended else len(self.batches[batch_id])},
+            "results_url": f"{self.base_url}/v1/messages/batches/{batch_id}/results" if ended else None,
+        }
+
+    def result(self, request: dict) -> dict:
+        custom_id = request["custom_id"]
+        if custom_id in self.fail:
+            return {
+                "custom_id": custom_id,
+                "result": {"type": "errored", "error": {"type": "error", "error": {"type": "overloaded_error"}}},
+            }
+        text = self.texts.get(custom_id) or json.dumps({"title": f"Post {custom_id}", "content": "## Body\n\nGenerated."})
+        return {
+            "custom_id": custom_id,
+            "result": {
+                "type": "succeeded",
+                "message": {
+                    "content": [{"type": "text", "text": text}],
+                    "stop_reason": "end_turn",
+                    "usage": {"input_tokens": 10, "output_tokens": 20},
+                },
+            },
+        }
+
+    def submitted(self, batch_id: str) -> list[str]:
+        return [request["custom_id"] for request in self.batches[batch_id]]
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch, stub_server):
+    posts_dir = tmp_path / "_posts"
+    posts_dir.mkdir()
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test-key")
+    monkeypatch.setattr(auto_post, "ANTHROPIC_BASE_URL", stub_server.url)
+    monkeypatch.setattr(auto_post, "POSTS_DIR", posts_dir)
+    monkeypatch.setattr(auto_post, "STATE_FILE", tmp_path / "state.json")
+    monkeypatch.setattr(auto_post, "BATCH_JOB_FILE", tmp_path / "batch_job.json")
+    monkeypatch.setattr(auto_post, "LLM_CACHE", LLMCache(directory=tmp_path / "llm_cache"))
+    monkeypatch.setattr(auto_post, "BATCH_POLL_INITIAL_SECONDS", 0)
+    monkeypatch.setattr(
+        auto_post,
+        "fetch_news_items",
+        lambda now, limit=8: [
+            auto_post.NewsItem(
+                title=f"Model release {now:%m-%d}",
+                url=f"https://example.com/{now:%Y%m%d}",
+                source="Example",
+                published="",
+                ts=now.timestamp(),
+            )
+        ],
+    )
+    batch_api = BatchAPI(stub_server.url)
+    stub_server.handler = batch_api
+    return batch_api
+
+
+def post_names() -> list[str]:
+    return sorted(path.name for path in auto_post.POSTS_DIR.glob("*.md"))
+
+
+def test_submit_poll_and_publish(api):
+    state = {"topic_index": 0}
+    created, errors = auto_post.run_batch_backfill(START, END, state)
+
+    assert (created, errors) == (4, [])
+    assert api.submitted("msgbatch_1") == ["2026-01-01_news", "2026-01-01_study", "2026-01-02_news", "2026-01-02_study"]
+    assert api.polls["msgbatch_1"] == 2
+    assert post_names() == [
+        "2026-01-01-ai-news-daily.md",
+        "2026-01-01-study-python.md",
+        "2026-01-02-ai-news-daily.md",
+        "2026-01-02-study-nextjs.md",
+    ]
+    assert not auto_post.BATCH_JOB_FILE.exists()
+    assert state["topic_index"] == 2
+
+
+def test_failed_results_are_resubmitted_alone(api):
+    state = {"topic_index": 0}
+    api.fail = {"2026-01-02_news"}
+    created, errors = auto_post.run_batch_backfill(START, END, state)
+
+    assert created == 3
+    assert len(errors) == 1 and errors[0].startswith("2026-01-02_news: batch request errored")
+    # The ended batch is cleared, and the topic only advances once the range is complete.
+    assert not auto_post.BATCH_JOB_FILE.exists()
+    assert state["topic_index"] == 0
+
+    api.fail = set()
+    created, errors = auto_post.run_batch_backfill(START, END, state)
+    assert (created, errors) == (1, [])
+    assert api.submitted("msgbatch_2") == ["2026-01-02_news"]
+    assert state["topic_index"] == 2
+
+
+def test_cached_prompts_are_not_resubmitted(api):
+    auto_post.run_batch_backfill(START, START, {"topic_index": 0})
+    for path in auto_post.POSTS_DIR.glob("*.md"):
+        path.unlink()
+
+    created, errors = auto_post.run_batch_backfill(START, START, {"topic_index": 0})
+    assert (created, errors) == (2, [])
+    assert list(api.batches) == ["msgbatch_1"]
+    assert post_names() == ["2026-01-01-ai-news-daily.md", "2026-01-01-study-python.md"]
+
+
+def test_unfinished_batch_for_another_range_is_finished_first(api):
+    api.results_status = 500
+    with pytest.raises(RuntimeError, match="batch results error: 500"):
+        auto_post.run_batch_backfill(START, START, {"topic_index": 0})
+    assert json.loads(auto_post.BATCH_JOB_FILE.read_text())["batch_id"] == "msgbatch_1"
+
+    api.results_status = 200
+    state = {"topic_index": 0}
+    created, errors = auto_post.run_batch_backfill(END, END, state)
+    assert (created, errors) == (4, [])
+    assert api.submitted("msgbatch_2") == ["2026-01-02_news", "2026-01-02_study"]
+    assert state["topic_index"] == 2
+    assert not auto_post.BATCH_JOB_FILE.exists()
+
+
+def test_expired_results_are_cleared_and_resubmitted(api):
+    api.results_status = 404
+    created, errors = auto_post.run_batch_backfill(START, START, {"topic_index": 0})
+    assert created == 0
+    assert errors == [
+        "2026-01-01_news: no result in batch msgbatch_1",
+        "2026-01-01_study: no result in batch msgbatch_1",
+    ]
+    assert not auto_post.BATCH_JOB_FILE.exists()
+
+    api.results_status = 200
+    created, errors = auto_post.run_batch_backfill(START, START, {"topic_index": 0})
+    assert (created, errors) == (2, [])
+    assert api.submitted("msgbatch_2") == ["2026-01-01_news", "2026-01-01_study"]
+
+
+def test_unparsable_result_is_not_cached_and_is_resubmitted(api):
+    api.texts = {"2026-01-01_news": '{"title": "Truncated", "content": "## Bo'}
+    created, errors = auto_post.run_batch_backfill(START, START, {"topic_index": 0})
+    assert created == 1
+    assert len(errors) == 1 and errors[0].startswith("2026-01-01_news:")
+
+    api.texts = {}
+    created, errors = auto_post.run_batch_backfill(START, START, {"topic_index": 0})
+    assert (created, errors) == (1, [])
+    assert api.submitted("msgbatch_2") == ["2026-01-01_news"]
+
+
+def test_unusable_cached_reply_is_discarded_and_resubmitted(api):
+    news = auto_post.backfill_post_request(auto_post.build_backfill_jobs(START, START, 0)[0])
+    payload, key = auto_post.build_claude_payload(news.system_prompt, news.user_prompt, news.prompt_rules)
+    auto_post.LLM_CACHE.put(key, "not json", model=payload["model"])
+
+    created, errors = auto_post.run_batch_backfill(START, START, {"topic_index": 0})
+    assert (created, errors) == (2, [])
+    assert api.submitted("msgbatch_1") == ["2026-01-01_news", "2026-01-01_study"]
+    assert auto_post.usable_post_output(auto_post.LLM_CACHE.get(key))
@@ -0,0 +1,112 @@
+"""GitHubClient conditional requests and rate limiting against a local stand-in.
+
+The client's clock is replaced, so waits are recorded instead of slept and
+"now" only moves when the client sleeps.
+"""
+from __future__ import annotations
+
+import pytest
+
+import github_client
+
+NOW = 1_800_000_000.0
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = NOW
+        self.sleeps: list[float] = []
+
+    def time(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(round(seconds, 2))
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(github_client, "time", fake)
+    return fake
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch, clock):
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    return github_client.GitHubClient("test-agent", cache_dir=tmp_path / "github_cache")
+
+
+def replies(*responses):
+    queue = list(responses)
+    return lambda method, path, body: queue.pop(0)
+
+
+def test_not_modified_is_served_from_disk(client, stub_server):
+    url = f"{stub_server.url}/repos/octo/repo"
+    stub_server.handler = replies(
+        (200, {"stargazers_count": 1}, {"ETag": '"v1"', "Last-Modified": "Mon, 01 Jun 2026 00:00:00 GMT"}),
+        (304, b"", {"ETag": '"v1"'}),
+    )
+
+    assert client.get_json(url) == {"stargazers_count": 1}
+    assert client.get_json(url) == {"stargazers_count": 1}
+    first, second = stub_server.request_headers
+    assert "If-None-Match" not in first
+    assert second["If-None-Match"] == '"v1"'
+    assert second["If-Modified-Since"] == "Mon, 01 Jun 2026 00:00:00 GMT"
+
+
+def test_retry_after_is_honoured(client, stub_server, clock):
+    stub_server.handler = replies(
+        (429, {"message": "slow down"}, {"Retry-After": "30"}),
+        (200, {"ok": True}),
+    )
+
+    assert client.get_json(f"{stub_server.url}/repos/octo/repo") == {"ok": True}
+    assert clock.sleeps == [30]
+    assert len(stub_server.requests) == 2
+
+
+def test_primary_limit_waits_for_the_reset(client, stub_server, clock):
+    reset = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(NOW + 120))}
+    stub_server.handler = replies(
+        (403, {"message": "API rate limit exceeded"}, reset),
+        (200, {"ok": True}, {"X-RateLimit-Remaining": "4999", "X-RateLimit-Reset": str(int(NOW + 3600))}),
+    )
+
+    assert client.get_json(f"{stub_server.url}/repos/octo/repo") == {"ok": True}
+    # One wait until a second past the reset; the retry then goes straight out.
+    assert clock.sleeps == [121]
+    assert client.limits["core"] == (4999, NOW + 3600)
+
+
+def test_wait_past_the_limit_fails_fast(client, stub_server, clock):
+    reset = {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(int(NOW + github_client.MAX_WAIT_SECONDS + 60))}
+    stub_server.handler = replies((403, {"message": "API rate limit exceeded"}, reset))
+
+    with pytest.raises(RuntimeError, match="rate limit"):
+        client.get_json(f"{stub_server.url}/repos/octo/repo")
+    assert clock.sleeps == []
+    assert len(stub_server.requests) == 1
+
+
+def test_low_budget_spreads_the_remaining_calls(client, stub_server, clock):
+    budget = {"X-RateLimit-Remaining": "3", "X-RateLimit-Reset": str(int(NOW + 60)), "X-RateLimit-Resource": "core"}
+    stub_server.handler = replies((200, {"n": 1}, budget), (200, {"n": 2}))
+
+    client.get_json(f"{stub_server.url}/repos/octo/one")
+    client.get_json(f"{stub_server.url}/repos/octo/two")
+    # Three calls left in a 60s window: the next one waits 60 / (3 + 1).
+    assert clock.sleeps == [15]
+
+
+def test_secondary_limit_without_retry_after(client, stub_server, clock):
+    stub_server.handler = replies(
+        (403, "You have exceeded a secondary rate limit."),
+        (200, {"ok": True}),
+    )
+
+    assert client.get_json(f"{stub_server.url}/repos/octo/repo") == {"ok": True}
+    assert clock.sleeps == [github_client.SECONDARY_LIMIT_WAIT_SECONDS]
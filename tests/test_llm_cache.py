@@ -0,0 +1,37 @@
+"""LLMCache.call with a validate callable."""
+from __future__ import annotations
+
+import pytest
+
+from llm_cache import LLMCache, LLMCacheMiss
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMCache(directory=tmp_path / "llm_cache")
+
+
+def is_json(text: str) -> bool:
+    return text.startswith("{")
+
+
+def test_rejected_reply_is_not_cached(cache):
+    replies = iter(["not json", '{"ok": true}'])
+
+    assert cache.call("key", "model", lambda: next(replies), validate=is_json) == "not json"
+    assert cache.get("key") is None
+    assert cache.call("key", "model", lambda: next(replies), validate=is_json) == '{"ok": true}'
+    assert cache.call("key", "model", lambda: pytest.fail("served from cache"), validate=is_json) == '{"ok": true}'
+
+
+def test_cached_reply_that_fails_validation_is_requested_again(cache):
+    cache.put("key", "not json")
+    assert cache.call("key", "model", lambda: '{"ok": true}', validate=is_json) == '{"ok": true}'
+    assert cache.get("key") == '{"ok": true}'
+
+
+def test_replay_treats_a_rejected_entry_as_a_miss(cache):
+    cache.put("key", "not json")
+    cache.mode = "replay"
+    with pytest.raises(LLMCacheMiss):
+        cache.call("key", "model", lambda: pytest.fail("replay must not call"), validate=is_json)
@@ -0,0 +1,213 @@
+"""Full-archive Naver import against a local stand-in for blog.naver.com.
+
+The stand-in serves the recorded PostTitleListAsync pages in
+tests/fixtures/naver/list/ (two posts per page, newest first) and the mobile
+PostView pages in tests/fixtures/naver/posts/, plus any images a test registers.
+"""
+from __future__ import annotations
+
+import base64
+import json
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+import import_naver_blog
+import naver_images
+from conftest import FIXTURES_DIR
+
+LIST_DIR = FIXTURES_DIR / "naver" / "list"
+POSTS_DIR = FIXTURES_DIR / "naver" / "posts"
+BLOG_ID = "qoxmfaktmxj"
+# 1x1 PNG.
+PIXEL = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mP8z8BQDwAEhQGAhKmMIQAAAABJRU5ErkJggg=="
+)
+
+
+class NaverStandIn:
+    def __init__(self) -> None:
+        self.broken: set[str] = set()
+        self.pages: dict[str, str] = {}
+        self.images: dict[str, bytes] = {}
+
+    def __call__(self, method: str, path: str, body: bytes):
+        url = urlsplit(path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if url.path == "/PostTitleListAsync.naver":
+            page = LIST_DIR / f"page-{query['currentPage']}.json"
+            if not page.exists():
+                return 200, {"resultCode": "S", "postList": [], "totalCount": "6"}
+            return 200, page.read_text(encoding="utf-8")
+        if url.path == "/PostView.naver":
+            log_no = query["logNo"]
+            if log_no in self.broken:
+                return 500, "<html>error</html>"
+            if log_no in self.pages:
+                return 200, self.pages[log_no]
+            page = POSTS_DIR / f"{log_no}.html"
+            if page.exists():
+                return 200, page.read_text(encoding="utf-8")
+        if url.path in self.images:
+            return 200, self.images[url.path]
+        return 404, "<html>not found</html>"
+
+
+@pytest.fixture
+def naver(tmp_path, monkeypatch, stub_server):
+    (tmp_path / "_posts").mkdir()
+    monkeypatch.setattr(import_naver_blog, "ROOT_DIR", tmp_path)
+    monkeypatch.setattr(import_naver_blog, "POSTS_DIR", tmp_path / "_posts")
+    monkeypatch.setattr(import_naver_blog, "ARCHIVE_CHECKPOINT_FILE", tmp_path / "checkpoint.json")
+    monkeypatch.setattr(import_naver_blog.ImportManifest.__init__, "__defaults__", (tmp_path / "manifest.json",))
+    monkeypatch.setattr(import_naver_blog, "NAVER_BLOG_BASE_URL", stub_server.url)
+    monkeypatch.setattr(import_naver_blog, "NAVER_MOBILE_BASE_URL", stub_server.url)
+    monkeypatch.setattr(import_naver_blog, "ARCHIVE_PAGE_SIZE", 2)
+    monkeypatch.setattr(import_naver_blog, "PER_HOST_INTERVAL_SECONDS", 0.0)
+    stand_in = NaverStandIn()
+    stub_server.handler = stand_in
+    return stand_in
+
+
+@contextmanager
+def importer():
+    with ThreadPoolExecutor(max_workers=4) as fetch_pool, ProcessPoolExecutor(max_workers=2) as convert_pool:
+        yield import_naver_blog.Importer(BLOG_ID, True, fetch_pool, convert_pool, "soup", None)
+
+
+def run_archive(limit: int = 0, restart: bool = False) -> None:
+    with importer() as running:
+        import_naver_blog.import_archive(running, limit, restart)
+
+
+def imported() -> list[str]:
+    return sorted(path.name for path in import_naver_blog.POSTS_DIR.glob("*.md"))
+
+
+def checkpoint() -> dict:
+    return json.loads(import_naver_blog.ARCHIVE_CHECKPOINT_FILE.read_text(encoding="utf-8"))
+
+
+def fetched_posts(stub_server) -> list[str]:
+    return sorted(
+        parse_qs(urlsplit(path).query)["logNo"][0] for method, path in stub_server.requests if "PostView" in path
+    )
+
+
+def list_pages(stub_server) -> list[int]:
+    return [
+        int(parse_qs(urlsplit(path).query)["currentPage"][0])
+        for method, path in stub_server.requests
+        if "PostTitleListAsync" in path
+    ]
+
+
+def test_full_walk_imports_every_listed_post(naver, stub_server, capsys):
+    run_archive()
+
+    assert list_pages(stub_server) == [1, 2, 3]
+    assert imported() == [
+        "2019-01-01-naver-221000000002.md",
+        "2022-01-09-naver-222000000003.md",
+        "2024-03-05-naver-223000000001.md",
+        # Listed as "3시간 전".
+        f"{datetime.now(import_naver_blog.KST) - timedelta(hours=3):%Y-%m-%d}-naver-223000000005.md",
+    ]
+    # An unknown addDate skips only that entry; it is never fetched.
+    assert "[SKIP] 222500000006: Unknown addDate format" in capsys.readouterr().out
+    assert "222500000006" not in fetched_posts(stub_server)
+    # The deleted post fails and keeps the checkpoint alive for a retry.
+    assert [entry["log_no"] for entry in checkpoint()["failed"]] == ["220000000004"]
+    manifest = json.loads((import_naver_blog.ROOT_DIR / "manifest.json").read_text(encoding="utf-8"))
+    assert sorted(manifest) == ["221000000002", "222000000003", "223000000001", "223000000005"]
+
+
+def test_killed_walk_resumes_after_cursor(naver, stub_server):
+    run_archive(limit=2)
+    assert fetched_posts(stub_server) == ["223000000001", "223000000005"]
+    assert (checkpoint()["page"], checkpoint()["cursor_log_no"]) == (1, "223000000001")
+
+    stub_server.requests.clear()
+    run_archive()
+    assert list_pages(stub_server) == [1, 2, 3]
+    assert fetched_posts(stub_server) == ["220000000004", "221000000002", "222000000003"]
+    assert len(imported()) == 4
+
+
+def test_failed_posts_are_retried_before_walking_on(naver, stub_server):
+    naver.broken = {"221000000002"}
+    run_archive()
+    assert sorted(entry["log_no"] for entry in checkpoint()["failed"]) == ["220000000004", "221000000002"]
+    assert "2019-01-01-naver-221000000002.md" not in imported()
+
+    naver.broken = set()
+    naver.pages["220000000004"] = (POSTS_DIR / "222000000003.html").read_text(encoding="utf-8")
+    stub_server.requests.clear()
+    run_archive()
+
+    assert fetched_posts(stub_server) == ["220000000004", "221000000002"]
+    # Retried posts keep the date from the list page they were first seen on.
+    assert "2016-07-30-naver-220000000004.md" in imported()
+    assert "2019-01-01-naver-221000000002.md" in imported()
+    assert not import_naver_blog.ARCHIVE_CHECKPOINT_FILE.exists()
+
+
+def test_restart_ignores_the_checkpoint(naver, stub_server):
+    run_archive(limit=2)
+    stub_server.requests.clear()
+    run_archive(limit=2, restart=True)
+    assert list_pages(stub_server) == [1]
+    assert fetched_posts(stub_server) == []
+
+
+def test_localized_post_stays_localized_on_resync(naver, stub_server, tmp_path, monkeypatch):
+    monkeypatch.setattr(naver_images, "ROOT_DIR", tmp_path)
+    monkeypatch.setattr(naver_images, "ASSETS_DIR", tmp_path / "assets" / "naver")
+    naver.images["/image.png"] = PIXEL
+    page = (POSTS_DIR / "223000000001.html").read_text(encoding="utf-8")
+    page = page.replace("https://postfiles.pstatic.net/MjAy/image.png", f"{stub_server.url}/image.png")
+    naver.pages["223000000001"] = page
+    path = import_naver_blog.POSTS_DIR / "2024-03-05-naver-223000000001.md"
+
+    def resync(signal: str, localize_images: bool) -> None:
+        listed = import_naver_blog.ListedPost(
+            log_no="223000000001",
+            link=f"https://blog.naver.com/{BLOG_ID}/223000000001",
+            title="",
+            published_at=datetime(2024, 3, 5, tzinfo=import_naver_blog.KST),
+            signal=signal,
+        )
+        with ThreadPoolExecutor(max_workers=2) as fetch_pool, ProcessPoolExecutor(max_workers=1) as convert_pool:
+            with naver_images.ImageLocalizer(workers=2, index_path=tmp_path / "images.json") as localizer:
+                running = import_naver_blog.Importer(
+                    BLOG_ID, True, fetch_pool, convert_pool, "soup", None, localizer, localize_images=localize_images
+                )
+                assert running.import_batch([listed]) == []
+
+    def manifest() -> dict:
+        return json.loads((tmp_path / "manifest.json").read_text(encoding="utf-8"))
+
+    resync("a", localize_images=True)
+    assert 'src="/assets/naver/' in path.read_text(encoding="utf-8")
+    assert manifest()["223000000001"]["images_localized"] is True
+
+    # Edited on Naver, re-synced without --localize-images.
+    naver.pages["223000000001"] = page.replace("N+1 쿼리가", "N+1 쿼리가 자주")
+    resync("b", localize_images=False)
+    content = path.read_text(encoding="utf-8")
+    assert "쿼리가 자주" in content
+    assert 'src="/assets/naver/' in content and stub_server.url not in content
+
+    # Manifests written before the flag existed fall back to the file itself.
+    legacy = manifest()
+    del legacy["223000000001"]["images_localized"]
+    (tmp_path / "manifest.json").write_text(json.dumps(legacy), encoding="utf-8")
+    naver.pages["223000000001"] = page
+    resync("c", localize_images=False)
+    content = path.read_text(encoding="utf-8")
+    assert "쿼리가 자주" not in content
+    assert 'src="/assets/naver/' in content and stub_server.url not in content
+    assert stub_server.paths().count("/image.png") == 1
@@ -0,0 +1,99 @@
+"""Repository metrics for a small monorepo archive.
+
+tests/fixtures/repo_metrics/mono.tar.gz is laid out like a GitHub tarball
+(one top-level directory, commit SHA in the pax comment): two npm workspace
+packages, two Python projects, a root package.json, tests next to the code,
+a binary asset and a vendored node_modules/ file that must be ignored.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import repo_metrics
+from conftest import FIXTURES_DIR
+
+ARCHIVE = FIXTURES_DIR / "repo_metrics" / "mono.tar.gz"
+
+
+@pytest.fixture(scope="module")
+def metrics():
+    return repo_metrics.analyze_archive(ARCHIVE, workers=2)
+
+
+def test_commit_comes_from_the_pax_header(metrics):
+    assert metrics["commit"] == "0123456789abcdef0123456789abcdef01234567"
+    assert repo_metrics.archive_commit(ARCHIVE) == metrics["commit"]
+
+
+def test_lines_of_code_per_language(metrics):
+    # node_modules/left-pad/index.js is excluded, so there is no JavaScript.
+    assert metrics["files"] == 12
+    assert metrics["languages"] == {
+        "TypeScript": {"files": 3, "code": 25, "blank": 3},
+        "JSON": {"files": 3, "code": 20, "blank": 0},
+        "TOML": {"files": 2, "code": 8, "blank": 1},
+        "Python": {"files": 2, "code": 6, "blank": 4},
+        "Markdown": {"files": 1, "code": 2, "blank": 1},
+    }
+
+
+def test_test_ratio_counts_code_only(metrics):
+    # index.test.ts and tests/test_app.py against index.ts, App.tsx and app.py;
+    # manifests and Markdown are not code.
+    assert metrics["tests"] == {"files": 2, "code": 5}
+    assert metrics["source"] == {"files": 3, "code": 26}
+    assert metrics["test_ratio"] == 0.192
+
+
+def test_size_histogram(metrics):
+    assert metrics["size_histogram"] == {"<1KB": 11, "1-10KB": 1, "10-100KB": 0, "100KB-1MB": 0, ">=1MB": 0}
+    assert metrics["size_percentiles"]["max"] == 1665
+
+
+def test_manifest_edges(metrics):
+    dependencies = metrics["dependencies"]
+    assert sorted(package["name"] for package in dependencies["packages"]) == [
+        "@mono/core",
+        "@mono/web",
+        "api-service",
+        "mono",
+        "mono-utils",
+    ]
+    # "Mono_Utils>=1.0" resolves to the local mono-utils project.
+    assert dependencies["internal_edges"] == [["@mono/web", "@mono/core"], ["api-service", "mono-utils"]]
+    assert dependencies["top_external"] == [("lodash", 1), ("react", 1), ("requests", 1)]
+
+
+@pytest.mark.parametrize(
+    "path, ignored",
+    [
+        ("node_modules/left-pad/index.js", True),
+        ("packages/web/dist/app.js", True),
+        ("packages/web/src/App.tsx", False),
+    ],
+)
+def test_ignored_paths(path, ignored):
+    assert repo_metrics.is_ignored_path(path) is ignored
+
+
+def test_archive_can_be_analyzed_from_a_worker_thread(metrics):
+    # star_repo_deep_dive.py runs analyze_archive in its metrics_pool thread.
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        results = list(pool.map(lambda _: repo_metrics.analyze_archive(ARCHIVE, workers=2), range(2)))
+    assert results == [metrics, metrics]
+
+
+def test_metrics_cache_is_safe_across_threads(tmp_path, monkeypatch):
+    monkeypatch.setattr(repo_metrics, "CACHE_MAX_ENTRIES", 10)
+    cache = repo_metrics.MetricsCache(tmp_path / "cache.json")
+
+    def put(worker: int) -> None:
+        for index in range(50):
+            cache.put(f"{worker}-{index}", {"files": index})
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(put, range(8)))
+    assert len(cache.records) == 10
+    assert len(repo_metrics.MetricsCache(tmp_path / "cache.json").records) == 10
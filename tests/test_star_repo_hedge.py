@@ -0,0 +1,74 @@
+"""Hedged LLM drafts in star_repo_deep_dive against a local stand-in.
+
+Two fake providers share the stub server: "slow" holds its response until the
+test releases it, "fast" answers at once. The slow one is asked first, so the
+fast one is started after the hedge delay and wins.
+"""
+from __future__ import annotations
+
+import json
+import threading
+
+import pytest
+
+import star_repo_deep_dive as deep_dive
+from llm_cache import LLMCache, cache_key
+from llm_latency import LatencyTracker
+
+SECTIONS = {key: f"{key} text" for key in deep_dive.REQUIRED_KEYS}
+
+
+@pytest.fixture
+def hedge(tmp_path, monkeypatch, stub_server):
+    monkeypatch.setattr(deep_dive, "LLM_CACHE", LLMCache(directory=tmp_path / "llm_cache"))
+    monkeypatch.setattr(deep_dive, "LLM_LATENCY", LatencyTracker(tmp_path / "latency.json"))
+    monkeypatch.setenv("LLM_HEDGE_DELAY", "0.05")
+    release = threading.Event()
+
+    def handler(method, path, body):
+        if path == "/slow":
+            release.wait(5)
+        return 200, SECTIONS
+
+    stub_server.handler = handler
+
+    def provider(name):
+        def request(attempt):
+            response = deep_dive.timed_post(name, f"{stub_server.url}/{name}", attempt, json={}, timeout=10)
+            return response.text
+
+        def call(prompt, cached_only=False, attempt=None):
+            return deep_dive.cached_llm_call(name, prompt, 0.0, None, lambda: request(attempt), cached_only, attempt)
+
+        return name, call
+
+    yield release, [provider("slow"), provider("fast")]
+    release.set()
+
+
+def llm_threads() -> list[threading.Thread]:
+    return [thread for thread in threading.enumerate() if thread.name.startswith("llm-")]
+
+
+def test_losing_request_leaves_no_cache_or_latency_entries(hedge):
+    release, providers = hedge
+    assert deep_dive.hedged_sections("prompt", providers) == SECTIONS
+
+    # Let the abandoned request finish and wait for its thread.
+    release.set()
+    for thread in llm_threads():
+        thread.join(5)
+
+    cache = deep_dive.LLM_CACHE
+    assert cache.get(cache_key("fast", deep_dive.SYSTEM_PROMPT, "prompt", 0.0, None)) == json.dumps(SECTIONS)
+    assert cache.get(cache_key("slow", deep_dive.SYSTEM_PROMPT, "prompt", 0.0, None)) is None
+    assert sorted(deep_dive.LLM_LATENCY.providers) == ["fast"]
+
+
+def test_cached_answer_skips_both_requests(hedge, stub_server):
+    _, providers = hedge
+    key = cache_key("fast", deep_dive.SYSTEM_PROMPT, "prompt", 0.0, None)
+    deep_dive.LLM_CACHE.put(key, json.dumps(SECTIONS), model="fast")
+
+    assert deep_dive.hedged_sections("prompt", providers) == SECTIONS
+    assert stub_server.requests == []
@@ -0,0 +1,72 @@
+"""Candidate queue bookkeeping in star_repo_deep_dive.main().
+
+GitHub metadata and the fetch/metrics/draft stages are replaced, so these
+tests only cover what main() does with the queue and the state file.
+"""
+from __future__ import annotations
+
+import json
+import sys
+
+import pytest
+
+import star_repo_deep_dive as deep_dive
+from llm_latency import LatencyTracker
+
+
+@pytest.fixture
+def run(tmp_path, monkeypatch):
+    monkeypatch.setattr(deep_dive, "ROOT_DIR", tmp_path)
+    monkeypatch.setattr(deep_dive, "POSTS_DIR", tmp_path / "_posts")
+    monkeypatch.setattr(deep_dive, "STATE_FILE", tmp_path / "state.json")
+    monkeypatch.setattr(deep_dive, "CANDIDATES_FILE", tmp_path / "candidates.json")
+    monkeypatch.setattr(deep_dive, "LLM_LATENCY", LatencyTracker(tmp_path / "latency.json"))
+    monkeypatch.setattr(
+        deep_dive,
+        "github_get",
+        lambda url: {"full_name": url.rsplit("/repos/", 1)[1], "stargazers_count": 60000, "default_branch": "main"},
+    )
+    monkeypatch.setattr(deep_dive, "search_candidate_names", lambda min_stars: pytest.fail("search should not run"))
+    monkeypatch.setattr(deep_dive, "metrics_stage", lambda job, cache, workers: job)
+    monkeypatch.setattr(deep_dive, "draft_stage", lambda job: job)
+    monkeypatch.setattr(deep_dive, "build_post", lambda repo, sections, now: f"# {repo.full_name}\n")
+    broken: set[str] = set()
+
+    def fetch_stage(job, fetch_mode, metrics_cache):
+        if job.repo.full_name in broken:
+            raise RuntimeError("GitHub is down")
+        return job
+
+    monkeypatch.setattr(deep_dive, "fetch_stage", fetch_stage)
+    deep_dive.CANDIDATES_FILE.write_text(
+        json.dumps({"min_stars": 50000, "refreshed_at": deep_dive.iso_now_kst(), "names": ["a/one", "b/two"]}),
+        encoding="utf-8",
+    )
+
+    def main(fail: set[str] = frozenset()) -> int:
+        broken.clear()
+        broken.update(fail)
+        monkeypatch.setattr(sys, "argv", ["star_repo_deep_dive.py", "--force", "--count", "3"])
+        return deep_dive.main()
+
+    return main
+
+
+def state() -> dict:
+    return json.loads(deep_dive.STATE_FILE.read_text(encoding="utf-8"))
+
+
+def queued() -> list[str]:
+    return json.loads(deep_dive.CANDIDATES_FILE.read_text(encoding="utf-8"))["names"]
+
+
+def test_failed_repo_is_requeued_and_not_exhausted(run):
+    assert run(fail={"b/two"}) == 1
+    assert state()["analyzed"] == ["a/one"]
+    assert queued() == ["b/two"]
+    assert state()["exhausted"] is False
+
+    assert run() == 0
+    assert state()["analyzed"] == ["a/one", "b/two"]
+    assert queued() == []
+    assert state()["exhausted"] is True
@@ -0,0 +1,115 @@
+"""Streaming git/trees listings in star_repo_deep_dive against a local stand-in.
+
+TREE_CHUNK_BYTES is shrunk to a few bytes so every entry, and the UTF-8 bytes
+of non-ASCII paths, arrive split across network chunks.
+"""
+from __future__ import annotations
+
+import json
+from urllib.parse import unquote, urlsplit
+
+import pytest
+
+import star_repo_deep_dive as deep_dive
+
+REPO = deep_dive.parse_repo({"full_name": "octo/repo", "default_branch": "main"})
+ROOT_ENTRIES = [
+    {"path": "README.md", "type": "blob", "sha": "b1"},
+    {"path": "docs", "type": "tree", "sha": "t-docs"},
+    {"path": "docs/한글 안내.md", "type": "blob", "sha": "b2"},
+    {"path": "src", "type": "tree", "sha": "t-src"},
+    {"path": "src/main.py", "type": "blob", "sha": "b3"},
+    {"path": "node_modules/left-pad/index.js", "type": "blob", "sha": "b4"},
+]
+
+
+def tree_body(entries: list[dict], truncated: bool = False) -> bytes:
+    body = {"sha": "root", "url": "https://example.invalid", "tree": entries, "truncated": truncated}
+    return json.dumps(body, ensure_ascii=False).encode("utf-8")
+
+
+class TreeStandIn:
+    def __init__(self) -> None:
+        # (ref, recursive) -> body
+        self.trees: dict[tuple[str, bool], bytes] = {}
+
+    def __call__(self, method: str, path: str, body: bytes):
+        url = urlsplit(path)
+        prefix = "/repos/octo/repo/git/trees/"
+        if not url.path.startswith(prefix):
+            return 404, {"message": "Not Found"}
+        key = (unquote(url.path[len(prefix) :]), url.query == "recursive=1")
+        if key not in self.trees:
+            return 404, {"message": "Not Found"}
+        return 200, self.trees[key]
+
+    def requested(self, stub_server) -> list[str]:
+        return [unquote(path.split("/git/trees/", 1)[1]) for method, path in stub_server.requests]
+
+
+@pytest.fixture
+def trees(monkeypatch, stub_server, tmp_path):
+    monkeypatch.setattr(deep_dive, "GITHUB_API_URL", stub_server.url)
+    monkeypatch.setattr(deep_dive, "TREE_CHUNK_BYTES", 5)
+    monkeypatch.delenv("GITHUB_TOKEN", raising=False)
+    stand_in = TreeStandIn()
+    stub_server.handler = stand_in
+    return stand_in
+
+
+@pytest.mark.parametrize("chunk", [1, 2, 3, 7])
+def test_entries_split_across_chunks_decode_intact(trees, stub_server, monkeypatch, chunk):
+    monkeypatch.setattr(deep_dive, "TREE_CHUNK_BYTES", chunk)
+    trees.trees[("main", True)] = tree_body(ROOT_ENTRIES)
+    listing = deep_dive.TreeListing(f"{stub_server.url}/repos/octo/repo/git/trees/main?recursive=1")
+
+    assert list(listing) == ROOT_ENTRIES
+    assert listing.truncated is False
+
+
+def test_complete_listing_is_one_request(trees, stub_server):
+    trees.trees[("main", True)] = tree_body(ROOT_ENTRIES)
+    tree = deep_dive.fetch_tree(REPO)
+
+    assert tree.paths == ["README.md", "docs/한글 안내.md", "src/main.py"]
+    assert tree.complete is True
+    assert trees.requested(stub_server) == ["main?recursive=1"]
+
+
+def test_truncated_listing_walks_each_subtree(trees, stub_server):
+    # The truncated recursive listing is discarded, not merged.
+    trees.trees[("main", True)] = tree_body(ROOT_ENTRIES[:3], truncated=True)
+    trees.trees[("main", False)] = tree_body(
+        [
+            {"path": "README.md", "type": "blob", "sha": "b1"},
+            {"path": "docs", "type": "tree", "sha": "t-docs"},
+            {"path": "src", "type": "tree", "sha": "t-src"},
+            {"path": "node_modules", "type": "tree", "sha": "t-nm"},
+        ]
+    )
+    trees.trees[("t-docs", True)] = tree_body([{"path": "한글 안내.md", "type": "blob", "sha": "b2"}])
+    trees.trees[("t-src", True)] = tree_body([{"path": "main.py", "type": "blob", "sha": "b3"}])
+    tree = deep_dive.fetch_tree(REPO)
+
+    assert tree.paths == ["README.md", "docs/한글 안내.md", "src/main.py"]
+    assert tree.total_files == 3
+    assert tree.complete is True
+    assert trees.requested(stub_server) == ["main?recursive=1", "main", "t-docs?recursive=1", "t-src?recursive=1"]
+
+
+def test_exhausted_budget_marks_the_tree_partial(trees, stub_server, monkeypatch):
+    monkeypatch.setattr(deep_dive, "MAX_TREE_REQUESTS", 3)
+    trees.trees[("main", True)] = tree_body(ROOT_ENTRIES, truncated=True)
+    trees.trees[("main", False)] = tree_body(
+        [
+            {"path": "docs", "type": "tree", "sha": "t-docs"},
+            {"path": "src", "type": "tree", "sha": "t-src"},
+        ]
+    )
+    trees.trees[("t-docs", True)] = tree_body([{"path": "한글 안내.md", "type": "blob", "sha": "b2"}])
+    trees.trees[("t-src", True)] = tree_body([{"path": "main.py", "type": "blob", "sha": "b3"}])
+    tree = deep_dive.fetch_tree(REPO)
+
+    assert tree.paths == ["docs/한글 안내.md"]
+    assert tree.complete is False
+    assert trees.requested(stub_server) == ["main?recursive=1", "main", "t-docs?recursive=1"]